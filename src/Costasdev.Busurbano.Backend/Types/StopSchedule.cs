@@ -36,16 +36,42 @@ namespace Costasdev.Busurbano.Backend.Types {
             "YW1lGBYgASgJEhUKDXN0YXJ0aW5nX3RpbWUYFyABKAkSFAoMY2FsbGluZ190",
             "aW1lGCEgASgJEhMKC2NhbGxpbmdfc3NtGCIgASgNEhUKDXRlcm1pbnVzX2Nv",
             "ZGUYKSABKAkSFQoNdGVybWludXNfbmFtZRgqIAEoCRIVCg10ZXJtaW51c190",
-            "aW1lGCsgASgJEh4KFnByZXZpb3VzX3RyaXBfc2hhcGVfaWQYMyABKAkiOwoF",
-            "U2hhcGUSEAoIc2hhcGVfaWQYASABKAkSIAoGcG9pbnRzGAMgAygLMhAucHJv",
-            "dG8uRXBzZzI1ODI5QiSqAiFDb3N0YXNkZXYuQnVzdXJiYW5vLkJhY2tlbmQu",
-            "VHlwZXNiBnByb3RvMw=="));
+            "aW1lGCsgASgJEh4KFnByZXZpb3VzX3RyaXBfc2hhcGVfaWQYMyABKAkirwUK",
+            "DlN0b3BBcnJpdmFsc1YyEg8KB3N0b3BfaWQYASABKAkSDwoHc3RyaW5ncxgC",
+            "IAMoCRIiCghsb2NhdGlvbhgDIAEoCzIQLnByb3RvLkVwc2cyNTgyORI+ChBz",
+            "dHJlZXRfc2VxdWVuY2VzGAQgAygLMiQucHJvdG8uU3RvcEFycml2YWxzVjIu",
+            "U3RyZWV0U2VxdWVuY2USOAoIYXJyaXZhbHMYBSADKAsyJi5wcm90by5TdG9w",
+            "QXJyaXZhbHNWMi5TY2hlZHVsZWRBcnJpdmFsGiEKDlN0cmVldFNlcXVlbmNl",
+            "Eg8KB3N0cmVldHMYASADKA0auQMKEFNjaGVkdWxlZEFycml2YWwSEgoKc2Vy",
+            "dmljZV9pZBgBIAEoDRIPCgd0cmlwX2lkGAIgASgNEgwKBGxpbmUYAyABKA0S",
+            "DQoFcm91dGUYBCABKA0SEAoIc2hhcGVfaWQYBSABKA0SGwoTc2hhcGVfZGlz",
+            "dF90cmF2ZWxlZBgGIAEoARIVCg1zdG9wX3NlcXVlbmNlGAsgASgNEhcKD3N0",
+            "cmVldF9zZXF1ZW5jZRgMIAEoDRIbChNuZXh0X3N0cmVldHNfb2Zmc2V0GA0g",
+            "ASgNEhUKDXN0YXJ0aW5nX2NvZGUYFSABKA0SFQoNc3RhcnRpbmdfbmFtZRgW",
+            "IAEoDRIZCgxzdGFydGluZ19zc20YFyABKA1IAIgBARITCgtjYWxsaW5nX3Nz",
+            "bRgiIAEoDRIVCg10ZXJtaW51c19jb2RlGCkgASgNEhUKDXRlcm1pbnVzX25h",
+            "bWUYKiABKA0SGQoMdGVybWludXNfc3NtGCsgASgNSAGIAQESHgoWcHJldmlv",
+            "dXNfdHJpcF9zaGFwZV9pZBgzIAEoDUIPCg1fc3RhcnRpbmdfc3NtQg8KDV90",
+            "ZXJtaW51c19zc20iOwoFU2hhcGUSEAoIc2hhcGVfaWQYASABKAkSIAoGcG9p",
+            "bnRzGAMgAygLMhAucHJvdG8uRXBzZzI1ODI5In8KDENvbXBhY3RTaGFwZRIQ",
+            "CghzaGFwZV9pZBgBIAEoCRIpCgZsZXZlbHMYAyADKAsyGS5wcm90by5Db21w",
+            "YWN0U2hhcGUuTGV2ZWwaMgoFTGV2ZWwSEQoJdG9sZXJhbmNlGAEgASgBEgoK",
+            "AmR4GAIgAygREgoKAmR5GAMgAygRIp8BCg5TaGFwZVN0b3BJbmRleBIQCghz",
+            "aGFwZV9pZBgBIAEoCRIxCgVzdG9wcxgDIAMoCzIiLnByb3RvLlNoYXBlU3Rv",
+            "cEluZGV4LlN0b3BQb3NpdGlvbhpICgxTdG9wUG9zaXRpb24SDwoHc3RvcF9p",
+            "ZBgBIAEoCRIVCg1zZWdtZW50X2luZGV4GAIgASgNEhAKCGRpc3RhbmNlGAMg",
+            "ASgBQiSqAiFDb3N0YXNkZXYuQnVzdXJiYW5vLkJhY2tlbmQuVHlwZXNiBnBy",
+            "b3RvMw=="));
       descriptor = pbr::FileDescriptor.FromGeneratedCode(descriptorData,
           new pbr::FileDescriptor[] { },
           new pbr::GeneratedClrTypeInfo(null, null, new pbr::GeneratedClrTypeInfo[] {
             new pbr::GeneratedClrTypeInfo(typeof(global::Costasdev.Busurbano.Backend.Types.Epsg25829), global::Costasdev.Busurbano.Backend.Types.Epsg25829.Parser, new[]{ "X", "Y" }, null, null, null, null),
             new pbr::GeneratedClrTypeInfo(typeof(global::Costasdev.Busurbano.Backend.Types.StopArrivals), global::Costasdev.Busurbano.Backend.Types.StopArrivals.Parser, new[]{ "StopId", "Location", "Arrivals" }, null, null, null, new pbr::GeneratedClrTypeInfo[] { new pbr::GeneratedClrTypeInfo(typeof(global::Costasdev.Busurbano.Backend.Types.StopArrivals.Types.ScheduledArrival), global::Costasdev.Busurbano.Backend.Types.StopArrivals.Types.ScheduledArrival.Parser, new[]{ "ServiceId", "TripId", "Line", "Route", "ShapeId", "ShapeDistTraveled", "StopSequence", "NextStreets", "StartingCode", "StartingName", "StartingTime", "CallingTime", "CallingSsm", "TerminusCode", "TerminusName", "TerminusTime", "PreviousTripShapeId" }, null, null, null, null)}),
-            new pbr::GeneratedClrTypeInfo(typeof(global::Costasdev.Busurbano.Backend.Types.Shape), global::Costasdev.Busurbano.Backend.Types.Shape.Parser, new[]{ "ShapeId", "Points" }, null, null, null, null)
+            new pbr::GeneratedClrTypeInfo(typeof(global::Costasdev.Busurbano.Backend.Types.StopArrivalsV2), global::Costasdev.Busurbano.Backend.Types.StopArrivalsV2.Parser, new[]{ "StopId", "Strings", "Location", "StreetSequences", "Arrivals" }, null, null, null, new pbr::GeneratedClrTypeInfo[] { new pbr::GeneratedClrTypeInfo(typeof(global::Costasdev.Busurbano.Backend.Types.StopArrivalsV2.Types.StreetSequence), global::Costasdev.Busurbano.Backend.Types.StopArrivalsV2.Types.StreetSequence.Parser, new[]{ "Streets" }, null, null, null, null),
+            new pbr::GeneratedClrTypeInfo(typeof(global::Costasdev.Busurbano.Backend.Types.StopArrivalsV2.Types.ScheduledArrival), global::Costasdev.Busurbano.Backend.Types.StopArrivalsV2.Types.ScheduledArrival.Parser, new[]{ "ServiceId", "TripId", "Line", "Route", "ShapeId", "ShapeDistTraveled", "StopSequence", "StreetSequence", "NextStreetsOffset", "StartingCode", "StartingName", "StartingSsm", "CallingSsm", "TerminusCode", "TerminusName", "TerminusSsm", "PreviousTripShapeId" }, new[]{ "StartingSsm", "TerminusSsm" }, null, null, null)}),
+            new pbr::GeneratedClrTypeInfo(typeof(global::Costasdev.Busurbano.Backend.Types.Shape), global::Costasdev.Busurbano.Backend.Types.Shape.Parser, new[]{ "ShapeId", "Points" }, null, null, null, null),
+            new pbr::GeneratedClrTypeInfo(typeof(global::Costasdev.Busurbano.Backend.Types.CompactShape), global::Costasdev.Busurbano.Backend.Types.CompactShape.Parser, new[]{ "ShapeId", "Levels" }, null, null, null, new pbr::GeneratedClrTypeInfo[] { new pbr::GeneratedClrTypeInfo(typeof(global::Costasdev.Busurbano.Backend.Types.CompactShape.Types.Level), global::Costasdev.Busurbano.Backend.Types.CompactShape.Types.Level.Parser, new[]{ "Tolerance", "Dx", "Dy" }, null, null, null, null)}),
+            new pbr::GeneratedClrTypeInfo(typeof(global::Costasdev.Busurbano.Backend.Types.ShapeStopIndex), global::Costasdev.Busurbano.Backend.Types.ShapeStopIndex.Parser, new[]{ "ShapeId", "Stops" }, null, null, null, new pbr::GeneratedClrTypeInfo[] { new pbr::GeneratedClrTypeInfo(typeof(global::Costasdev.Busurbano.Backend.Types.ShapeStopIndex.Types.StopPosition), global::Costasdev.Busurbano.Backend.Types.ShapeStopIndex.Types.StopPosition.Parser, new[]{ "StopId", "SegmentIndex", "Distance" }, null, null, null, null)})
           }));
     }
     #endregion
@@ -1320,21 +1346,2046 @@ namespace Costasdev.Busurbano.Backend.Types {
 
   }
 
+  /// <summary>
+  /// Compact version of StopArrivals. Every string is stored once in the strings
+  /// table of the file and referenced by its index, index 0 being the empty string.
+  /// Times are seconds since midnight of the service day.
+  /// </summary>
+  public sealed partial class StopArrivalsV2 : pb::IMessage<StopArrivalsV2>
+  #if !GOOGLE_PROTOBUF_REFSTRUCT_COMPATIBILITY_MODE
+      , pb::IBufferMessage
+  #endif
+  {
+    private static readonly pb::MessageParser<StopArrivalsV2> _parser = new pb::MessageParser<StopArrivalsV2>(() => new StopArrivalsV2());
+    private pb::UnknownFieldSet _unknownFields;
+    [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+    [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+    public static pb::MessageParser<StopArrivalsV2> Parser { get { return _parser; } }
+
+    [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+    [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+    public static pbr::MessageDescriptor Descriptor {
+      get { return global::Costasdev.Busurbano.Backend.Types.StopScheduleReflection.Descriptor.MessageTypes[2]; }
+    }
+
+    [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+    [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+    pbr::MessageDescriptor pb::IMessage.Descriptor {
+      get { return Descriptor; }
+    }
+
+    [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+    [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+    public StopArrivalsV2() {
+      OnConstruction();
+    }
+
+    partial void OnConstruction();
+
+    [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+    [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+    public StopArrivalsV2(StopArrivalsV2 other) : this() {
+      stopId_ = other.stopId_;
+      strings_ = other.strings_.Clone();
+      location_ = other.location_ != null ? other.location_.Clone() : null;
+      streetSequences_ = other.streetSequences_.Clone();
+      arrivals_ = other.arrivals_.Clone();
+      _unknownFields = pb::UnknownFieldSet.Clone(other._unknownFields);
+    }
+
+    [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+    [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+    public StopArrivalsV2 Clone() {
+      return new StopArrivalsV2(this);
+    }
+
+    /// <summary>Field number for the "stop_id" field.</summary>
+    public const int StopIdFieldNumber = 1;
+    private string stopId_ = "";
+    [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+    [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+    public string StopId {
+      get { return stopId_; }
+      set {
+        stopId_ = pb::ProtoPreconditions.CheckNotNull(value, "value");
+      }
+    }
+
+    /// <summary>Field number for the "strings" field.</summary>
+    public const int StringsFieldNumber = 2;
+    private static readonly pb::FieldCodec<string> _repeated_strings_codec
+        = pb::FieldCodec.ForString(18);
+    private readonly pbc::RepeatedField<string> strings_ = new pbc::RepeatedField<string>();
+    [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+    [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+    public pbc::RepeatedField<string> Strings {
+      get { return strings_; }
+    }
+
+    /// <summary>Field number for the "location" field.</summary>
+    public const int LocationFieldNumber = 3;
+    private global::Costasdev.Busurbano.Backend.Types.Epsg25829 location_;
+    [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+    [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+    public global::Costasdev.Busurbano.Backend.Types.Epsg25829 Location {
+      get { return location_; }
+      set {
+        location_ = value;
+      }
+    }
+
+    /// <summary>Field number for the "street_sequences" field.</summary>
+    public const int StreetSequencesFieldNumber = 4;
+    private static readonly pb::FieldCodec<global::Costasdev.Busurbano.Backend.Types.StopArrivalsV2.Types.StreetSequence> _repeated_streetSequences_codec
+        = pb::FieldCodec.ForMessage(34, global::Costasdev.Busurbano.Backend.Types.StopArrivalsV2.Types.StreetSequence.Parser);
+    private readonly pbc::RepeatedField<global::Costasdev.Busurbano.Backend.Types.StopArrivalsV2.Types.StreetSequence> streetSequences_ = new pbc::RepeatedField<global::Costasdev.Busurbano.Backend.Types.StopArrivalsV2.Types.StreetSequence>();
+    [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+    [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+    public pbc::RepeatedField<global::Costasdev.Busurbano.Backend.Types.StopArrivalsV2.Types.StreetSequence> StreetSequences {
+      get { return streetSequences_; }
+    }
+
+    /// <summary>Field number for the "arrivals" field.</summary>
+    public const int ArrivalsFieldNumber = 5;
+    private static readonly pb::FieldCodec<global::Costasdev.Busurbano.Backend.Types.StopArrivalsV2.Types.ScheduledArrival> _repeated_arrivals_codec
+        = pb::FieldCodec.ForMessage(42, global::Costasdev.Busurbano.Backend.Types.StopArrivalsV2.Types.ScheduledArrival.Parser);
+    private readonly pbc::RepeatedField<global::Costasdev.Busurbano.Backend.Types.StopArrivalsV2.Types.ScheduledArrival> arrivals_ = new pbc::RepeatedField<global::Costasdev.Busurbano.Backend.Types.StopArrivalsV2.Types.ScheduledArrival>();
+    [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+    [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+    public pbc::RepeatedField<global::Costasdev.Busurbano.Backend.Types.StopArrivalsV2.Types.ScheduledArrival> Arrivals {
+      get { return arrivals_; }
+    }
+
+    [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+    [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+    public override bool Equals(object other) {
+      return Equals(other as StopArrivalsV2);
+    }
+
+    [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+    [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+    public bool Equals(StopArrivalsV2 other) {
+      if (ReferenceEquals(other, null)) {
+        return false;
+      }
+      if (ReferenceEquals(other, this)) {
+        return true;
+      }
+      if (StopId != other.StopId) return false;
+      if(!strings_.Equals(other.strings_)) return false;
+      if (!object.Equals(Location, other.Location)) return false;
+      if(!streetSequences_.Equals(other.streetSequences_)) return false;
+      if(!arrivals_.Equals(other.arrivals_)) return false;
+      return Equals(_unknownFields, other._unknownFields);
+    }
+
+    [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+    [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+    public override int GetHashCode() {
+      int hash = 1;
+      if (StopId.Length != 0) hash ^= StopId.GetHashCode();
+      hash ^= strings_.GetHashCode();
+      if (location_ != null) hash ^= Location.GetHashCode();
+      hash ^= streetSequences_.GetHashCode();
+      hash ^= arrivals_.GetHashCode();
+      if (_unknownFields != null) {
+        hash ^= _unknownFields.GetHashCode();
+      }
+      return hash;
+    }
+
+    [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+    [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+    public override string ToString() {
+      return pb::JsonFormatter.ToDiagnosticString(this);
+    }
+
+    [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+    [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+    public void WriteTo(pb::CodedOutputStream output) {
+    #if !GOOGLE_PROTOBUF_REFSTRUCT_COMPATIBILITY_MODE
+      output.WriteRawMessage(this);
+    #else
+      if (StopId.Length != 0) {
+        output.WriteRawTag(10);
+        output.WriteString(StopId);
+      }
+      strings_.WriteTo(output, _repeated_strings_codec);
+      if (location_ != null) {
+        output.WriteRawTag(26);
+        output.WriteMessage(Location);
+      }
+      streetSequences_.WriteTo(output, _repeated_streetSequences_codec);
+      arrivals_.WriteTo(output, _repeated_arrivals_codec);
+      if (_unknownFields != null) {
+        _unknownFields.WriteTo(output);
+      }
+    #endif
+    }
+
+    #if !GOOGLE_PROTOBUF_REFSTRUCT_COMPATIBILITY_MODE
+    [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+    [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+    void pb::IBufferMessage.InternalWriteTo(ref pb::WriteContext output) {
+      if (StopId.Length != 0) {
+        output.WriteRawTag(10);
+        output.WriteString(StopId);
+      }
+      strings_.WriteTo(ref output, _repeated_strings_codec);
+      if (location_ != null) {
+        output.WriteRawTag(26);
+        output.WriteMessage(Location);
+      }
+      streetSequences_.WriteTo(ref output, _repeated_streetSequences_codec);
+      arrivals_.WriteTo(ref output, _repeated_arrivals_codec);
+      if (_unknownFields != null) {
+        _unknownFields.WriteTo(ref output);
+      }
+    }
+    #endif
+
+    [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+    [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+    public int CalculateSize() {
+      int size = 0;
+      if (StopId.Length != 0) {
+        size += 1 + pb::CodedOutputStream.ComputeStringSize(StopId);
+      }
+      size += strings_.CalculateSize(_repeated_strings_codec);
+      if (location_ != null) {
+        size += 1 + pb::CodedOutputStream.ComputeMessageSize(Location);
+      }
+      size += streetSequences_.CalculateSize(_repeated_streetSequences_codec);
+      size += arrivals_.CalculateSize(_repeated_arrivals_codec);
+      if (_unknownFields != null) {
+        size += _unknownFields.CalculateSize();
+      }
+      return size;
+    }
+
+    [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+    [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+    public void MergeFrom(StopArrivalsV2 other) {
+      if (other == null) {
+        return;
+      }
+      if (other.StopId.Length != 0) {
+        StopId = other.StopId;
+      }
+      strings_.Add(other.strings_);
+      if (other.location_ != null) {
+        if (location_ == null) {
+          Location = new global::Costasdev.Busurbano.Backend.Types.Epsg25829();
+        }
+        Location.MergeFrom(other.Location);
+      }
+      streetSequences_.Add(other.streetSequences_);
+      arrivals_.Add(other.arrivals_);
+      _unknownFields = pb::UnknownFieldSet.MergeFrom(_unknownFields, other._unknownFields);
+    }
+
+    [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+    [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+    public void MergeFrom(pb::CodedInputStream input) {
+    #if !GOOGLE_PROTOBUF_REFSTRUCT_COMPATIBILITY_MODE
+      input.ReadRawMessage(this);
+    #else
+      uint tag;
+      while ((tag = input.ReadTag()) != 0) {
+        switch(tag) {
+          default:
+            _unknownFields = pb::UnknownFieldSet.MergeFieldFrom(_unknownFields, input);
+            break;
+          case 10: {
+            StopId = input.ReadString();
+            break;
+          }
+          case 18: {
+            strings_.AddEntriesFrom(input, _repeated_strings_codec);
+            break;
+          }
+          case 26: {
+            if (location_ == null) {
+              Location = new global::Costasdev.Busurbano.Backend.Types.Epsg25829();
+            }
+            input.ReadMessage(Location);
+            break;
+          }
+          case 34: {
+            streetSequences_.AddEntriesFrom(input, _repeated_streetSequences_codec);
+            break;
+          }
+          case 42: {
+            arrivals_.AddEntriesFrom(input, _repeated_arrivals_codec);
+            break;
+          }
+        }
+      }
+    #endif
+    }
+
+    #if !GOOGLE_PROTOBUF_REFSTRUCT_COMPATIBILITY_MODE
+    [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+    [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+    void pb::IBufferMessage.InternalMergeFrom(ref pb::ParseContext input) {
+      uint tag;
+      while ((tag = input.ReadTag()) != 0) {
+        switch(tag) {
+          default:
+            _unknownFields = pb::UnknownFieldSet.MergeFieldFrom(_unknownFields, ref input);
+            break;
+          case 10: {
+            StopId = input.ReadString();
+            break;
+          }
+          case 18: {
+            strings_.AddEntriesFrom(ref input, _repeated_strings_codec);
+            break;
+          }
+          case 26: {
+            if (location_ == null) {
+              Location = new global::Costasdev.Busurbano.Backend.Types.Epsg25829();
+            }
+            input.ReadMessage(Location);
+            break;
+          }
+          case 34: {
+            streetSequences_.AddEntriesFrom(ref input, _repeated_streetSequences_codec);
+            break;
+          }
+          case 42: {
+            arrivals_.AddEntriesFrom(ref input, _repeated_arrivals_codec);
+            break;
+          }
+        }
+      }
+    }
+    #endif
+
+    #region Nested types
+    /// <summary>Container for nested types declared in the StopArrivalsV2 message type.</summary>
+    [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+    [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+    public static partial class Types {
+      /// <summary>
+      /// Streets a trip goes through, as indexes into strings
+      /// </summary>
+      public sealed partial class StreetSequence : pb::IMessage<StreetSequence>
+      #if !GOOGLE_PROTOBUF_REFSTRUCT_COMPATIBILITY_MODE
+          , pb::IBufferMessage
+      #endif
+      {
+        private static readonly pb::MessageParser<StreetSequence> _parser = new pb::MessageParser<StreetSequence>(() => new StreetSequence());
+        private pb::UnknownFieldSet _unknownFields;
+        [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+        [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+        public static pb::MessageParser<StreetSequence> Parser { get { return _parser; } }
+
+        [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+        [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+        public static pbr::MessageDescriptor Descriptor {
+          get { return global::Costasdev.Busurbano.Backend.Types.StopArrivalsV2.Descriptor.NestedTypes[0]; }
+        }
+
+        [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+        [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+        pbr::MessageDescriptor pb::IMessage.Descriptor {
+          get { return Descriptor; }
+        }
+
+        [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+        [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+        public StreetSequence() {
+          OnConstruction();
+        }
+
+        partial void OnConstruction();
+
+        [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+        [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+        public StreetSequence(StreetSequence other) : this() {
+          streets_ = other.streets_.Clone();
+          _unknownFields = pb::UnknownFieldSet.Clone(other._unknownFields);
+        }
+
+        [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+        [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+        public StreetSequence Clone() {
+          return new StreetSequence(this);
+        }
+
+        /// <summary>Field number for the "streets" field.</summary>
+        public const int StreetsFieldNumber = 1;
+        private static readonly pb::FieldCodec<uint> _repeated_streets_codec
+            = pb::FieldCodec.ForUInt32(10);
+        private readonly pbc::RepeatedField<uint> streets_ = new pbc::RepeatedField<uint>();
+        [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+        [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+        public pbc::RepeatedField<uint> Streets {
+          get { return streets_; }
+        }
+
+        [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+        [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+        public override bool Equals(object other) {
+          return Equals(other as StreetSequence);
+        }
+
+        [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+        [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+        public bool Equals(StreetSequence other) {
+          if (ReferenceEquals(other, null)) {
+            return false;
+          }
+          if (ReferenceEquals(other, this)) {
+            return true;
+          }
+          if(!streets_.Equals(other.streets_)) return false;
+          return Equals(_unknownFields, other._unknownFields);
+        }
+
+        [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+        [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+        public override int GetHashCode() {
+          int hash = 1;
+          hash ^= streets_.GetHashCode();
+          if (_unknownFields != null) {
+            hash ^= _unknownFields.GetHashCode();
+          }
+          return hash;
+        }
+
+        [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+        [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+        public override string ToString() {
+          return pb::JsonFormatter.ToDiagnosticString(this);
+        }
+
+        [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+        [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+        public void WriteTo(pb::CodedOutputStream output) {
+        #if !GOOGLE_PROTOBUF_REFSTRUCT_COMPATIBILITY_MODE
+          output.WriteRawMessage(this);
+        #else
+          streets_.WriteTo(output, _repeated_streets_codec);
+          if (_unknownFields != null) {
+            _unknownFields.WriteTo(output);
+          }
+        #endif
+        }
+
+        #if !GOOGLE_PROTOBUF_REFSTRUCT_COMPATIBILITY_MODE
+        [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+        [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+        void pb::IBufferMessage.InternalWriteTo(ref pb::WriteContext output) {
+          streets_.WriteTo(ref output, _repeated_streets_codec);
+          if (_unknownFields != null) {
+            _unknownFields.WriteTo(ref output);
+          }
+        }
+        #endif
+
+        [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+        [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+        public int CalculateSize() {
+          int size = 0;
+          size += streets_.CalculateSize(_repeated_streets_codec);
+          if (_unknownFields != null) {
+            size += _unknownFields.CalculateSize();
+          }
+          return size;
+        }
+
+        [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+        [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+        public void MergeFrom(StreetSequence other) {
+          if (other == null) {
+            return;
+          }
+          streets_.Add(other.streets_);
+          _unknownFields = pb::UnknownFieldSet.MergeFrom(_unknownFields, other._unknownFields);
+        }
+
+        [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+        [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+        public void MergeFrom(pb::CodedInputStream input) {
+        #if !GOOGLE_PROTOBUF_REFSTRUCT_COMPATIBILITY_MODE
+          input.ReadRawMessage(this);
+        #else
+          uint tag;
+          while ((tag = input.ReadTag()) != 0) {
+            switch(tag) {
+              default:
+                _unknownFields = pb::UnknownFieldSet.MergeFieldFrom(_unknownFields, input);
+                break;
+              case 10:
+              case 8: {
+                streets_.AddEntriesFrom(input, _repeated_streets_codec);
+                break;
+              }
+            }
+          }
+        #endif
+        }
+
+        #if !GOOGLE_PROTOBUF_REFSTRUCT_COMPATIBILITY_MODE
+        [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+        [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+        void pb::IBufferMessage.InternalMergeFrom(ref pb::ParseContext input) {
+          uint tag;
+          while ((tag = input.ReadTag()) != 0) {
+            switch(tag) {
+              default:
+                _unknownFields = pb::UnknownFieldSet.MergeFieldFrom(_unknownFields, ref input);
+                break;
+              case 10:
+              case 8: {
+                streets_.AddEntriesFrom(ref input, _repeated_streets_codec);
+                break;
+              }
+            }
+          }
+        }
+        #endif
+
+      }
+
+      public sealed partial class ScheduledArrival : pb::IMessage<ScheduledArrival>
+      #if !GOOGLE_PROTOBUF_REFSTRUCT_COMPATIBILITY_MODE
+          , pb::IBufferMessage
+      #endif
+      {
+        private static readonly pb::MessageParser<ScheduledArrival> _parser = new pb::MessageParser<ScheduledArrival>(() => new ScheduledArrival());
+        private pb::UnknownFieldSet _unknownFields;
+        private int _hasBits0;
+        [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+        [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+        public static pb::MessageParser<ScheduledArrival> Parser { get { return _parser; } }
+
+        [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+        [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+        public static pbr::MessageDescriptor Descriptor {
+          get { return global::Costasdev.Busurbano.Backend.Types.StopArrivalsV2.Descriptor.NestedTypes[1]; }
+        }
+
+        [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+        [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+        pbr::MessageDescriptor pb::IMessage.Descriptor {
+          get { return Descriptor; }
+        }
+
+        [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+        [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+        public ScheduledArrival() {
+          OnConstruction();
+        }
+
+        partial void OnConstruction();
+
+        [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+        [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+        public ScheduledArrival(ScheduledArrival other) : this() {
+          _hasBits0 = other._hasBits0;
+          serviceId_ = other.serviceId_;
+          tripId_ = other.tripId_;
+          line_ = other.line_;
+          route_ = other.route_;
+          shapeId_ = other.shapeId_;
+          shapeDistTraveled_ = other.shapeDistTraveled_;
+          stopSequence_ = other.stopSequence_;
+          streetSequence_ = other.streetSequence_;
+          nextStreetsOffset_ = other.nextStreetsOffset_;
+          startingCode_ = other.startingCode_;
+          startingName_ = other.startingName_;
+          startingSsm_ = other.startingSsm_;
+          callingSsm_ = other.callingSsm_;
+          terminusCode_ = other.terminusCode_;
+          terminusName_ = other.terminusName_;
+          terminusSsm_ = other.terminusSsm_;
+          previousTripShapeId_ = other.previousTripShapeId_;
+          _unknownFields = pb::UnknownFieldSet.Clone(other._unknownFields);
+        }
+
+        [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+        [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+        public ScheduledArrival Clone() {
+          return new ScheduledArrival(this);
+        }
+
+        /// <summary>Field number for the "service_id" field.</summary>
+        public const int ServiceIdFieldNumber = 1;
+        private uint serviceId_;
+        [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+        [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+        public uint ServiceId {
+          get { return serviceId_; }
+          set {
+            serviceId_ = value;
+          }
+        }
+
+        /// <summary>Field number for the "trip_id" field.</summary>
+        public const int TripIdFieldNumber = 2;
+        private uint tripId_;
+        [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+        [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+        public uint TripId {
+          get { return tripId_; }
+          set {
+            tripId_ = value;
+          }
+        }
+
+        /// <summary>Field number for the "line" field.</summary>
+        public const int LineFieldNumber = 3;
+        private uint line_;
+        [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+        [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+        public uint Line {
+          get { return line_; }
+          set {
+            line_ = value;
+          }
+        }
+
+        /// <summary>Field number for the "route" field.</summary>
+        public const int RouteFieldNumber = 4;
+        private uint route_;
+        [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+        [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+        public uint Route {
+          get { return route_; }
+          set {
+            route_ = value;
+          }
+        }
+
+        /// <summary>Field number for the "shape_id" field.</summary>
+        public const int ShapeIdFieldNumber = 5;
+        private uint shapeId_;
+        [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+        [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+        public uint ShapeId {
+          get { return shapeId_; }
+          set {
+            shapeId_ = value;
+          }
+        }
+
+        /// <summary>Field number for the "shape_dist_traveled" field.</summary>
+        public const int ShapeDistTraveledFieldNumber = 6;
+        private double shapeDistTraveled_;
+        [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+        [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+        public double ShapeDistTraveled {
+          get { return shapeDistTraveled_; }
+          set {
+            shapeDistTraveled_ = value;
+          }
+        }
+
+        /// <summary>Field number for the "stop_sequence" field.</summary>
+        public const int StopSequenceFieldNumber = 11;
+        private uint stopSequence_;
+        [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+        [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+        public uint StopSequence {
+          get { return stopSequence_; }
+          set {
+            stopSequence_ = value;
+          }
+        }
+
+        /// <summary>Field number for the "street_sequence" field.</summary>
+        public const int StreetSequenceFieldNumber = 12;
+        private uint streetSequence_;
+        /// <summary>
+        /// The next streets are street_sequences[street_sequence].streets[next_streets_offset:],
+        /// street sequence 0 being the empty sequence
+        /// </summary>
+        [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+        [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+        public uint StreetSequence {
+          get { return streetSequence_; }
+          set {
+            streetSequence_ = value;
+          }
+        }
+
+        /// <summary>Field number for the "next_streets_offset" field.</summary>
+        public const int NextStreetsOffsetFieldNumber = 13;
+        private uint nextStreetsOffset_;
+        [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+        [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+        public uint NextStreetsOffset {
+          get { return nextStreetsOffset_; }
+          set {
+            nextStreetsOffset_ = value;
+          }
+        }
+
+        /// <summary>Field number for the "starting_code" field.</summary>
+        public const int StartingCodeFieldNumber = 21;
+        private uint startingCode_;
+        [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+        [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+        public uint StartingCode {
+          get { return startingCode_; }
+          set {
+            startingCode_ = value;
+          }
+        }
+
+        /// <summary>Field number for the "starting_name" field.</summary>
+        public const int StartingNameFieldNumber = 22;
+        private uint startingName_;
+        [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+        [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+        public uint StartingName {
+          get { return startingName_; }
+          set {
+            startingName_ = value;
+          }
+        }
+
+        /// <summary>Field number for the "starting_ssm" field.</summary>
+        public const int StartingSsmFieldNumber = 23;
+        private uint startingSsm_;
+        /// <summary>
+        /// Unset when the first stop of the trip has no time
+        /// </summary>
+        [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+        [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+        public uint StartingSsm {
+          get { if ((_hasBits0 & 1) != 0) { return startingSsm_; } else { return 0; } }
+          set {
+            _hasBits0 |= 1;
+            startingSsm_ = value;
+          }
+        }
+        /// <summary>Gets whether the "starting_ssm" field is set</summary>
+        [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+        [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+        public bool HasStartingSsm {
+          get { return (_hasBits0 & 1) != 0; }
+        }
+        /// <summary>Clears the value of the "starting_ssm" field</summary>
+        [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+        [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+        public void ClearStartingSsm() {
+          _hasBits0 &= ~1;
+        }
+
+        /// <summary>Field number for the "calling_ssm" field.</summary>
+        public const int CallingSsmFieldNumber = 34;
+        private uint callingSsm_;
+        [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+        [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+        public uint CallingSsm {
+          get { return callingSsm_; }
+          set {
+            callingSsm_ = value;
+          }
+        }
+
+        /// <summary>Field number for the "terminus_code" field.</summary>
+        public const int TerminusCodeFieldNumber = 41;
+        private uint terminusCode_;
+        [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+        [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+        public uint TerminusCode {
+          get { return terminusCode_; }
+          set {
+            terminusCode_ = value;
+          }
+        }
+
+        /// <summary>Field number for the "terminus_name" field.</summary>
+        public const int TerminusNameFieldNumber = 42;
+        private uint terminusName_;
+        [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+        [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+        public uint TerminusName {
+          get { return terminusName_; }
+          set {
+            terminusName_ = value;
+          }
+        }
+
+        /// <summary>Field number for the "terminus_ssm" field.</summary>
+        public const int TerminusSsmFieldNumber = 43;
+        private uint terminusSsm_;
+        /// <summary>
+        /// Unset when the last stop of the trip has no time
+        /// </summary>
+        [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+        [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+        public uint TerminusSsm {
+          get { if ((_hasBits0 & 2) != 0) { return terminusSsm_; } else { return 0; } }
+          set {
+            _hasBits0 |= 2;
+            terminusSsm_ = value;
+          }
+        }
+        /// <summary>Gets whether the "terminus_ssm" field is set</summary>
+        [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+        [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+        public bool HasTerminusSsm {
+          get { return (_hasBits0 & 2) != 0; }
+        }
+        /// <summary>Clears the value of the "terminus_ssm" field</summary>
+        [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+        [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+        public void ClearTerminusSsm() {
+          _hasBits0 &= ~2;
+        }
+
+        /// <summary>Field number for the "previous_trip_shape_id" field.</summary>
+        public const int PreviousTripShapeIdFieldNumber = 51;
+        private uint previousTripShapeId_;
+        [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+        [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+        public uint PreviousTripShapeId {
+          get { return previousTripShapeId_; }
+          set {
+            previousTripShapeId_ = value;
+          }
+        }
+
+        [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+        [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+        public override bool Equals(object other) {
+          return Equals(other as ScheduledArrival);
+        }
+
+        [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+        [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+        public bool Equals(ScheduledArrival other) {
+          if (ReferenceEquals(other, null)) {
+            return false;
+          }
+          if (ReferenceEquals(other, this)) {
+            return true;
+          }
+          if (ServiceId != other.ServiceId) return false;
+          if (TripId != other.TripId) return false;
+          if (Line != other.Line) return false;
+          if (Route != other.Route) return false;
+          if (ShapeId != other.ShapeId) return false;
+          if (!pbc::ProtobufEqualityComparers.BitwiseDoubleEqualityComparer.Equals(ShapeDistTraveled, other.ShapeDistTraveled)) return false;
+          if (StopSequence != other.StopSequence) return false;
+          if (StreetSequence != other.StreetSequence) return false;
+          if (NextStreetsOffset != other.NextStreetsOffset) return false;
+          if (StartingCode != other.StartingCode) return false;
+          if (StartingName != other.StartingName) return false;
+          if (StartingSsm != other.StartingSsm) return false;
+          if (CallingSsm != other.CallingSsm) return false;
+          if (TerminusCode != other.TerminusCode) return false;
+          if (TerminusName != other.TerminusName) return false;
+          if (TerminusSsm != other.TerminusSsm) return false;
+          if (PreviousTripShapeId != other.PreviousTripShapeId) return false;
+          return Equals(_unknownFields, other._unknownFields);
+        }
+
+        [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+        [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+        public override int GetHashCode() {
+          int hash = 1;
+          if (ServiceId != 0) hash ^= ServiceId.GetHashCode();
+          if (TripId != 0) hash ^= TripId.GetHashCode();
+          if (Line != 0) hash ^= Line.GetHashCode();
+          if (Route != 0) hash ^= Route.GetHashCode();
+          if (ShapeId != 0) hash ^= ShapeId.GetHashCode();
+          if (ShapeDistTraveled != 0D) hash ^= pbc::ProtobufEqualityComparers.BitwiseDoubleEqualityComparer.GetHashCode(ShapeDistTraveled);
+          if (StopSequence != 0) hash ^= StopSequence.GetHashCode();
+          if (StreetSequence != 0) hash ^= StreetSequence.GetHashCode();
+          if (NextStreetsOffset != 0) hash ^= NextStreetsOffset.GetHashCode();
+          if (StartingCode != 0) hash ^= StartingCode.GetHashCode();
+          if (StartingName != 0) hash ^= StartingName.GetHashCode();
+          if (HasStartingSsm) hash ^= StartingSsm.GetHashCode();
+          if (CallingSsm != 0) hash ^= CallingSsm.GetHashCode();
+          if (TerminusCode != 0) hash ^= TerminusCode.GetHashCode();
+          if (TerminusName != 0) hash ^= TerminusName.GetHashCode();
+          if (HasTerminusSsm) hash ^= TerminusSsm.GetHashCode();
+          if (PreviousTripShapeId != 0) hash ^= PreviousTripShapeId.GetHashCode();
+          if (_unknownFields != null) {
+            hash ^= _unknownFields.GetHashCode();
+          }
+          return hash;
+        }
+
+        [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+        [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+        public override string ToString() {
+          return pb::JsonFormatter.ToDiagnosticString(this);
+        }
+
+        [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+        [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+        public void WriteTo(pb::CodedOutputStream output) {
+        #if !GOOGLE_PROTOBUF_REFSTRUCT_COMPATIBILITY_MODE
+          output.WriteRawMessage(this);
+        #else
+          if (ServiceId != 0) {
+            output.WriteRawTag(8);
+            output.WriteUInt32(ServiceId);
+          }
+          if (TripId != 0) {
+            output.WriteRawTag(16);
+            output.WriteUInt32(TripId);
+          }
+          if (Line != 0) {
+            output.WriteRawTag(24);
+            output.WriteUInt32(Line);
+          }
+          if (Route != 0) {
+            output.WriteRawTag(32);
+            output.WriteUInt32(Route);
+          }
+          if (ShapeId != 0) {
+            output.WriteRawTag(40);
+            output.WriteUInt32(ShapeId);
+          }
+          if (ShapeDistTraveled != 0D) {
+            output.WriteRawTag(49);
+            output.WriteDouble(ShapeDistTraveled);
+          }
+          if (StopSequence != 0) {
+            output.WriteRawTag(88);
+            output.WriteUInt32(StopSequence);
+          }
+          if (StreetSequence != 0) {
+            output.WriteRawTag(96);
+            output.WriteUInt32(StreetSequence);
+          }
+          if (NextStreetsOffset != 0) {
+            output.WriteRawTag(104);
+            output.WriteUInt32(NextStreetsOffset);
+          }
+          if (StartingCode != 0) {
+            output.WriteRawTag(168, 1);
+            output.WriteUInt32(StartingCode);
+          }
+          if (StartingName != 0) {
+            output.WriteRawTag(176, 1);
+            output.WriteUInt32(StartingName);
+          }
+          if (HasStartingSsm) {
+            output.WriteRawTag(184, 1);
+            output.WriteUInt32(StartingSsm);
+          }
+          if (CallingSsm != 0) {
+            output.WriteRawTag(144, 2);
+            output.WriteUInt32(CallingSsm);
+          }
+          if (TerminusCode != 0) {
+            output.WriteRawTag(200, 2);
+            output.WriteUInt32(TerminusCode);
+          }
+          if (TerminusName != 0) {
+            output.WriteRawTag(208, 2);
+            output.WriteUInt32(TerminusName);
+          }
+          if (HasTerminusSsm) {
+            output.WriteRawTag(216, 2);
+            output.WriteUInt32(TerminusSsm);
+          }
+          if (PreviousTripShapeId != 0) {
+            output.WriteRawTag(152, 3);
+            output.WriteUInt32(PreviousTripShapeId);
+          }
+          if (_unknownFields != null) {
+            _unknownFields.WriteTo(output);
+          }
+        #endif
+        }
+
+        #if !GOOGLE_PROTOBUF_REFSTRUCT_COMPATIBILITY_MODE
+        [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+        [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+        void pb::IBufferMessage.InternalWriteTo(ref pb::WriteContext output) {
+          if (ServiceId != 0) {
+            output.WriteRawTag(8);
+            output.WriteUInt32(ServiceId);
+          }
+          if (TripId != 0) {
+            output.WriteRawTag(16);
+            output.WriteUInt32(TripId);
+          }
+          if (Line != 0) {
+            output.WriteRawTag(24);
+            output.WriteUInt32(Line);
+          }
+          if (Route != 0) {
+            output.WriteRawTag(32);
+            output.WriteUInt32(Route);
+          }
+          if (ShapeId != 0) {
+            output.WriteRawTag(40);
+            output.WriteUInt32(ShapeId);
+          }
+          if (ShapeDistTraveled != 0D) {
+            output.WriteRawTag(49);
+            output.WriteDouble(ShapeDistTraveled);
+          }
+          if (StopSequence != 0) {
+            output.WriteRawTag(88);
+            output.WriteUInt32(StopSequence);
+          }
+          if (StreetSequence != 0) {
+            output.WriteRawTag(96);
+            output.WriteUInt32(StreetSequence);
+          }
+          if (NextStreetsOffset != 0) {
+            output.WriteRawTag(104);
+            output.WriteUInt32(NextStreetsOffset);
+          }
+          if (StartingCode != 0) {
+            output.WriteRawTag(168, 1);
+            output.WriteUInt32(StartingCode);
+          }
+          if (StartingName != 0) {
+            output.WriteRawTag(176, 1);
+            output.WriteUInt32(StartingName);
+          }
+          if (HasStartingSsm) {
+            output.WriteRawTag(184, 1);
+            output.WriteUInt32(StartingSsm);
+          }
+          if (CallingSsm != 0) {
+            output.WriteRawTag(144, 2);
+            output.WriteUInt32(CallingSsm);
+          }
+          if (TerminusCode != 0) {
+            output.WriteRawTag(200, 2);
+            output.WriteUInt32(TerminusCode);
+          }
+          if (TerminusName != 0) {
+            output.WriteRawTag(208, 2);
+            output.WriteUInt32(TerminusName);
+          }
+          if (HasTerminusSsm) {
+            output.WriteRawTag(216, 2);
+            output.WriteUInt32(TerminusSsm);
+          }
+          if (PreviousTripShapeId != 0) {
+            output.WriteRawTag(152, 3);
+            output.WriteUInt32(PreviousTripShapeId);
+          }
+          if (_unknownFields != null) {
+            _unknownFields.WriteTo(ref output);
+          }
+        }
+        #endif
+
+        [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+        [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+        public int CalculateSize() {
+          int size = 0;
+          if (ServiceId != 0) {
+            size += 1 + pb::CodedOutputStream.ComputeUInt32Size(ServiceId);
+          }
+          if (TripId != 0) {
+            size += 1 + pb::CodedOutputStream.ComputeUInt32Size(TripId);
+          }
+          if (Line != 0) {
+            size += 1 + pb::CodedOutputStream.ComputeUInt32Size(Line);
+          }
+          if (Route != 0) {
+            size += 1 + pb::CodedOutputStream.ComputeUInt32Size(Route);
+          }
+          if (ShapeId != 0) {
+            size += 1 + pb::CodedOutputStream.ComputeUInt32Size(ShapeId);
+          }
+          if (ShapeDistTraveled != 0D) {
+            size += 1 + 8;
+          }
+          if (StopSequence != 0) {
+            size += 1 + pb::CodedOutputStream.ComputeUInt32Size(StopSequence);
+          }
+          if (StreetSequence != 0) {
+            size += 1 + pb::CodedOutputStream.ComputeUInt32Size(StreetSequence);
+          }
+          if (NextStreetsOffset != 0) {
+            size += 1 + pb::CodedOutputStream.ComputeUInt32Size(NextStreetsOffset);
+          }
+          if (StartingCode != 0) {
+            size += 2 + pb::CodedOutputStream.ComputeUInt32Size(StartingCode);
+          }
+          if (StartingName != 0) {
+            size += 2 + pb::CodedOutputStream.ComputeUInt32Size(StartingName);
+          }
+          if (HasStartingSsm) {
+            size += 2 + pb::CodedOutputStream.ComputeUInt32Size(StartingSsm);
+          }
+          if (CallingSsm != 0) {
+            size += 2 + pb::CodedOutputStream.ComputeUInt32Size(CallingSsm);
+          }
+          if (TerminusCode != 0) {
+            size += 2 + pb::CodedOutputStream.ComputeUInt32Size(TerminusCode);
+          }
+          if (TerminusName != 0) {
+            size += 2 + pb::CodedOutputStream.ComputeUInt32Size(TerminusName);
+          }
+          if (HasTerminusSsm) {
+            size += 2 + pb::CodedOutputStream.ComputeUInt32Size(TerminusSsm);
+          }
+          if (PreviousTripShapeId != 0) {
+            size += 2 + pb::CodedOutputStream.ComputeUInt32Size(PreviousTripShapeId);
+          }
+          if (_unknownFields != null) {
+            size += _unknownFields.CalculateSize();
+          }
+          return size;
+        }
+
+        [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+        [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+        public void MergeFrom(ScheduledArrival other) {
+          if (other == null) {
+            return;
+          }
+          if (other.ServiceId != 0) {
+            ServiceId = other.ServiceId;
+          }
+          if (other.TripId != 0) {
+            TripId = other.TripId;
+          }
+          if (other.Line != 0) {
+            Line = other.Line;
+          }
+          if (other.Route != 0) {
+            Route = other.Route;
+          }
+          if (other.ShapeId != 0) {
+            ShapeId = other.ShapeId;
+          }
+          if (other.ShapeDistTraveled != 0D) {
+            ShapeDistTraveled = other.ShapeDistTraveled;
+          }
+          if (other.StopSequence != 0) {
+            StopSequence = other.StopSequence;
+          }
+          if (other.StreetSequence != 0) {
+            StreetSequence = other.StreetSequence;
+          }
+          if (other.NextStreetsOffset != 0) {
+            NextStreetsOffset = other.NextStreetsOffset;
+          }
+          if (other.StartingCode != 0) {
+            StartingCode = other.StartingCode;
+          }
+          if (other.StartingName != 0) {
+            StartingName = other.StartingName;
+          }
+          if (other.HasStartingSsm) {
+            StartingSsm = other.StartingSsm;
+          }
+          if (other.CallingSsm != 0) {
+            CallingSsm = other.CallingSsm;
+          }
+          if (other.TerminusCode != 0) {
+            TerminusCode = other.TerminusCode;
+          }
+          if (other.TerminusName != 0) {
+            TerminusName = other.TerminusName;
+          }
+          if (other.HasTerminusSsm) {
+            TerminusSsm = other.TerminusSsm;
+          }
+          if (other.PreviousTripShapeId != 0) {
+            PreviousTripShapeId = other.PreviousTripShapeId;
+          }
+          _unknownFields = pb::UnknownFieldSet.MergeFrom(_unknownFields, other._unknownFields);
+        }
+
+        [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+        [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+        public void MergeFrom(pb::CodedInputStream input) {
+        #if !GOOGLE_PROTOBUF_REFSTRUCT_COMPATIBILITY_MODE
+          input.ReadRawMessage(this);
+        #else
+          uint tag;
+          while ((tag = input.ReadTag()) != 0) {
+            switch(tag) {
+              default:
+                _unknownFields = pb::UnknownFieldSet.MergeFieldFrom(_unknownFields, input);
+                break;
+              case 8: {
+                ServiceId = input.ReadUInt32();
+                break;
+              }
+              case 16: {
+                TripId = input.ReadUInt32();
+                break;
+              }
+              case 24: {
+                Line = input.ReadUInt32();
+                break;
+              }
+              case 32: {
+                Route = input.ReadUInt32();
+                break;
+              }
+              case 40: {
+                ShapeId = input.ReadUInt32();
+                break;
+              }
+              case 49: {
+                ShapeDistTraveled = input.ReadDouble();
+                break;
+              }
+              case 88: {
+                StopSequence = input.ReadUInt32();
+                break;
+              }
+              case 96: {
+                StreetSequence = input.ReadUInt32();
+                break;
+              }
+              case 104: {
+                NextStreetsOffset = input.ReadUInt32();
+                break;
+              }
+              case 168: {
+                StartingCode = input.ReadUInt32();
+                break;
+              }
+              case 176: {
+                StartingName = input.ReadUInt32();
+                break;
+              }
+              case 184: {
+                StartingSsm = input.ReadUInt32();
+                break;
+              }
+              case 272: {
+                CallingSsm = input.ReadUInt32();
+                break;
+              }
+              case 328: {
+                TerminusCode = input.ReadUInt32();
+                break;
+              }
+              case 336: {
+                TerminusName = input.ReadUInt32();
+                break;
+              }
+              case 344: {
+                TerminusSsm = input.ReadUInt32();
+                break;
+              }
+              case 408: {
+                PreviousTripShapeId = input.ReadUInt32();
+                break;
+              }
+            }
+          }
+        #endif
+        }
+
+        #if !GOOGLE_PROTOBUF_REFSTRUCT_COMPATIBILITY_MODE
+        [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+        [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+        void pb::IBufferMessage.InternalMergeFrom(ref pb::ParseContext input) {
+          uint tag;
+          while ((tag = input.ReadTag()) != 0) {
+            switch(tag) {
+              default:
+                _unknownFields = pb::UnknownFieldSet.MergeFieldFrom(_unknownFields, ref input);
+                break;
+              case 8: {
+                ServiceId = input.ReadUInt32();
+                break;
+              }
+              case 16: {
+                TripId = input.ReadUInt32();
+                break;
+              }
+              case 24: {
+                Line = input.ReadUInt32();
+                break;
+              }
+              case 32: {
+                Route = input.ReadUInt32();
+                break;
+              }
+              case 40: {
+                ShapeId = input.ReadUInt32();
+                break;
+              }
+              case 49: {
+                ShapeDistTraveled = input.ReadDouble();
+                break;
+              }
+              case 88: {
+                StopSequence = input.ReadUInt32();
+                break;
+              }
+              case 96: {
+                StreetSequence = input.ReadUInt32();
+                break;
+              }
+              case 104: {
+                NextStreetsOffset = input.ReadUInt32();
+                break;
+              }
+              case 168: {
+                StartingCode = input.ReadUInt32();
+                break;
+              }
+              case 176: {
+                StartingName = input.ReadUInt32();
+                break;
+              }
+              case 184: {
+                StartingSsm = input.ReadUInt32();
+                break;
+              }
+              case 272: {
+                CallingSsm = input.ReadUInt32();
+                break;
+              }
+              case 328: {
+                TerminusCode = input.ReadUInt32();
+                break;
+              }
+              case 336: {
+                TerminusName = input.ReadUInt32();
+                break;
+              }
+              case 344: {
+                TerminusSsm = input.ReadUInt32();
+                break;
+              }
+              case 408: {
+                PreviousTripShapeId = input.ReadUInt32();
+                break;
+              }
+            }
+          }
+        }
+        #endif
+
+      }
+
+    }
+    #endregion
+
+  }
+
   public sealed partial class Shape : pb::IMessage<Shape>
   #if !GOOGLE_PROTOBUF_REFSTRUCT_COMPATIBILITY_MODE
       , pb::IBufferMessage
   #endif
   {
-    private static readonly pb::MessageParser<Shape> _parser = new pb::MessageParser<Shape>(() => new Shape());
+    private static readonly pb::MessageParser<Shape> _parser = new pb::MessageParser<Shape>(() => new Shape());
+    private pb::UnknownFieldSet _unknownFields;
+    [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+    [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+    public static pb::MessageParser<Shape> Parser { get { return _parser; } }
+
+    [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+    [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+    public static pbr::MessageDescriptor Descriptor {
+      get { return global::Costasdev.Busurbano.Backend.Types.StopScheduleReflection.Descriptor.MessageTypes[3]; }
+    }
+
+    [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+    [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+    pbr::MessageDescriptor pb::IMessage.Descriptor {
+      get { return Descriptor; }
+    }
+
+    [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+    [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+    public Shape() {
+      OnConstruction();
+    }
+
+    partial void OnConstruction();
+
+    [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+    [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+    public Shape(Shape other) : this() {
+      shapeId_ = other.shapeId_;
+      points_ = other.points_.Clone();
+      _unknownFields = pb::UnknownFieldSet.Clone(other._unknownFields);
+    }
+
+    [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+    [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+    public Shape Clone() {
+      return new Shape(this);
+    }
+
+    /// <summary>Field number for the "shape_id" field.</summary>
+    public const int ShapeIdFieldNumber = 1;
+    private string shapeId_ = "";
+    [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+    [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+    public string ShapeId {
+      get { return shapeId_; }
+      set {
+        shapeId_ = pb::ProtoPreconditions.CheckNotNull(value, "value");
+      }
+    }
+
+    /// <summary>Field number for the "points" field.</summary>
+    public const int PointsFieldNumber = 3;
+    private static readonly pb::FieldCodec<global::Costasdev.Busurbano.Backend.Types.Epsg25829> _repeated_points_codec
+        = pb::FieldCodec.ForMessage(26, global::Costasdev.Busurbano.Backend.Types.Epsg25829.Parser);
+    private readonly pbc::RepeatedField<global::Costasdev.Busurbano.Backend.Types.Epsg25829> points_ = new pbc::RepeatedField<global::Costasdev.Busurbano.Backend.Types.Epsg25829>();
+    [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+    [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+    public pbc::RepeatedField<global::Costasdev.Busurbano.Backend.Types.Epsg25829> Points {
+      get { return points_; }
+    }
+
+    [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+    [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+    public override bool Equals(object other) {
+      return Equals(other as Shape);
+    }
+
+    [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+    [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+    public bool Equals(Shape other) {
+      if (ReferenceEquals(other, null)) {
+        return false;
+      }
+      if (ReferenceEquals(other, this)) {
+        return true;
+      }
+      if (ShapeId != other.ShapeId) return false;
+      if(!points_.Equals(other.points_)) return false;
+      return Equals(_unknownFields, other._unknownFields);
+    }
+
+    [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+    [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+    public override int GetHashCode() {
+      int hash = 1;
+      if (ShapeId.Length != 0) hash ^= ShapeId.GetHashCode();
+      hash ^= points_.GetHashCode();
+      if (_unknownFields != null) {
+        hash ^= _unknownFields.GetHashCode();
+      }
+      return hash;
+    }
+
+    [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+    [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+    public override string ToString() {
+      return pb::JsonFormatter.ToDiagnosticString(this);
+    }
+
+    [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+    [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+    public void WriteTo(pb::CodedOutputStream output) {
+    #if !GOOGLE_PROTOBUF_REFSTRUCT_COMPATIBILITY_MODE
+      output.WriteRawMessage(this);
+    #else
+      if (ShapeId.Length != 0) {
+        output.WriteRawTag(10);
+        output.WriteString(ShapeId);
+      }
+      points_.WriteTo(output, _repeated_points_codec);
+      if (_unknownFields != null) {
+        _unknownFields.WriteTo(output);
+      }
+    #endif
+    }
+
+    #if !GOOGLE_PROTOBUF_REFSTRUCT_COMPATIBILITY_MODE
+    [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+    [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+    void pb::IBufferMessage.InternalWriteTo(ref pb::WriteContext output) {
+      if (ShapeId.Length != 0) {
+        output.WriteRawTag(10);
+        output.WriteString(ShapeId);
+      }
+      points_.WriteTo(ref output, _repeated_points_codec);
+      if (_unknownFields != null) {
+        _unknownFields.WriteTo(ref output);
+      }
+    }
+    #endif
+
+    [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+    [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+    public int CalculateSize() {
+      int size = 0;
+      if (ShapeId.Length != 0) {
+        size += 1 + pb::CodedOutputStream.ComputeStringSize(ShapeId);
+      }
+      size += points_.CalculateSize(_repeated_points_codec);
+      if (_unknownFields != null) {
+        size += _unknownFields.CalculateSize();
+      }
+      return size;
+    }
+
+    [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+    [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+    public void MergeFrom(Shape other) {
+      if (other == null) {
+        return;
+      }
+      if (other.ShapeId.Length != 0) {
+        ShapeId = other.ShapeId;
+      }
+      points_.Add(other.points_);
+      _unknownFields = pb::UnknownFieldSet.MergeFrom(_unknownFields, other._unknownFields);
+    }
+
+    [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+    [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+    public void MergeFrom(pb::CodedInputStream input) {
+    #if !GOOGLE_PROTOBUF_REFSTRUCT_COMPATIBILITY_MODE
+      input.ReadRawMessage(this);
+    #else
+      uint tag;
+      while ((tag = input.ReadTag()) != 0) {
+        switch(tag) {
+          default:
+            _unknownFields = pb::UnknownFieldSet.MergeFieldFrom(_unknownFields, input);
+            break;
+          case 10: {
+            ShapeId = input.ReadString();
+            break;
+          }
+          case 26: {
+            points_.AddEntriesFrom(input, _repeated_points_codec);
+            break;
+          }
+        }
+      }
+    #endif
+    }
+
+    #if !GOOGLE_PROTOBUF_REFSTRUCT_COMPATIBILITY_MODE
+    [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+    [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+    void pb::IBufferMessage.InternalMergeFrom(ref pb::ParseContext input) {
+      uint tag;
+      while ((tag = input.ReadTag()) != 0) {
+        switch(tag) {
+          default:
+            _unknownFields = pb::UnknownFieldSet.MergeFieldFrom(_unknownFields, ref input);
+            break;
+          case 10: {
+            ShapeId = input.ReadString();
+            break;
+          }
+          case 26: {
+            points_.AddEntriesFrom(ref input, _repeated_points_codec);
+            break;
+          }
+        }
+      }
+    }
+    #endif
+
+  }
+
+  /// <summary>
+  /// Compact version of Shape. Coordinates are EPSG:25829 integer centimetres, each
+  /// point stored as the difference from the previous point of the same level, the
+  /// first one from (0, 0).
+  /// </summary>
+  public sealed partial class CompactShape : pb::IMessage<CompactShape>
+  #if !GOOGLE_PROTOBUF_REFSTRUCT_COMPATIBILITY_MODE
+      , pb::IBufferMessage
+  #endif
+  {
+    private static readonly pb::MessageParser<CompactShape> _parser = new pb::MessageParser<CompactShape>(() => new CompactShape());
+    private pb::UnknownFieldSet _unknownFields;
+    [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+    [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+    public static pb::MessageParser<CompactShape> Parser { get { return _parser; } }
+
+    [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+    [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+    public static pbr::MessageDescriptor Descriptor {
+      get { return global::Costasdev.Busurbano.Backend.Types.StopScheduleReflection.Descriptor.MessageTypes[4]; }
+    }
+
+    [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+    [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+    pbr::MessageDescriptor pb::IMessage.Descriptor {
+      get { return Descriptor; }
+    }
+
+    [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+    [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+    public CompactShape() {
+      OnConstruction();
+    }
+
+    partial void OnConstruction();
+
+    [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+    [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+    public CompactShape(CompactShape other) : this() {
+      shapeId_ = other.shapeId_;
+      levels_ = other.levels_.Clone();
+      _unknownFields = pb::UnknownFieldSet.Clone(other._unknownFields);
+    }
+
+    [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+    [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+    public CompactShape Clone() {
+      return new CompactShape(this);
+    }
+
+    /// <summary>Field number for the "shape_id" field.</summary>
+    public const int ShapeIdFieldNumber = 1;
+    private string shapeId_ = "";
+    [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+    [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+    public string ShapeId {
+      get { return shapeId_; }
+      set {
+        shapeId_ = pb::ProtoPreconditions.CheckNotNull(value, "value");
+      }
+    }
+
+    /// <summary>Field number for the "levels" field.</summary>
+    public const int LevelsFieldNumber = 3;
+    private static readonly pb::FieldCodec<global::Costasdev.Busurbano.Backend.Types.CompactShape.Types.Level> _repeated_levels_codec
+        = pb::FieldCodec.ForMessage(26, global::Costasdev.Busurbano.Backend.Types.CompactShape.Types.Level.Parser);
+    private readonly pbc::RepeatedField<global::Costasdev.Busurbano.Backend.Types.CompactShape.Types.Level> levels_ = new pbc::RepeatedField<global::Costasdev.Busurbano.Backend.Types.CompactShape.Types.Level>();
+    /// <summary>
+    /// Sorted by tolerance, starting with the full resolution shape
+    /// </summary>
+    [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+    [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+    public pbc::RepeatedField<global::Costasdev.Busurbano.Backend.Types.CompactShape.Types.Level> Levels {
+      get { return levels_; }
+    }
+
+    [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+    [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+    public override bool Equals(object other) {
+      return Equals(other as CompactShape);
+    }
+
+    [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+    [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+    public bool Equals(CompactShape other) {
+      if (ReferenceEquals(other, null)) {
+        return false;
+      }
+      if (ReferenceEquals(other, this)) {
+        return true;
+      }
+      if (ShapeId != other.ShapeId) return false;
+      if(!levels_.Equals(other.levels_)) return false;
+      return Equals(_unknownFields, other._unknownFields);
+    }
+
+    [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+    [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+    public override int GetHashCode() {
+      int hash = 1;
+      if (ShapeId.Length != 0) hash ^= ShapeId.GetHashCode();
+      hash ^= levels_.GetHashCode();
+      if (_unknownFields != null) {
+        hash ^= _unknownFields.GetHashCode();
+      }
+      return hash;
+    }
+
+    [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+    [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+    public override string ToString() {
+      return pb::JsonFormatter.ToDiagnosticString(this);
+    }
+
+    [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+    [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+    public void WriteTo(pb::CodedOutputStream output) {
+    #if !GOOGLE_PROTOBUF_REFSTRUCT_COMPATIBILITY_MODE
+      output.WriteRawMessage(this);
+    #else
+      if (ShapeId.Length != 0) {
+        output.WriteRawTag(10);
+        output.WriteString(ShapeId);
+      }
+      levels_.WriteTo(output, _repeated_levels_codec);
+      if (_unknownFields != null) {
+        _unknownFields.WriteTo(output);
+      }
+    #endif
+    }
+
+    #if !GOOGLE_PROTOBUF_REFSTRUCT_COMPATIBILITY_MODE
+    [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+    [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+    void pb::IBufferMessage.InternalWriteTo(ref pb::WriteContext output) {
+      if (ShapeId.Length != 0) {
+        output.WriteRawTag(10);
+        output.WriteString(ShapeId);
+      }
+      levels_.WriteTo(ref output, _repeated_levels_codec);
+      if (_unknownFields != null) {
+        _unknownFields.WriteTo(ref output);
+      }
+    }
+    #endif
+
+    [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+    [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+    public int CalculateSize() {
+      int size = 0;
+      if (ShapeId.Length != 0) {
+        size += 1 + pb::CodedOutputStream.ComputeStringSize(ShapeId);
+      }
+      size += levels_.CalculateSize(_repeated_levels_codec);
+      if (_unknownFields != null) {
+        size += _unknownFields.CalculateSize();
+      }
+      return size;
+    }
+
+    [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+    [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+    public void MergeFrom(CompactShape other) {
+      if (other == null) {
+        return;
+      }
+      if (other.ShapeId.Length != 0) {
+        ShapeId = other.ShapeId;
+      }
+      levels_.Add(other.levels_);
+      _unknownFields = pb::UnknownFieldSet.MergeFrom(_unknownFields, other._unknownFields);
+    }
+
+    [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+    [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+    public void MergeFrom(pb::CodedInputStream input) {
+    #if !GOOGLE_PROTOBUF_REFSTRUCT_COMPATIBILITY_MODE
+      input.ReadRawMessage(this);
+    #else
+      uint tag;
+      while ((tag = input.ReadTag()) != 0) {
+        switch(tag) {
+          default:
+            _unknownFields = pb::UnknownFieldSet.MergeFieldFrom(_unknownFields, input);
+            break;
+          case 10: {
+            ShapeId = input.ReadString();
+            break;
+          }
+          case 26: {
+            levels_.AddEntriesFrom(input, _repeated_levels_codec);
+            break;
+          }
+        }
+      }
+    #endif
+    }
+
+    #if !GOOGLE_PROTOBUF_REFSTRUCT_COMPATIBILITY_MODE
+    [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+    [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+    void pb::IBufferMessage.InternalMergeFrom(ref pb::ParseContext input) {
+      uint tag;
+      while ((tag = input.ReadTag()) != 0) {
+        switch(tag) {
+          default:
+            _unknownFields = pb::UnknownFieldSet.MergeFieldFrom(_unknownFields, ref input);
+            break;
+          case 10: {
+            ShapeId = input.ReadString();
+            break;
+          }
+          case 26: {
+            levels_.AddEntriesFrom(ref input, _repeated_levels_codec);
+            break;
+          }
+        }
+      }
+    }
+    #endif
+
+    #region Nested types
+    /// <summary>Container for nested types declared in the CompactShape message type.</summary>
+    [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+    [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+    public static partial class Types {
+      public sealed partial class Level : pb::IMessage<Level>
+      #if !GOOGLE_PROTOBUF_REFSTRUCT_COMPATIBILITY_MODE
+          , pb::IBufferMessage
+      #endif
+      {
+        private static readonly pb::MessageParser<Level> _parser = new pb::MessageParser<Level>(() => new Level());
+        private pb::UnknownFieldSet _unknownFields;
+        [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+        [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+        public static pb::MessageParser<Level> Parser { get { return _parser; } }
+
+        [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+        [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+        public static pbr::MessageDescriptor Descriptor {
+          get { return global::Costasdev.Busurbano.Backend.Types.CompactShape.Descriptor.NestedTypes[0]; }
+        }
+
+        [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+        [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+        pbr::MessageDescriptor pb::IMessage.Descriptor {
+          get { return Descriptor; }
+        }
+
+        [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+        [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+        public Level() {
+          OnConstruction();
+        }
+
+        partial void OnConstruction();
+
+        [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+        [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+        public Level(Level other) : this() {
+          tolerance_ = other.tolerance_;
+          dx_ = other.dx_.Clone();
+          dy_ = other.dy_.Clone();
+          _unknownFields = pb::UnknownFieldSet.Clone(other._unknownFields);
+        }
+
+        [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+        [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+        public Level Clone() {
+          return new Level(this);
+        }
+
+        /// <summary>Field number for the "tolerance" field.</summary>
+        public const int ToleranceFieldNumber = 1;
+        private double tolerance_;
+        /// <summary>
+        /// Douglas-Peucker tolerance in metres, 0 for the full resolution shape
+        /// </summary>
+        [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+        [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+        public double Tolerance {
+          get { return tolerance_; }
+          set {
+            tolerance_ = value;
+          }
+        }
+
+        /// <summary>Field number for the "dx" field.</summary>
+        public const int DxFieldNumber = 2;
+        private static readonly pb::FieldCodec<int> _repeated_dx_codec
+            = pb::FieldCodec.ForSInt32(18);
+        private readonly pbc::RepeatedField<int> dx_ = new pbc::RepeatedField<int>();
+        [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+        [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+        public pbc::RepeatedField<int> Dx {
+          get { return dx_; }
+        }
+
+        /// <summary>Field number for the "dy" field.</summary>
+        public const int DyFieldNumber = 3;
+        private static readonly pb::FieldCodec<int> _repeated_dy_codec
+            = pb::FieldCodec.ForSInt32(26);
+        private readonly pbc::RepeatedField<int> dy_ = new pbc::RepeatedField<int>();
+        [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+        [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+        public pbc::RepeatedField<int> Dy {
+          get { return dy_; }
+        }
+
+        [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+        [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+        public override bool Equals(object other) {
+          return Equals(other as Level);
+        }
+
+        [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+        [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+        public bool Equals(Level other) {
+          if (ReferenceEquals(other, null)) {
+            return false;
+          }
+          if (ReferenceEquals(other, this)) {
+            return true;
+          }
+          if (!pbc::ProtobufEqualityComparers.BitwiseDoubleEqualityComparer.Equals(Tolerance, other.Tolerance)) return false;
+          if(!dx_.Equals(other.dx_)) return false;
+          if(!dy_.Equals(other.dy_)) return false;
+          return Equals(_unknownFields, other._unknownFields);
+        }
+
+        [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+        [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+        public override int GetHashCode() {
+          int hash = 1;
+          if (Tolerance != 0D) hash ^= pbc::ProtobufEqualityComparers.BitwiseDoubleEqualityComparer.GetHashCode(Tolerance);
+          hash ^= dx_.GetHashCode();
+          hash ^= dy_.GetHashCode();
+          if (_unknownFields != null) {
+            hash ^= _unknownFields.GetHashCode();
+          }
+          return hash;
+        }
+
+        [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+        [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+        public override string ToString() {
+          return pb::JsonFormatter.ToDiagnosticString(this);
+        }
+
+        [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+        [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+        public void WriteTo(pb::CodedOutputStream output) {
+        #if !GOOGLE_PROTOBUF_REFSTRUCT_COMPATIBILITY_MODE
+          output.WriteRawMessage(this);
+        #else
+          if (Tolerance != 0D) {
+            output.WriteRawTag(9);
+            output.WriteDouble(Tolerance);
+          }
+          dx_.WriteTo(output, _repeated_dx_codec);
+          dy_.WriteTo(output, _repeated_dy_codec);
+          if (_unknownFields != null) {
+            _unknownFields.WriteTo(output);
+          }
+        #endif
+        }
+
+        #if !GOOGLE_PROTOBUF_REFSTRUCT_COMPATIBILITY_MODE
+        [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+        [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+        void pb::IBufferMessage.InternalWriteTo(ref pb::WriteContext output) {
+          if (Tolerance != 0D) {
+            output.WriteRawTag(9);
+            output.WriteDouble(Tolerance);
+          }
+          dx_.WriteTo(ref output, _repeated_dx_codec);
+          dy_.WriteTo(ref output, _repeated_dy_codec);
+          if (_unknownFields != null) {
+            _unknownFields.WriteTo(ref output);
+          }
+        }
+        #endif
+
+        [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+        [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+        public int CalculateSize() {
+          int size = 0;
+          if (Tolerance != 0D) {
+            size += 1 + 8;
+          }
+          size += dx_.CalculateSize(_repeated_dx_codec);
+          size += dy_.CalculateSize(_repeated_dy_codec);
+          if (_unknownFields != null) {
+            size += _unknownFields.CalculateSize();
+          }
+          return size;
+        }
+
+        [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+        [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+        public void MergeFrom(Level other) {
+          if (other == null) {
+            return;
+          }
+          if (other.Tolerance != 0D) {
+            Tolerance = other.Tolerance;
+          }
+          dx_.Add(other.dx_);
+          dy_.Add(other.dy_);
+          _unknownFields = pb::UnknownFieldSet.MergeFrom(_unknownFields, other._unknownFields);
+        }
+
+        [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+        [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+        public void MergeFrom(pb::CodedInputStream input) {
+        #if !GOOGLE_PROTOBUF_REFSTRUCT_COMPATIBILITY_MODE
+          input.ReadRawMessage(this);
+        #else
+          uint tag;
+          while ((tag = input.ReadTag()) != 0) {
+            switch(tag) {
+              default:
+                _unknownFields = pb::UnknownFieldSet.MergeFieldFrom(_unknownFields, input);
+                break;
+              case 9: {
+                Tolerance = input.ReadDouble();
+                break;
+              }
+              case 18:
+              case 16: {
+                dx_.AddEntriesFrom(input, _repeated_dx_codec);
+                break;
+              }
+              case 26:
+              case 24: {
+                dy_.AddEntriesFrom(input, _repeated_dy_codec);
+                break;
+              }
+            }
+          }
+        #endif
+        }
+
+        #if !GOOGLE_PROTOBUF_REFSTRUCT_COMPATIBILITY_MODE
+        [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+        [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+        void pb::IBufferMessage.InternalMergeFrom(ref pb::ParseContext input) {
+          uint tag;
+          while ((tag = input.ReadTag()) != 0) {
+            switch(tag) {
+              default:
+                _unknownFields = pb::UnknownFieldSet.MergeFieldFrom(_unknownFields, ref input);
+                break;
+              case 9: {
+                Tolerance = input.ReadDouble();
+                break;
+              }
+              case 18:
+              case 16: {
+                dx_.AddEntriesFrom(ref input, _repeated_dx_codec);
+                break;
+              }
+              case 26:
+              case 24: {
+                dy_.AddEntriesFrom(ref input, _repeated_dy_codec);
+                break;
+              }
+            }
+          }
+        }
+        #endif
+
+      }
+
+    }
+    #endregion
+
+  }
+
+  /// <summary>
+  /// Position along a shape of the stops served by the trips that follow it
+  /// </summary>
+  public sealed partial class ShapeStopIndex : pb::IMessage<ShapeStopIndex>
+  #if !GOOGLE_PROTOBUF_REFSTRUCT_COMPATIBILITY_MODE
+      , pb::IBufferMessage
+  #endif
+  {
+    private static readonly pb::MessageParser<ShapeStopIndex> _parser = new pb::MessageParser<ShapeStopIndex>(() => new ShapeStopIndex());
     private pb::UnknownFieldSet _unknownFields;
     [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
     [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
-    public static pb::MessageParser<Shape> Parser { get { return _parser; } }
+    public static pb::MessageParser<ShapeStopIndex> Parser { get { return _parser; } }
 
     [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
     [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
     public static pbr::MessageDescriptor Descriptor {
-      get { return global::Costasdev.Busurbano.Backend.Types.StopScheduleReflection.Descriptor.MessageTypes[2]; }
+      get { return global::Costasdev.Busurbano.Backend.Types.StopScheduleReflection.Descriptor.MessageTypes[5]; }
     }
 
     [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
@@ -1345,7 +3396,7 @@ namespace Costasdev.Busurbano.Backend.Types {
 
     [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
     [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
-    public Shape() {
+    public ShapeStopIndex() {
       OnConstruction();
     }
 
@@ -1353,16 +3404,16 @@ namespace Costasdev.Busurbano.Backend.Types {
 
     [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
     [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
-    public Shape(Shape other) : this() {
+    public ShapeStopIndex(ShapeStopIndex other) : this() {
       shapeId_ = other.shapeId_;
-      points_ = other.points_.Clone();
+      stops_ = other.stops_.Clone();
       _unknownFields = pb::UnknownFieldSet.Clone(other._unknownFields);
     }
 
     [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
     [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
-    public Shape Clone() {
-      return new Shape(this);
+    public ShapeStopIndex Clone() {
+      return new ShapeStopIndex(this);
     }
 
     /// <summary>Field number for the "shape_id" field.</summary>
@@ -1377,26 +3428,29 @@ namespace Costasdev.Busurbano.Backend.Types {
       }
     }
 
-    /// <summary>Field number for the "points" field.</summary>
-    public const int PointsFieldNumber = 3;
-    private static readonly pb::FieldCodec<global::Costasdev.Busurbano.Backend.Types.Epsg25829> _repeated_points_codec
-        = pb::FieldCodec.ForMessage(26, global::Costasdev.Busurbano.Backend.Types.Epsg25829.Parser);
-    private readonly pbc::RepeatedField<global::Costasdev.Busurbano.Backend.Types.Epsg25829> points_ = new pbc::RepeatedField<global::Costasdev.Busurbano.Backend.Types.Epsg25829>();
+    /// <summary>Field number for the "stops" field.</summary>
+    public const int StopsFieldNumber = 3;
+    private static readonly pb::FieldCodec<global::Costasdev.Busurbano.Backend.Types.ShapeStopIndex.Types.StopPosition> _repeated_stops_codec
+        = pb::FieldCodec.ForMessage(26, global::Costasdev.Busurbano.Backend.Types.ShapeStopIndex.Types.StopPosition.Parser);
+    private readonly pbc::RepeatedField<global::Costasdev.Busurbano.Backend.Types.ShapeStopIndex.Types.StopPosition> stops_ = new pbc::RepeatedField<global::Costasdev.Busurbano.Backend.Types.ShapeStopIndex.Types.StopPosition>();
+    /// <summary>
+    /// Sorted by distance
+    /// </summary>
     [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
     [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
-    public pbc::RepeatedField<global::Costasdev.Busurbano.Backend.Types.Epsg25829> Points {
-      get { return points_; }
+    public pbc::RepeatedField<global::Costasdev.Busurbano.Backend.Types.ShapeStopIndex.Types.StopPosition> Stops {
+      get { return stops_; }
     }
 
     [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
     [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
     public override bool Equals(object other) {
-      return Equals(other as Shape);
+      return Equals(other as ShapeStopIndex);
     }
 
     [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
     [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
-    public bool Equals(Shape other) {
+    public bool Equals(ShapeStopIndex other) {
       if (ReferenceEquals(other, null)) {
         return false;
       }
@@ -1404,7 +3458,7 @@ namespace Costasdev.Busurbano.Backend.Types {
         return true;
       }
       if (ShapeId != other.ShapeId) return false;
-      if(!points_.Equals(other.points_)) return false;
+      if(!stops_.Equals(other.stops_)) return false;
       return Equals(_unknownFields, other._unknownFields);
     }
 
@@ -1413,7 +3467,7 @@ namespace Costasdev.Busurbano.Backend.Types {
     public override int GetHashCode() {
       int hash = 1;
       if (ShapeId.Length != 0) hash ^= ShapeId.GetHashCode();
-      hash ^= points_.GetHashCode();
+      hash ^= stops_.GetHashCode();
       if (_unknownFields != null) {
         hash ^= _unknownFields.GetHashCode();
       }
@@ -1436,7 +3490,7 @@ namespace Costasdev.Busurbano.Backend.Types {
         output.WriteRawTag(10);
         output.WriteString(ShapeId);
       }
-      points_.WriteTo(output, _repeated_points_codec);
+      stops_.WriteTo(output, _repeated_stops_codec);
       if (_unknownFields != null) {
         _unknownFields.WriteTo(output);
       }
@@ -1451,7 +3505,7 @@ namespace Costasdev.Busurbano.Backend.Types {
         output.WriteRawTag(10);
         output.WriteString(ShapeId);
       }
-      points_.WriteTo(ref output, _repeated_points_codec);
+      stops_.WriteTo(ref output, _repeated_stops_codec);
       if (_unknownFields != null) {
         _unknownFields.WriteTo(ref output);
       }
@@ -1465,7 +3519,7 @@ namespace Costasdev.Busurbano.Backend.Types {
       if (ShapeId.Length != 0) {
         size += 1 + pb::CodedOutputStream.ComputeStringSize(ShapeId);
       }
-      size += points_.CalculateSize(_repeated_points_codec);
+      size += stops_.CalculateSize(_repeated_stops_codec);
       if (_unknownFields != null) {
         size += _unknownFields.CalculateSize();
       }
@@ -1474,14 +3528,14 @@ namespace Costasdev.Busurbano.Backend.Types {
 
     [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
     [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
-    public void MergeFrom(Shape other) {
+    public void MergeFrom(ShapeStopIndex other) {
       if (other == null) {
         return;
       }
       if (other.ShapeId.Length != 0) {
         ShapeId = other.ShapeId;
       }
-      points_.Add(other.points_);
+      stops_.Add(other.stops_);
       _unknownFields = pb::UnknownFieldSet.MergeFrom(_unknownFields, other._unknownFields);
     }
 
@@ -1502,7 +3556,7 @@ namespace Costasdev.Busurbano.Backend.Types {
             break;
           }
           case 26: {
-            points_.AddEntriesFrom(input, _repeated_points_codec);
+            stops_.AddEntriesFrom(input, _repeated_stops_codec);
             break;
           }
         }
@@ -1525,7 +3579,7 @@ namespace Costasdev.Busurbano.Backend.Types {
             break;
           }
           case 26: {
-            points_.AddEntriesFrom(ref input, _repeated_points_codec);
+            stops_.AddEntriesFrom(ref input, _repeated_stops_codec);
             break;
           }
         }
@@ -1533,6 +3587,284 @@ namespace Costasdev.Busurbano.Backend.Types {
     }
     #endif
 
+    #region Nested types
+    /// <summary>Container for nested types declared in the ShapeStopIndex message type.</summary>
+    [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+    [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+    public static partial class Types {
+      public sealed partial class StopPosition : pb::IMessage<StopPosition>
+      #if !GOOGLE_PROTOBUF_REFSTRUCT_COMPATIBILITY_MODE
+          , pb::IBufferMessage
+      #endif
+      {
+        private static readonly pb::MessageParser<StopPosition> _parser = new pb::MessageParser<StopPosition>(() => new StopPosition());
+        private pb::UnknownFieldSet _unknownFields;
+        [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+        [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+        public static pb::MessageParser<StopPosition> Parser { get { return _parser; } }
+
+        [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+        [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+        public static pbr::MessageDescriptor Descriptor {
+          get { return global::Costasdev.Busurbano.Backend.Types.ShapeStopIndex.Descriptor.NestedTypes[0]; }
+        }
+
+        [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+        [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+        pbr::MessageDescriptor pb::IMessage.Descriptor {
+          get { return Descriptor; }
+        }
+
+        [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+        [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+        public StopPosition() {
+          OnConstruction();
+        }
+
+        partial void OnConstruction();
+
+        [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+        [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+        public StopPosition(StopPosition other) : this() {
+          stopId_ = other.stopId_;
+          segmentIndex_ = other.segmentIndex_;
+          distance_ = other.distance_;
+          _unknownFields = pb::UnknownFieldSet.Clone(other._unknownFields);
+        }
+
+        [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+        [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+        public StopPosition Clone() {
+          return new StopPosition(this);
+        }
+
+        /// <summary>Field number for the "stop_id" field.</summary>
+        public const int StopIdFieldNumber = 1;
+        private string stopId_ = "";
+        [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+        [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+        public string StopId {
+          get { return stopId_; }
+          set {
+            stopId_ = pb::ProtoPreconditions.CheckNotNull(value, "value");
+          }
+        }
+
+        /// <summary>Field number for the "segment_index" field.</summary>
+        public const int SegmentIndexFieldNumber = 2;
+        private uint segmentIndex_;
+        /// <summary>
+        /// The stop is closest to the segment from points[segment_index] to
+        /// points[segment_index + 1] of the Shape
+        /// </summary>
+        [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+        [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+        public uint SegmentIndex {
+          get { return segmentIndex_; }
+          set {
+            segmentIndex_ = value;
+          }
+        }
+
+        /// <summary>Field number for the "distance" field.</summary>
+        public const int DistanceFieldNumber = 3;
+        private double distance_;
+        /// <summary>
+        /// Distance in metres along the shape to the projection of the stop
+        /// </summary>
+        [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+        [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+        public double Distance {
+          get { return distance_; }
+          set {
+            distance_ = value;
+          }
+        }
+
+        [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+        [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+        public override bool Equals(object other) {
+          return Equals(other as StopPosition);
+        }
+
+        [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+        [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+        public bool Equals(StopPosition other) {
+          if (ReferenceEquals(other, null)) {
+            return false;
+          }
+          if (ReferenceEquals(other, this)) {
+            return true;
+          }
+          if (StopId != other.StopId) return false;
+          if (SegmentIndex != other.SegmentIndex) return false;
+          if (!pbc::ProtobufEqualityComparers.BitwiseDoubleEqualityComparer.Equals(Distance, other.Distance)) return false;
+          return Equals(_unknownFields, other._unknownFields);
+        }
+
+        [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+        [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+        public override int GetHashCode() {
+          int hash = 1;
+          if (StopId.Length != 0) hash ^= StopId.GetHashCode();
+          if (SegmentIndex != 0) hash ^= SegmentIndex.GetHashCode();
+          if (Distance != 0D) hash ^= pbc::ProtobufEqualityComparers.BitwiseDoubleEqualityComparer.GetHashCode(Distance);
+          if (_unknownFields != null) {
+            hash ^= _unknownFields.GetHashCode();
+          }
+          return hash;
+        }
+
+        [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+        [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+        public override string ToString() {
+          return pb::JsonFormatter.ToDiagnosticString(this);
+        }
+
+        [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+        [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+        public void WriteTo(pb::CodedOutputStream output) {
+        #if !GOOGLE_PROTOBUF_REFSTRUCT_COMPATIBILITY_MODE
+          output.WriteRawMessage(this);
+        #else
+          if (StopId.Length != 0) {
+            output.WriteRawTag(10);
+            output.WriteString(StopId);
+          }
+          if (SegmentIndex != 0) {
+            output.WriteRawTag(16);
+            output.WriteUInt32(SegmentIndex);
+          }
+          if (Distance != 0D) {
+            output.WriteRawTag(25);
+            output.WriteDouble(Distance);
+          }
+          if (_unknownFields != null) {
+            _unknownFields.WriteTo(output);
+          }
+        #endif
+        }
+
+        #if !GOOGLE_PROTOBUF_REFSTRUCT_COMPATIBILITY_MODE
+        [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+        [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+        void pb::IBufferMessage.InternalWriteTo(ref pb::WriteContext output) {
+          if (StopId.Length != 0) {
+            output.WriteRawTag(10);
+            output.WriteString(StopId);
+          }
+          if (SegmentIndex != 0) {
+            output.WriteRawTag(16);
+            output.WriteUInt32(SegmentIndex);
+          }
+          if (Distance != 0D) {
+            output.WriteRawTag(25);
+            output.WriteDouble(Distance);
+          }
+          if (_unknownFields != null) {
+            _unknownFields.WriteTo(ref output);
+          }
+        }
+        #endif
+
+        [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+        [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+        public int CalculateSize() {
+          int size = 0;
+          if (StopId.Length != 0) {
+            size += 1 + pb::CodedOutputStream.ComputeStringSize(StopId);
+          }
+          if (SegmentIndex != 0) {
+            size += 1 + pb::CodedOutputStream.ComputeUInt32Size(SegmentIndex);
+          }
+          if (Distance != 0D) {
+            size += 1 + 8;
+          }
+          if (_unknownFields != null) {
+            size += _unknownFields.CalculateSize();
+          }
+          return size;
+        }
+
+        [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+        [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+        public void MergeFrom(StopPosition other) {
+          if (other == null) {
+            return;
+          }
+          if (other.StopId.Length != 0) {
+            StopId = other.StopId;
+          }
+          if (other.SegmentIndex != 0) {
+            SegmentIndex = other.SegmentIndex;
+          }
+          if (other.Distance != 0D) {
+            Distance = other.Distance;
+          }
+          _unknownFields = pb::UnknownFieldSet.MergeFrom(_unknownFields, other._unknownFields);
+        }
+
+        [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+        [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+        public void MergeFrom(pb::CodedInputStream input) {
+        #if !GOOGLE_PROTOBUF_REFSTRUCT_COMPATIBILITY_MODE
+          input.ReadRawMessage(this);
+        #else
+          uint tag;
+          while ((tag = input.ReadTag()) != 0) {
+            switch(tag) {
+              default:
+                _unknownFields = pb::UnknownFieldSet.MergeFieldFrom(_unknownFields, input);
+                break;
+              case 10: {
+                StopId = input.ReadString();
+                break;
+              }
+              case 16: {
+                SegmentIndex = input.ReadUInt32();
+                break;
+              }
+              case 25: {
+                Distance = input.ReadDouble();
+                break;
+              }
+            }
+          }
+        #endif
+        }
+
+        #if !GOOGLE_PROTOBUF_REFSTRUCT_COMPATIBILITY_MODE
+        [global::System.Diagnostics.DebuggerNonUserCodeAttribute]
+        [global::System.CodeDom.Compiler.GeneratedCode("protoc", null)]
+        void pb::IBufferMessage.InternalMergeFrom(ref pb::ParseContext input) {
+          uint tag;
+          while ((tag = input.ReadTag()) != 0) {
+            switch(tag) {
+              default:
+                _unknownFields = pb::UnknownFieldSet.MergeFieldFrom(_unknownFields, ref input);
+                break;
+              case 10: {
+                StopId = input.ReadString();
+                break;
+              }
+              case 16: {
+                SegmentIndex = input.ReadUInt32();
+                break;
+              }
+              case 25: {
+                Distance = input.ReadDouble();
+                break;
+              }
+            }
+          }
+        }
+        #endif
+
+      }
+
+    }
+    #endregion
+
   }
 
   #endregion
@@ -0,0 +1,354 @@
+"""
+Benchmark suite of the stages of the stop report pipeline.
+
+Runs every stage on synthetic feeds generated by synthetic_feed.py, or on an
+existing feed, each in a forked process of its own so that no stage finds the
+caches of another one filled and the peak RSS is that of the stage:
+
+- load_stop_times: _load_stop_times_for_feed of the whole feed
+- get_trips_for_services: get_trips_for_services for the services of a date
+- get_active_services: get_active_services for every date of the feed,
+  building the service calendar
+- get_stop_arrivals: get_stop_arrivals for the busiest date of a preloaded feed
+- write_stop_reports: write_stop_reports of every stop of that date, in every
+  format
+- process_shapes: process_shapes of the whole feed, skipped for feeds without
+  shapes.txt such as those of the renfe style
+
+Each stage reports its wall time and the peak RSS of its process, and then, in
+a second run under tracemalloc, the peak traced memory and the number of
+blocks still allocated at the end. Results can be saved as JSON and compared
+with a previous run to spot regressions.
+
+Usage:
+    python benchmarks/bench_pipeline.py --scale 1k --scale 10k --style renfe
+    python benchmarks/bench_pipeline.py --scale 100k --stops-per-trip 100
+    python benchmarks/bench_pipeline.py --feed-dir path/to/feed --provider vitrasa
+    python benchmarks/bench_pipeline.py --json after.json --baseline before.json
+"""
+
+import argparse
+import gc
+import json
+import logging
+import multiprocessing
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import time
+import traceback
+import tracemalloc
+from typing import Callable, Dict, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic_feed import FEED_STYLES, SCALES, generate_feed  # noqa: E402
+
+from src.common import get_all_feed_dates  # noqa: E402
+from src.feed import feed_file_exists  # noqa: E402
+from src.providers import get_provider  # noqa: E402
+from src.report_writer import write_stop_reports  # noqa: E402
+from src.services import SERVICE_CALENDARS, get_active_services  # noqa: E402
+from src.shapes import process_shapes  # noqa: E402
+from src.stop_times import _load_stop_times_for_feed  # noqa: E402
+from src.stops import get_all_stops_by_code  # noqa: E402
+from src.trips import get_trips_for_services  # noqa: E402
+from stop_report import (  # noqa: E402
+    get_required_trip_ids,
+    get_stop_arrivals,
+    preload_feed,
+)
+
+# Sets up a stage outside of the measurement, and returns the function measured
+StageSetup = Callable[[str, object, str, str], Callable[[], object]]
+
+
+def _setup_load_stop_times(feed_dir, provider, date, scratch_dir):
+    return lambda: _load_stop_times_for_feed(feed_dir)
+
+
+def _setup_get_trips_for_services(feed_dir, provider, date, scratch_dir):
+    service_ids = get_active_services(feed_dir, date)
+    return lambda: get_trips_for_services(feed_dir, service_ids)
+
+
+def _setup_get_active_services(feed_dir, provider, date, scratch_dir):
+    dates = get_all_feed_dates(feed_dir)
+    # Measure the calendar build along with the lookups
+    SERVICE_CALENDARS.clear()
+    return lambda: [get_active_services(feed_dir, day) for day in dates]
+
+
+def _setup_get_stop_arrivals(feed_dir, provider, date, scratch_dir):
+    preload_feed(feed_dir, provider, get_required_trip_ids(feed_dir, [date]))
+    return lambda: get_stop_arrivals(feed_dir, date, provider)
+
+
+def _setup_write_stop_reports(feed_dir, provider, date, scratch_dir):
+    preload_feed(feed_dir, provider, get_required_trip_ids(feed_dir, [date]))
+    stops_by_code = get_all_stops_by_code(feed_dir)
+    stop_arrivals = get_stop_arrivals(feed_dir, date, provider)
+    output_dir = tempfile.mkdtemp(dir=scratch_dir)
+
+    def run():
+        for stop_code, arrivals in stop_arrivals.items():
+            stop = stops_by_code.get(stop_code)
+            location = (
+                (stop.stop_25829_x or 0.0, stop.stop_25829_y or 0.0)
+                if stop is not None
+                else None
+            )
+            write_stop_reports(output_dir, date, stop_code, arrivals, location)
+
+    return run
+
+
+def _setup_process_shapes(feed_dir, provider, date, scratch_dir):
+    output_dir = tempfile.mkdtemp(dir=scratch_dir)
+    return lambda: process_shapes(feed_dir, output_dir)
+
+
+STAGES: Dict[str, StageSetup] = {
+    "load_stop_times": _setup_load_stop_times,
+    "get_trips_for_services": _setup_get_trips_for_services,
+    "get_active_services": _setup_get_active_services,
+    "get_stop_arrivals": _setup_get_stop_arrivals,
+    "write_stop_reports": _setup_write_stop_reports,
+    "process_shapes": _setup_process_shapes,
+}
+# Feed file a stage needs, the stage is skipped for feeds without it
+STAGE_FILES: Dict[str, str] = {"process_shapes": "shapes.txt"}
+
+
+def _peak_rss() -> int:
+    """Peak resident set size of the process, in bytes."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _child_main(connection, target, args) -> None:
+    try:
+        connection.send(target(*args))
+    except BaseException:
+        connection.send(RuntimeError(traceback.format_exc()))
+    finally:
+        connection.close()
+
+
+def run_in_child(target, *args):
+    """Run a function in a forked process and return its result."""
+    context = multiprocessing.get_context("fork")
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(target=_child_main, args=(sender, target, args))
+    process.start()
+    sender.close()
+    result = receiver.recv()
+    process.join()
+    if isinstance(result, RuntimeError):
+        raise result
+    return result
+
+
+def find_busiest_date(feed_dir: str) -> str:
+    """The first date of the feed with the most trips."""
+    best_date, best_trips = "", -1
+    for date in get_all_feed_dates(feed_dir):
+        trips = get_trips_for_services(feed_dir, get_active_services(feed_dir, date))
+        trip_count = sum(len(trip_list) for trip_list in trips.values())
+        if trip_count > best_trips:
+            best_date, best_trips = date, trip_count
+    return best_date
+
+
+def measure_stage(
+    stage: str, feed_dir: str, provider_name: str, date: str, scratch_dir: str
+) -> dict:
+    """Time a stage and get the peak RSS of the process."""
+    run = STAGES[stage](feed_dir, get_provider(provider_name), date, scratch_dir)
+    gc.collect()
+    start_time = time.perf_counter()
+    run()
+    elapsed = time.perf_counter() - start_time
+    return {"seconds": elapsed, "peak_rss": _peak_rss()}
+
+
+def trace_stage(
+    stage: str, feed_dir: str, provider_name: str, date: str, scratch_dir: str
+) -> dict:
+    """Get the peak traced memory and the blocks left allocated by a stage."""
+    run = STAGES[stage](feed_dir, get_provider(provider_name), date, scratch_dir)
+    gc.collect()
+    tracemalloc.start()
+    # Kept alive until the snapshot, the result counts as left allocated
+    result = run()  # noqa: F841
+    _, peak = tracemalloc.get_traced_memory()
+    snapshot = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    blocks = sum(stat.count for stat in snapshot.statistics("filename"))
+    return {"traced_peak": peak, "live_blocks": blocks}
+
+
+def bench_feed(
+    feed_dir: str,
+    provider_name: str,
+    stages: list[str],
+    allocations: bool,
+    baseline: Optional[dict],
+) -> dict:
+    date = run_in_child(find_busiest_date, feed_dir)
+    results = {}
+    header = f"  {'stage':<24} {'time':>9} {'peak RSS':>11}"
+    if allocations:
+        header += f" {'traced':>11} {'blocks':>10}"
+    print(header)
+    with tempfile.TemporaryDirectory() as scratch_dir:
+        for stage in stages:
+            required_file = STAGE_FILES.get(stage)
+            if required_file and not feed_file_exists(feed_dir, required_file):
+                print(f"  {stage:<24} skipped, no {required_file}", flush=True)
+                continue
+
+            result = run_in_child(
+                measure_stage, stage, feed_dir, provider_name, date, scratch_dir
+            )
+            if allocations:
+                result.update(
+                    run_in_child(
+                        trace_stage, stage, feed_dir, provider_name, date, scratch_dir
+                    )
+                )
+            results[stage] = result
+
+            line = (
+                f"  {stage:<24} {result['seconds']:>8.3f}s "
+                f"{result['peak_rss'] / 2**20:>7.1f} MiB"
+            )
+            if allocations:
+                line += (
+                    f" {result['traced_peak'] / 2**20:>7.1f} MiB"
+                    f" {result['live_blocks']:>10}"
+                )
+            previous = (baseline or {}).get(stage)
+            if previous:
+                change = result["seconds"] / previous["seconds"] - 1
+                line += f"  time {change:+.0%} vs baseline"
+            print(line, flush=True)
+    return {"date": date, "stages": results}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Measure time and memory of each stage of the stop report."
+    )
+    parser.add_argument(
+        "--scale",
+        action="append",
+        choices=SCALES,
+        help="Number of trips of the synthetic feeds, may be repeated (default: 1k)",
+    )
+    parser.add_argument(
+        "--style",
+        action="append",
+        choices=FEED_STYLES,
+        help="Id formats of the synthetic feeds, may be repeated (default: vitrasa)",
+    )
+    parser.add_argument(
+        "--stops-per-trip",
+        type=int,
+        default=25,
+        help="Stops of every trip of the synthetic feeds (default: 25)",
+    )
+    parser.add_argument(
+        "--feed-dir", type=str, help="Benchmark an existing feed instead"
+    )
+    parser.add_argument(
+        "--provider",
+        type=str,
+        default="default",
+        help="Provider of --feed-dir (default: default)",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=str,
+        help="Directory to keep the synthetic feeds in between runs "
+        "(default: a temporary directory)",
+    )
+    parser.add_argument(
+        "--stage",
+        action="append",
+        choices=STAGES,
+        help="Stage to run, may be repeated (default: all)",
+    )
+    parser.add_argument(
+        "--no-allocations",
+        action="store_true",
+        help="Skip the second run of each stage under tracemalloc",
+    )
+    parser.add_argument("--json", type=str, help="Write the results to a JSON file")
+    parser.add_argument(
+        "--baseline", type=str, help="JSON results of a previous run to compare with"
+    )
+    parser.add_argument(
+        "--verbose", action="store_true", help="Show the log of the pipeline"
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if not args.verbose:
+        logging.disable(logging.WARNING)
+
+    stages = args.stage or list(STAGES)
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    results = {}
+    cache_dir = args.cache_dir or tempfile.mkdtemp(prefix="gtfs_bench_")
+    try:
+        if args.feed_dir:
+            feeds = [
+                (
+                    os.path.basename(os.path.normpath(args.feed_dir)),
+                    args.feed_dir,
+                    args.provider,
+                )
+            ]
+        else:
+            feeds = []
+            for style in args.style or ["vitrasa"]:
+                for scale in args.scale or ["1k"]:
+                    label = f"{style}-{scale}-{args.stops_per_trip}"
+                    feed_dir = os.path.join(cache_dir, label)
+                    if not os.path.exists(os.path.join(feed_dir, "trips.txt")):
+                        generate_feed(
+                            feed_dir, SCALES[scale], args.stops_per_trip, style
+                        )
+                    feeds.append((label, feed_dir, style))
+
+        for label, feed_dir, provider_name in feeds:
+            print(f"{label} ({provider_name})")
+            results[label] = bench_feed(
+                feed_dir,
+                provider_name,
+                stages,
+                not args.no_allocations,
+                baseline.get(label, {}).get("stages"),
+            )
+    finally:
+        if not args.cache_dir:
+            shutil.rmtree(cache_dir, ignore_errors=True)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
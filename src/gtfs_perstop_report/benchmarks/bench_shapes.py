@@ -0,0 +1,150 @@
+"""
+Benchmark the loading and coordinate transformation of shapes.txt.
+
+Compares load_shapes, which transforms every point of the feed in a single
+call, with the previous approach of building a record and calling the
+transformer once per point. Without --feed-dir, a synthetic shapes.txt with
+--points points is generated in a temporary directory.
+
+Usage:
+    python benchmarks/bench_shapes.py --points 500000
+    python benchmarks/bench_shapes.py --feed-dir path/to/feed
+"""
+
+import argparse
+import csv
+import os
+import random
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from pyproj import Transformer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.shapes import load_shapes  # noqa: E402
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Measure the time to load and transform the shapes of a feed."
+    )
+    parser.add_argument(
+        "--feed-dir", type=str, help="GTFS feed directory (default: synthetic feed)"
+    )
+    parser.add_argument(
+        "--points",
+        type=int,
+        default=300_000,
+        help="Points of the synthetic shapes.txt (default: 300000)",
+    )
+    parser.add_argument(
+        "--points-per-shape",
+        type=int,
+        default=1_500,
+        help="Points per shape of the synthetic shapes.txt (default: 1500)",
+    )
+    return parser.parse_args()
+
+
+def write_synthetic_shapes(feed_dir: str, points: int, points_per_shape: int) -> None:
+    """Write a shapes.txt of random walks around Vigo."""
+    rng = random.Random(42)
+    with open(
+        os.path.join(feed_dir, "shapes.txt"), "w", encoding="utf-8", newline=""
+    ) as f:
+        writer = csv.writer(f)
+        writer.writerow(
+            [
+                "shape_id",
+                "shape_pt_lat",
+                "shape_pt_lon",
+                "shape_pt_position",
+                "shape_dist_traveled",
+            ]
+        )
+        for shape_number in range((points + points_per_shape - 1) // points_per_shape):
+            lat, lon, dist = 42.23, -8.72, 0.0
+            for position in range(min(points_per_shape, points)):
+                lat += rng.uniform(-0.0002, 0.0002)
+                lon += rng.uniform(-0.0002, 0.0002)
+                dist += rng.uniform(5, 25)
+                writer.writerow(
+                    [
+                        f"S{shape_number:05d}",
+                        f"{lat:.6f}",
+                        f"{lon:.6f}",
+                        position + 1,
+                        f"{dist:.1f}",
+                    ]
+                )
+            points -= points_per_shape
+
+
+@dataclass
+class ShapePoint:
+    shape_id: str
+    shape_pt_lat: Optional[float]
+    shape_pt_lon: Optional[float]
+    shape_pt_position: Optional[int]
+
+    shape_pt_25829_x: Optional[float] = None
+    shape_pt_25829_y: Optional[float] = None
+
+
+def load_shapes_per_point(feed_dir: str) -> Dict[str, list[ShapePoint]]:
+    """Load shapes.txt transforming one point at a time, as done before."""
+    transformer = Transformer.from_crs(4326, 25829, always_xy=True)
+    shapes: Dict[str, list[ShapePoint]] = {}
+    with open(os.path.join(feed_dir, "shapes.txt"), encoding="utf-8", newline="") as f:
+        for row in csv.DictReader(f):
+            point = ShapePoint(
+                shape_id=row["shape_id"],
+                shape_pt_lat=float(row["shape_pt_lat"]),
+                shape_pt_lon=float(row["shape_pt_lon"]),
+                shape_pt_position=int(row["shape_pt_position"])
+                if row.get("shape_pt_position")
+                else None,
+            )
+            point.shape_pt_25829_x, point.shape_pt_25829_y = transformer.transform(
+                point.shape_pt_lon, point.shape_pt_lat
+            )
+            shapes.setdefault(point.shape_id, []).append(point)
+    for points in shapes.values():
+        points.sort(key=lambda point: point.shape_pt_position or 0)
+    return shapes
+
+
+def main():
+    args = parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        feed_dir = args.feed_dir
+        if not feed_dir:
+            feed_dir = temp_dir
+            write_synthetic_shapes(feed_dir, args.points, args.points_per_shape)
+
+        start_time = time.perf_counter()
+        reference = load_shapes_per_point(feed_dir)
+        per_point_elapsed = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        shapes = load_shapes(feed_dir)
+        bulk_elapsed = time.perf_counter() - start_time
+
+    point_count = sum(len(xs) for xs, _ in shapes.values())
+    for shape_id, points in reference.items():
+        xs, ys = shapes[shape_id]
+        assert list(xs) == [point.shape_pt_25829_x for point in points]
+        assert list(ys) == [point.shape_pt_25829_y for point in points]
+
+    print(f"{point_count} points in {len(shapes)} shapes")
+    print(f"  per point: {per_point_elapsed:.3f}s")
+    print(f"  bulk:      {bulk_elapsed:.3f}s ({per_point_elapsed / bulk_elapsed:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Benchmark the per-date arrival generation of the stop report.
+
+Preloads the feed, then builds the arrivals of each date under tracemalloc and
+prints the wall time, the number of arrivals, the peak traced memory and the
+number of memory blocks still allocated once the arrivals are built.
+
+Usage:
+    python benchmarks/bench_stop_arrivals.py --feed-dir path/to/feed --date 2025-06-02
+"""
+
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.common import get_all_feed_dates  # noqa: E402
+from src.providers import get_provider  # noqa: E402
+from stop_report import get_stop_arrivals, preload_feed  # noqa: E402
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Measure time and memory of the per-date arrival generation."
+    )
+    parser.add_argument(
+        "--feed-dir", type=str, required=True, help="GTFS feed directory"
+    )
+    parser.add_argument(
+        "--provider",
+        type=str,
+        default="default",
+        help="Feed provider (default: default)",
+    )
+    parser.add_argument(
+        "--date",
+        type=str,
+        action="append",
+        help="Date to benchmark in YYYY-MM-DD format, may be repeated (default: "
+        "first feed date)",
+    )
+    return parser.parse_args()
+
+
+def bench_date(feed_dir: str, date: str, provider) -> None:
+    gc.collect()
+    tracemalloc.start()
+    start_time = time.perf_counter()
+
+    stop_arrivals = get_stop_arrivals(feed_dir, date, provider)
+
+    elapsed = time.perf_counter() - start_time
+    snapshot = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    blocks = sum(stat.count for stat in snapshot.statistics("filename"))
+    arrival_count = sum(len(arrivals) for arrivals in stop_arrivals.values())
+
+    print(
+        f"{date}: {arrival_count} arrivals at {len(stop_arrivals)} stops in "
+        f"{elapsed:.3f}s, "
+        f"peak {peak / (1024 * 1024):.1f} MiB, {blocks} live blocks "
+        f"({blocks / max(arrival_count, 1):.2f} per arrival)"
+    )
+
+
+def main():
+    args = parse_args()
+    provider = get_provider(args.provider)
+    dates = args.date or get_all_feed_dates(args.feed_dir)[:1]
+
+    preload_feed(args.feed_dir, provider)
+    for date in dates:
+        bench_date(args.feed_dir, date, provider)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,507 @@
+"""
+Deterministic generator of synthetic GTFS feeds for the benchmarks.
+
+Feeds are generated at a given number of trips and stops per trip, in the id
+formats of one of the providers:
+
+- vitrasa: urban bus feed with VIGO_<day type>_<period> services, trip ids in
+  the ..._LLLSSS-N format of line, shift and trip number, street-style stop
+  names, shapes and shape_dist_traveled.
+- renfe: rail feed with one numeric service and trip id per train, upper case
+  station names, no shapes and no distances.
+
+The same arguments always produce byte-identical files.
+
+Usage:
+    python benchmarks/synthetic_feed.py --output-dir /tmp/feed --scale 10k
+    python benchmarks/synthetic_feed.py --output-dir /tmp/feed --style renfe \
+        --trips 100000 --stops-per-trip 100
+"""
+
+import argparse
+import csv
+import datetime
+import math
+import os
+import random
+from typing import List, Tuple
+
+FEED_STYLES = ("vitrasa", "renfe")
+# Number of trips of each preset scale
+SCALES = {"1k": 1_000, "10k": 10_000, "100k": 100_000}
+
+FEED_START = datetime.date(2025, 1, 1)
+FEED_DAYS = 91
+
+# Around Vigo, in degrees
+ORIGIN_LAT = 42.23
+ORIGIN_LON = -8.72
+
+STREETS = (
+    "Rúa de Urzaiz",
+    "Avda. de Castelao",
+    "Gran Vía",
+    "Rúa do Príncipe",
+    "Praza de España",
+    "Estrada de Miraflores",
+    "Rúa da Salgueira",
+    "Avda. de Madrid",
+    "Rúa de Pizarro",
+    "Avda. da Florida",
+)
+STATIONS = (
+    "VIGO-GUIXAR",
+    "VIGO URZAIZ",
+    "REDONDELA",
+    "PONTEVEDRA",
+    "VILAGARCIA DE AROUSA",
+    "SANTIAGO DE COMPOSTELA",
+    "A CORUNYA",
+    "OURENSE",
+    "MONFORTE DE LEMOS",
+    "LEON",
+    "MADRID-CHAMARTIN-CLARA CAMPOAMOR",
+    "ZAMORA",
+)
+# Vitrasa day types and the share of trips of each
+DAY_TYPES = (
+    ("LAB", 0.6, "1111100"),
+    ("SAB", 0.25, "0000010"),
+    ("DOM", 0.15, "0000001"),
+)
+
+
+def _format_time(seconds: int) -> str:
+    hours, remainder = divmod(seconds, 3600)
+    minutes, secs = divmod(remainder, 60)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}"
+
+
+def _format_date(date: datetime.date) -> str:
+    return date.strftime("%Y%m%d")
+
+
+def _write_rows(feed_dir: str, file_name: str, header: List[str], rows) -> None:
+    with open(
+        os.path.join(feed_dir, file_name), "w", encoding="utf-8", newline=""
+    ) as f:
+        writer = csv.writer(f, lineterminator="\n")
+        writer.writerow(header)
+        writer.writerows(rows)
+
+
+def _make_stops(rng: random.Random, count: int, style: str) -> List[Tuple]:
+    """Stops spread over a grid, as (stop_id, stop_code, name, lat, lon)."""
+    side = math.ceil(math.sqrt(count))
+    stops = []
+    for index in range(count):
+        lat = ORIGIN_LAT + (index // side) * 0.0008 + rng.uniform(-0.0002, 0.0002)
+        lon = ORIGIN_LON + (index % side) * 0.0011 + rng.uniform(-0.0002, 0.0002)
+        if style == "vitrasa":
+            street = STREETS[index % len(STREETS)]
+            name = f"{street}, {index % 200 + 1}"
+            if index % 3 == 0:
+                name = f"{street} (fronte {index % 90 + 1})"
+            stops.append((str(index + 1), str(index + 1), name, lat, lon))
+        else:
+            station = STATIONS[index % len(STATIONS)]
+            if index >= len(STATIONS):
+                station = f"{station} {index // len(STATIONS)}"
+            stops.append((f"{index + 10000:05d}", "", station, lat, lon))
+    return stops
+
+
+def _pick_pattern(rng: random.Random, stop_count: int, length: int) -> List[int]:
+    """A random walk over the grid of stops, without immediate repeats."""
+    side = math.ceil(math.sqrt(stop_count))
+    current = rng.randrange(stop_count)
+    pattern = [current]
+    while len(pattern) < length:
+        step = rng.choice((1, -1, side, -side))
+        candidate = current + step
+        if 0 <= candidate < stop_count and candidate not in pattern[-3:]:
+            current = candidate
+            pattern.append(current)
+        elif rng.random() < 0.05:
+            current = rng.randrange(stop_count)
+            pattern.append(current)
+    return pattern
+
+
+def _distance(a: Tuple, b: Tuple) -> float:
+    """Approximate distance in metres between two stops."""
+    dy = (a[3] - b[3]) * 111_320
+    dx = (a[4] - b[4]) * 111_320 * math.cos(math.radians(ORIGIN_LAT))
+    return math.hypot(dx, dy)
+
+
+def generate_vitrasa_feed(
+    feed_dir: str, trips: int, stops_per_trip: int, seed: int = 0
+) -> None:
+    rng = random.Random(seed)
+    stop_count = max(stops_per_trip * 2, min(1_200, trips // 2 + 100))
+    stops = _make_stops(rng, stop_count, "vitrasa")
+    line_count = max(2, min(99, trips // 250))
+
+    _write_rows(
+        feed_dir,
+        "stops.txt",
+        ["stop_id", "stop_code", "stop_name", "stop_lat", "stop_lon"],
+        [(s[0], s[1], s[2], f"{s[3]:.6f}", f"{s[4]:.6f}") for s in stops],
+    )
+    _write_rows(
+        feed_dir,
+        "routes.txt",
+        [
+            "route_id",
+            "route_short_name",
+            "route_long_name",
+            "route_type",
+            "route_color",
+        ],
+        [
+            (
+                f"{line:03d}",
+                f"{line}{'A' if line % 5 == 0 else ''}",
+                f"Liña {line}",
+                3,
+                f"{line * 2654435 % 0xFFFFFF:06X}",
+            )
+            for line in range(1, line_count + 1)
+        ],
+    )
+
+    end = FEED_START + datetime.timedelta(days=FEED_DAYS - 1)
+    period = _format_date(FEED_START)
+    _write_rows(
+        feed_dir,
+        "calendar.txt",
+        [
+            "service_id",
+            "monday",
+            "tuesday",
+            "wednesday",
+            "thursday",
+            "friday",
+            "saturday",
+            "sunday",
+            "start_date",
+            "end_date",
+        ],
+        [
+            (f"VIGO_{day_type}_{period}", *weekdays, period, _format_date(end))
+            for day_type, _, weekdays in DAY_TYPES
+        ],
+    )
+    # A holiday runs the Sunday service instead of the weekday one
+    holiday = _format_date(FEED_START + datetime.timedelta(days=5))
+    _write_rows(
+        feed_dir,
+        "calendar_dates.txt",
+        ["service_id", "date", "exception_type"],
+        [
+            (f"VIGO_LAB_{period}", holiday, 2),
+            (f"VIGO_DOM_{period}", holiday, 1),
+        ],
+    )
+
+    # Two directions per line, the second one the reverse of the first
+    patterns = {}
+    shape_rows = []
+    for line in range(1, line_count + 1):
+        forward = _pick_pattern(rng, stop_count, stops_per_trip)
+        for direction, pattern in enumerate((forward, forward[::-1])):
+            shape_id = f"{line:03d}{direction}"
+            distances = [0.0]
+            for a, b in zip(pattern, pattern[1:]):
+                distances.append(distances[-1] + _distance(stops[a], stops[b]))
+            patterns[(line, direction)] = (shape_id, pattern, distances)
+
+            # Four points per segment between consecutive stops
+            position = 1
+            for k, (a, b) in enumerate(zip(pattern, pattern[1:])):
+                for step in range(4):
+                    t = step / 4
+                    lat = stops[a][3] + (stops[b][3] - stops[a][3]) * t
+                    lon = stops[a][4] + (stops[b][4] - stops[a][4]) * t
+                    distance = distances[k] + (distances[k + 1] - distances[k]) * t
+                    shape_rows.append(
+                        (
+                            shape_id,
+                            f"{lat:.6f}",
+                            f"{lon:.6f}",
+                            position,
+                            f"{distance:.1f}",
+                        )
+                    )
+                    position += 1
+            last = stops[pattern[-1]]
+            shape_rows.append(
+                (
+                    shape_id,
+                    f"{last[3]:.6f}",
+                    f"{last[4]:.6f}",
+                    position,
+                    f"{distances[-1]:.1f}",
+                )
+            )
+
+    _write_rows(
+        feed_dir,
+        "shapes.txt",
+        [
+            "shape_id",
+            "shape_pt_lat",
+            "shape_pt_lon",
+            "shape_pt_sequence",
+            "shape_dist_traveled",
+        ],
+        shape_rows,
+    )
+
+    trip_rows = []
+    with open(
+        os.path.join(feed_dir, "stop_times.txt"), "w", encoding="utf-8", newline=""
+    ) as f:
+        f.write(
+            "trip_id,arrival_time,departure_time,stop_id,stop_sequence,shape_dist_traveled\n"
+        )
+        generated = 0
+        shift = 0
+        while generated < trips:
+            shift += 1
+            # Each shift drives one line back and forth during a service day
+            line = shift % line_count + 1
+            day_type = rng.choices(
+                [day_type for day_type, _, _ in DAY_TYPES],
+                [share for _, share, _ in DAY_TYPES],
+            )[0]
+            service_id = f"VIGO_{day_type}_{period}"
+            seconds = rng.randrange(5 * 3600, 22 * 3600, 60)
+            shift_trips = min(rng.randint(4, 12), trips - generated)
+            for number in range(1, shift_trips + 1):
+                direction = (number + 1) % 2
+                shape_id, pattern, distances = patterns[(line, direction)]
+                # Shift numbers past 999 go to the period to keep the ids unique
+                prefix = f"VIGO_{period}{shift // 1000 or ''}"
+                trip_id = f"{prefix}_{line:03d}{shift % 1000:03d}-{number}"
+                # The street of the terminus, as trips.txt is read without
+                # support for quoted commas
+                headsign = STREETS[pattern[-1] % len(STREETS)]
+                trip_rows.append(
+                    (
+                        f"{line:03d}",
+                        service_id,
+                        trip_id,
+                        headsign,
+                        direction,
+                        shape_id,
+                    )
+                )
+                for sequence, (stop, distance) in enumerate(
+                    zip(pattern, distances), start=1
+                ):
+                    time = _format_time(seconds)
+                    f.write(
+                        f"{trip_id},{time},{time},{stops[stop][0]},{sequence},{distance:.1f}\n"
+                    )
+                    seconds += rng.randint(40, 150)
+                seconds += rng.randint(180, 900)
+            generated += shift_trips
+
+    _write_rows(
+        feed_dir,
+        "trips.txt",
+        [
+            "route_id",
+            "service_id",
+            "trip_id",
+            "trip_headsign",
+            "direction_id",
+            "shape_id",
+        ],
+        trip_rows,
+    )
+
+
+def generate_renfe_feed(
+    feed_dir: str, trips: int, stops_per_trip: int, seed: int = 0
+) -> None:
+    rng = random.Random(seed)
+    stop_count = max(stops_per_trip * 2, min(600, trips // 10 + 50))
+    stops = _make_stops(rng, stop_count, "renfe")
+    route_count = max(2, min(300, trips // 50))
+
+    _write_rows(
+        feed_dir,
+        "stops.txt",
+        ["stop_id", "stop_code", "stop_name", "stop_lat", "stop_lon"],
+        [(s[0], s[1], s[2], f"{s[3]:.6f}", f"{s[4]:.6f}") for s in stops],
+    )
+    _write_rows(
+        feed_dir,
+        "routes.txt",
+        [
+            "route_id",
+            "route_short_name",
+            "route_long_name",
+            "route_type",
+            "route_color",
+        ],
+        [
+            (
+                f"{route:05d}VIGO",
+                ("AVE", "ALVIA", "MD", "REGIONAL")[route % 4],
+                "",
+                2,
+                "",
+            )
+            for route in range(1, route_count + 1)
+        ],
+    )
+
+    route_patterns = [
+        _pick_pattern(rng, stop_count, stops_per_trip) for _ in range(route_count)
+    ]
+
+    calendar_rows = []
+    calendar_date_rows = []
+    trip_rows = []
+    with open(
+        os.path.join(feed_dir, "stop_times.txt"), "w", encoding="utf-8", newline=""
+    ) as f:
+        f.write("trip_id,arrival_time,departure_time,stop_id,stop_sequence\n")
+        for train in range(1, trips + 1):
+            route = rng.randrange(route_count)
+            pattern = route_patterns[route]
+            if train % 2:
+                pattern = pattern[::-1]
+
+            # Every train runs on its own days, with a service of its own
+            start = FEED_START + datetime.timedelta(days=rng.randrange(0, 30))
+            end = start + datetime.timedelta(days=rng.randrange(7, FEED_DAYS - 30))
+            weekdays = [rng.random() < 0.75 for _ in range(7)]
+            if not any(weekdays):
+                weekdays[0] = True
+            service_id = f"{_format_date(start)}{_format_date(end)}{train:05d}"
+            trip_id = f"{train:05d}{_format_date(start)}"
+            calendar_rows.append(
+                (
+                    service_id,
+                    *(int(day) for day in weekdays),
+                    _format_date(start),
+                    _format_date(end),
+                )
+            )
+            if train % 7 == 0:
+                calendar_date_rows.append(
+                    (service_id, _format_date(start + datetime.timedelta(days=3)), 2)
+                )
+
+            trip_rows.append((f"{route + 1:05d}VIGO", service_id, trip_id, "", "", ""))
+            seconds = rng.randrange(5 * 3600, 23 * 3600, 300)
+            for sequence, stop in enumerate(pattern, start=1):
+                arrival = _format_time(seconds)
+                seconds += 60 if 1 < sequence < len(pattern) else 0
+                departure = _format_time(seconds)
+                f.write(
+                    f"{trip_id},{arrival},{departure},{stops[stop][0]},{sequence}\n"
+                )
+                seconds += rng.randint(300, 1800)
+
+    _write_rows(
+        feed_dir,
+        "calendar.txt",
+        [
+            "service_id",
+            "monday",
+            "tuesday",
+            "wednesday",
+            "thursday",
+            "friday",
+            "saturday",
+            "sunday",
+            "start_date",
+            "end_date",
+        ],
+        calendar_rows,
+    )
+    _write_rows(
+        feed_dir,
+        "calendar_dates.txt",
+        ["service_id", "date", "exception_type"],
+        calendar_date_rows,
+    )
+    _write_rows(
+        feed_dir,
+        "trips.txt",
+        [
+            "route_id",
+            "service_id",
+            "trip_id",
+            "trip_headsign",
+            "direction_id",
+            "shape_id",
+        ],
+        trip_rows,
+    )
+
+
+def generate_feed(
+    feed_dir: str, trips: int, stops_per_trip: int, style: str, seed: int = 0
+) -> None:
+    """
+    Generate a synthetic feed in a directory.
+
+    Args:
+        feed_dir: Directory to write the feed files to, created if missing
+        trips: Number of trips of the feed
+        stops_per_trip: Number of stops of every trip, so the feed has
+            trips * stops_per_trip stop times
+        style: Id formats and structure of the feed, one of FEED_STYLES
+        seed: Seed of the random generator
+    """
+    if style not in FEED_STYLES:
+        raise ValueError(f"Unknown feed style: {style}")
+    os.makedirs(feed_dir, exist_ok=True)
+    if style == "vitrasa":
+        generate_vitrasa_feed(feed_dir, trips, stops_per_trip, seed)
+    else:
+        generate_renfe_feed(feed_dir, trips, stops_per_trip, seed)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Generate a synthetic GTFS feed.")
+    parser.add_argument("--output-dir", type=str, required=True, help="Feed directory")
+    parser.add_argument(
+        "--scale",
+        choices=SCALES,
+        default="1k",
+        help="Number of trips of the feed (default: 1k)",
+    )
+    parser.add_argument("--trips", type=int, help="Number of trips, overriding --scale")
+    parser.add_argument(
+        "--stops-per-trip",
+        type=int,
+        default=25,
+        help="Stops of every trip (default: 25)",
+    )
+    parser.add_argument(
+        "--style", choices=FEED_STYLES, default="vitrasa", help="Feed style"
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    trips = args.trips or SCALES[args.scale]
+    generate_feed(args.output_dir, trips, args.stops_per_trip, args.style, args.seed)
+    print(
+        f"Generated a {args.style} feed with {trips} trips and "
+        f"{trips * args.stops_per_trip} stop times in {args.output_dir}"
+    )
+
+
+if __name__ == "__main__":
+    main()
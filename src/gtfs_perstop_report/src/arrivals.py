@@ -0,0 +1,157 @@
+"""
+Compact records for the scheduled arrivals written to the stop reports.
+
+A busy date produces millions of arrivals, so every field that is the same for
+all the arrivals of a trip lives in a shared ArrivalTrip and each
+ScheduledArrival only holds what changes from stop to stop.
+"""
+
+from typing import List, Optional
+
+
+class ArrivalTrip:
+    """
+    Fields shared by all the arrivals of a trip on a given date.
+    """
+
+    __slots__ = (
+        "service_id",
+        "trip_id",
+        "line",
+        "route",
+        "shape_id",
+        "starting_code",
+        "starting_name",
+        "starting_time",
+        "starting_ssm",
+        "terminus_code",
+        "terminus_name",
+        "terminus_time",
+        "terminus_ssm",
+        "previous_trip_shape_id",
+        "street_sequence",
+    )
+
+    def __init__(
+        self,
+        service_id: str,
+        trip_id: str,
+        line: str,
+        route: str,
+        shape_id: Optional[str],
+        starting_code: str,
+        starting_name: str,
+        starting_time: str,
+        starting_ssm: Optional[int],
+        terminus_code: str,
+        terminus_name: str,
+        terminus_time: str,
+        terminus_ssm: Optional[int],
+        previous_trip_shape_id: str,
+        street_sequence: List[str],
+    ):
+        self.service_id = service_id
+        self.trip_id = trip_id
+        self.line = line
+        self.route = route
+        self.shape_id = shape_id
+        self.starting_code = starting_code
+        self.starting_name = starting_name
+        self.starting_time = starting_time
+        # Seconds since midnight, None when the first stop has no time
+        self.starting_ssm = starting_ssm
+        self.terminus_code = terminus_code
+        self.terminus_name = terminus_name
+        self.terminus_time = terminus_time
+        # Seconds since midnight, None when the last stop has no time
+        self.terminus_ssm = terminus_ssm
+        self.previous_trip_shape_id = previous_trip_shape_id
+        # Streets the trip goes through, shared with the trip template
+        self.street_sequence = street_sequence
+
+
+class ScheduledArrival:
+    """
+    A scheduled arrival of a trip at a stop.
+
+    The trip-level fields are exposed as read-only properties backed by the
+    shared ArrivalTrip, so the record reads like a flat arrival.
+    """
+
+    __slots__ = (
+        "trip",
+        "stop_sequence",
+        "shape_dist_traveled",
+        "next_streets_offset",
+        "calling_time",
+        "calling_ssm",
+    )
+
+    def __init__(
+        self,
+        trip: ArrivalTrip,
+        stop_sequence: int,
+        shape_dist_traveled: Optional[float],
+        next_streets_offset: int,
+        calling_time: str,
+        calling_ssm: int,
+    ):
+        self.trip = trip
+        self.stop_sequence = stop_sequence
+        self.shape_dist_traveled = shape_dist_traveled
+        self.next_streets_offset = next_streets_offset
+        self.calling_time = calling_time
+        self.calling_ssm = calling_ssm
+
+    @property
+    def next_streets(self) -> List[str]:
+        """Streets the trip goes through after this stop."""
+        return self.trip.street_sequence[self.next_streets_offset :]
+
+    @property
+    def service_id(self) -> str:
+        return self.trip.service_id
+
+    @property
+    def trip_id(self) -> str:
+        return self.trip.trip_id
+
+    @property
+    def line(self) -> str:
+        return self.trip.line
+
+    @property
+    def route(self) -> str:
+        return self.trip.route
+
+    @property
+    def shape_id(self) -> Optional[str]:
+        return self.trip.shape_id
+
+    @property
+    def starting_code(self) -> str:
+        return self.trip.starting_code
+
+    @property
+    def starting_name(self) -> str:
+        return self.trip.starting_name
+
+    @property
+    def starting_time(self) -> str:
+        return self.trip.starting_time
+
+    @property
+    def terminus_code(self) -> str:
+        return self.trip.terminus_code
+
+    @property
+    def terminus_name(self) -> str:
+        return self.trip.terminus_name
+
+    @property
+    def terminus_time(self) -> str:
+        return self.trip.terminus_time
+
+    @property
+    def previous_trip_shape_id(self) -> str:
+        return self.trip.previous_trip_shape_id
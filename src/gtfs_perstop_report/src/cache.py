@@ -0,0 +1,277 @@
+"""
+Bounded caches of the data parsed from the feeds.
+
+Every loader keeps what it parsed in a FeedCache, keyed by the path of the feed
+or by a tuple starting with it. The caches share a single memory budget: when
+the estimated size of all their entries goes over it, the least recently used
+entries are evicted, whichever cache they belong to, and loaded again the next
+time they are needed. The entry just stored is never evicted, so a loader can
+always read back what it cached. Caches whose entries cannot be loaded again
+as they were are never evicted, and only count towards the budget.
+
+The entries of a feed can be dropped from every cache at once with
+invalidate_feed, once the feed is no longer used or its files have changed.
+A feed can also be pinned, so that none of its entries are evicted until then,
+for instance while forked workers rely on inheriting them.
+"""
+
+import sys
+from array import array
+from collections import OrderedDict
+from itertools import islice
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Generic,
+    Hashable,
+    List,
+    Optional,
+    Set,
+    TypeVar,
+)
+
+from src.logger import get_logger
+from src.metrics import count
+
+logger = get_logger("cache")
+
+DEFAULT_MEMORY_BUDGET = 2048 * 1024 * 1024
+
+# Items of a container measured to estimate the size of the rest
+SIZE_SAMPLE = 32
+# Depth of the nested objects measured
+SIZE_MAX_DEPTH = 6
+
+V = TypeVar("V")
+
+# Tells missing entries apart from cached None values
+_MISSING: Any = object()
+
+# Every cache created, for the budget, the statistics and the invalidation
+_caches: List["FeedCache"] = []
+# (cache, key) -> estimated size of every entry, least recently used first
+_entries_lru: "OrderedDict[tuple[FeedCache, Hashable], int]" = OrderedDict()
+_total_size = 0
+_memory_budget = DEFAULT_MEMORY_BUDGET
+# Feeds whose entries are not evicted until invalidate_feed is called
+_pinned_feeds: Set[Hashable] = set()
+# Whether the entries that cannot be evicted are over the budget, warned once
+_over_budget = False
+
+
+def estimate_size(value: Any, _depth: int = 0) -> int:
+    """
+    Estimate the memory taken by an object and the objects it holds, in bytes.
+
+    Only the first items of large containers are measured and their size is
+    extrapolated to the rest, so that large feeds are measured quickly. Objects
+    referenced more than once are counted every time.
+    """
+    size = sys.getsizeof(value)
+    if _depth >= SIZE_MAX_DEPTH or isinstance(
+        value, (str, bytes, int, float, bool, array, type(None))
+    ):
+        return size
+    if isinstance(value, memoryview):
+        return size + value.nbytes
+
+    if isinstance(value, dict):
+        items = [*islice(value.items(), SIZE_SAMPLE)]
+        measured = sum(
+            estimate_size(k, _depth + 1) + estimate_size(v, _depth + 1)
+            for k, v in items
+        )
+        return size + measured * len(value) // max(len(items), 1)
+    if isinstance(value, (list, tuple, set, frozenset)):
+        items = [*islice(value, SIZE_SAMPLE)]
+        measured = sum(estimate_size(item, _depth + 1) for item in items)
+        return size + measured * len(value) // max(len(items), 1)
+
+    if hasattr(value, "__dict__"):
+        size += estimate_size(vars(value), _depth + 1)
+    for cls in type(value).__mro__:
+        for slot in getattr(cls, "__slots__", ()):
+            if hasattr(value, slot):
+                size += estimate_size(getattr(value, slot), _depth + 1)
+    return size
+
+
+def _get_feed(key: Hashable) -> Hashable:
+    return key[0] if isinstance(key, tuple) else key
+
+
+class FeedCache(Generic[V]):
+    """
+    Cache of values parsed from the feeds, sharing the memory budget of every
+    other cache and evicting its least recently used entries.
+
+    Args:
+        name: Name of the cache in the statistics
+        sizer: Estimates the size of a value in bytes
+        evictable: Whether the entries can be evicted, False for values that
+            cannot be loaded again as they were, which are only removed by pop
+            and invalidate_feed
+    """
+
+    def __init__(
+        self,
+        name: str,
+        sizer: Callable[[Any], int] = estimate_size,
+        evictable: bool = True,
+    ):
+        self.name = name
+        self.sizer = sizer
+        self.evictable = evictable
+        self._entries: Dict[Hashable, V] = {}
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._hits_counter = f"cache_{name}_hits"
+        self._misses_counter = f"cache_{name}_misses"
+        self._evictions_counter = f"cache_{name}_evictions"
+        _caches.append(self)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def get(self, key: Hashable, default: Optional[V] = None) -> Optional[V]:
+        """Get a cached value, marking it as recently used."""
+        value = self._entries.get(key, _MISSING)
+        if value is _MISSING:
+            self.misses += 1
+            count(self._misses_counter)
+            return default
+        self.hits += 1
+        count(self._hits_counter)
+        _entries_lru.move_to_end((self, key))
+        return value
+
+    def __getitem__(self, key: Hashable) -> V:
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key: Hashable, value: V) -> None:
+        """Cache a value, evicting other entries if it goes over the budget."""
+        global _total_size
+
+        self.pop(key)
+        size = self.sizer(value)
+        self._entries[key] = value
+        self.size += size
+        _entries_lru[(self, key)] = size
+        _total_size += size
+        if size > _memory_budget:
+            logger.warning(
+                f"{self.name} entry of {_get_feed(key)} takes {size / 2**20:.1f} MiB, "
+                f"more than the whole cache budget of {_memory_budget / 2**20:.1f} MiB"
+            )
+        _evict()
+
+    def pop(self, key: Hashable) -> Optional[V]:
+        """Remove a value from the cache, returning it if it was cached."""
+        global _total_size
+
+        value = self._entries.pop(key, _MISSING)
+        if value is _MISSING:
+            return None
+        size = _entries_lru.pop((self, key))
+        self.size -= size
+        _total_size -= size
+        return value
+
+    def invalidate_feed(self, feed_dir: str) -> int:
+        """
+        Remove every value of a feed from the cache.
+
+        Returns:
+            Number of values removed.
+        """
+        keys = [key for key in self._entries if _get_feed(key) == feed_dir]
+        for key in keys:
+            self.pop(key)
+        return len(keys)
+
+    def clear(self) -> None:
+        for key in list(self._entries):
+            self.pop(key)
+
+
+def _evict() -> None:
+    """Evict the least recently used entries until the caches fit the budget."""
+    global _total_size, _over_budget
+
+    if _total_size <= _memory_budget:
+        _over_budget = False
+        return
+
+    # The last entry is the one just stored or read, never evicted
+    for cache, key in list(_entries_lru)[:-1]:
+        if _total_size <= _memory_budget:
+            break
+        if not cache.evictable or _get_feed(key) in _pinned_feeds:
+            continue
+        size = _entries_lru.pop((cache, key))
+        del cache._entries[key]
+        cache.size -= size
+        cache.evictions += 1
+        count(cache._evictions_counter)
+        _total_size -= size
+        logger.debug(
+            f"Evicted {cache.name} entry of {_get_feed(key)} ({size / 2**20:.1f} MiB)"
+        )
+
+    if _total_size > _memory_budget and not _over_budget:
+        logger.warning(
+            f"Caches take {_total_size / 2**20:.1f} MiB after evicting every entry "
+            f"they can, over the budget of {_memory_budget / 2**20:.1f} MiB"
+        )
+    _over_budget = _total_size > _memory_budget
+
+
+def set_memory_budget(budget: int) -> None:
+    """Set the memory budget of the caches in bytes, evicting entries over it."""
+    global _memory_budget
+    _memory_budget = budget
+    _evict()
+
+
+def pin_feed(feed_dir: str) -> None:
+    """Keep every entry of a feed in the caches until invalidate_feed is called."""
+    _pinned_feeds.add(feed_dir)
+
+
+def invalidate_feed(feed_dir: str) -> int:
+    """
+    Remove the values of a feed from every cache, unpinning it.
+
+    Returns:
+        Number of values removed.
+    """
+    _pinned_feeds.discard(feed_dir)
+    return sum(cache.invalidate_feed(feed_dir) for cache in _caches)
+
+
+def get_cache_size() -> int:
+    """Get the estimated size of every entry of the caches, in bytes."""
+    return _total_size
+
+
+def get_cache_stats() -> Dict[str, Dict[str, int]]:
+    """Get the entries, estimated size, hits, misses and evictions of each cache."""
+    return {
+        cache.name: {
+            "entries": len(cache),
+            "bytes": cache.size,
+            "hits": cache.hits,
+            "misses": cache.misses,
+            "evictions": cache.evictions,
+        }
+        for cache in _caches
+    }
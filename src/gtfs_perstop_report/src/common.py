@@ -2,65 +2,82 @@
 Common utilities for GTFS report generation.
 """
 
-import csv
-import os
 from datetime import datetime, timedelta
 from typing import List
 
+from src.services import get_service_calendar
+
 
 def get_all_feed_dates(feed_dir: str) -> List[str]:
     """
-    Returns all dates the feed is valid for, using calendar.txt if present, else calendar_dates.txt.
+    Returns all dates the feed is valid for, using calendar.txt if present, else
+    calendar_dates.txt.
     """
-    calendar_path = os.path.join(feed_dir, "calendar.txt")
-    calendar_dates_path = os.path.join(feed_dir, "calendar_dates.txt")
+    calendar = get_service_calendar(feed_dir)
 
     # Try calendar.txt first
-    if os.path.exists(calendar_path):
-        with open(calendar_path, encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            rows = list(reader)
-            if rows:  # Check if there's actual data
-                start_dates: List[str] = []
-                end_dates: List[str] = []
-                for row in rows:
-                    if row.get("start_date") and row.get("end_date"):
-                        start_dates.append(row["start_date"])
-                        end_dates.append(row["end_date"])
-                if start_dates and end_dates:
-                    min_date = min(start_dates)
-                    max_date = max(end_dates)
-                    # Convert YYYYMMDD to YYYY-MM-DD
-                    start = datetime.strptime(min_date, "%Y%m%d")
-                    end = datetime.strptime(max_date, "%Y%m%d")
-                    result: List[str] = []
-                    while start <= end:
-                        result.append(start.strftime("%Y-%m-%d"))
-                        start += timedelta(days=1)
-                    if len(result) > 0:
-                        return result
-
-    # Fallback: use calendar_dates.txt
-    if os.path.exists(calendar_dates_path):
-        with open(calendar_dates_path, encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            dates: set[str] = set()
-            for row in reader:
-                if row.get("exception_type") == "1" and row.get("date"):
-                    # Convert YYYYMMDD to YYYY-MM-DD
-                    d = row["date"]
-                    dates.add(f"{d[:4]}-{d[4:6]}-{d[6:]}")
-            if len(dates) > 0:
-                return sorted(dates)
+    if calendar.calendar_start is not None and calendar.calendar_end is not None:
+        start = calendar.calendar_start
+        end = calendar.calendar_end
+        result: List[str] = []
+        while start <= end:
+            result.append(start.strftime("%Y-%m-%d"))
+            start += timedelta(days=1)
+        if len(result) > 0:
+            return result
+
+    # Fallback: use the dates added in calendar_dates.txt
+    if calendar.added_dates:
+        return sorted(d.strftime("%Y-%m-%d") for d in calendar.added_dates)
 
     today = datetime.today()
     return [(today + timedelta(days=i)).strftime("%Y-%m-%d") for i in range(8)]
 
 
-def time_to_seconds(time_str: str) -> int:
-    """Convert HH:MM:SS to seconds since midnight."""
-    parts = time_str.split(":")
-    if len(parts) != 3:
-        return 0
-    hours, minutes, seconds = map(int, parts)
+SECONDS_PER_DAY = 24 * 3600
+
+# Stored in place of the seconds of an empty or malformed GTFS time
+NO_TIME = -1
+
+
+def parse_gtfs_time(time_str: str) -> int:
+    """
+    Convert a GTFS HH:MM:SS time to seconds since midnight, or NO_TIME.
+    Hours can exceed 24 (e.g., 25:30:00 for 1:30 AM next day).
+    """
+    try:
+        if len(time_str) == 8 and time_str[2] == ":" and time_str[5] == ":":
+            return (
+                int(time_str[0:2]) * 3600 + int(time_str[3:5]) * 60 + int(time_str[6:8])
+            )
+        parts = time_str.split(":")
+        if len(parts) != 3:
+            return NO_TIME
+        hours, minutes, seconds = map(int, parts)
+    except ValueError:
+        return NO_TIME
     return hours * 3600 + minutes * 60 + seconds
+
+
+# "MM:SS" of every second within an hour
+_MINUTES_SECONDS = [
+    f"{minutes:02d}:{seconds:02d}" for minutes in range(60) for seconds in range(60)
+]
+# Formatted times by seconds since midnight, filled as times are formatted so
+# that every arrival at the same time shares the same string
+_FORMATTED_TIMES: dict[int, str] = {}
+
+
+def format_gtfs_time(seconds: int) -> str:
+    """
+    Format seconds since midnight as HH:MM:SS, keeping hours >= 24.
+    NO_TIME is formatted as an empty string.
+    """
+    time_str = _FORMATTED_TIMES.get(seconds)
+    if time_str is None:
+        if seconds < 0:
+            return ""
+        hours, remainder = divmod(seconds, 3600)
+        time_str = f"{hours:02d}:{_MINUTES_SECONDS[remainder]}"
+        _FORMATTED_TIMES[seconds] = time_str
+    return time_str
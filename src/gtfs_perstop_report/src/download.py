@@ -1,17 +1,23 @@
+import hashlib
+import json
 import os
+import shutil
 import tempfile
-import zipfile
+from typing import Optional
+
 import requests
-import json
-from typing import Optional, Tuple
 
 from src.logger import get_logger
 
 logger = get_logger("download")
 
+# Seconds to wait to connect to the server and between chunks of the response
+DOWNLOAD_TIMEOUT = (10, 60)
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
 
 def _get_metadata_path(output_dir: str) -> str:
-    """Get the path to the metadata file for storing ETag and Last-Modified info."""
+    """Get the path to the metadata file storing ETag, Last-Modified and hash info."""
     return os.path.join(output_dir, ".gtfsmetadata")
 
 
@@ -28,11 +34,14 @@ def _load_metadata(output_dir: str) -> Optional[dict]:
 
 
 def _save_metadata(
-    output_dir: str, etag: Optional[str], last_modified: Optional[str]
+    output_dir: str,
+    etag: Optional[str],
+    last_modified: Optional[str],
+    sha256: Optional[str],
 ) -> None:
-    """Save ETag and Last-Modified metadata to the output directory."""
+    """Save ETag, Last-Modified and content hash metadata to the output directory."""
     metadata_path = _get_metadata_path(output_dir)
-    metadata = {"etag": etag, "last_modified": last_modified}
+    metadata = {"etag": etag, "last_modified": last_modified, "sha256": sha256}
 
     # Ensure output directory exists
     os.makedirs(output_dir, exist_ok=True)
@@ -44,48 +53,16 @@ def _save_metadata(
         logger.warning(f"Failed to save metadata to {metadata_path}: {e}")
 
 
-def _check_if_modified(
-    feed_url: str, output_dir: str
-) -> Tuple[bool, Optional[str], Optional[str]]:
-    """
-    Check if the feed has been modified using conditional headers.
-    Returns (is_modified, etag, last_modified)
-    """
-    metadata = _load_metadata(output_dir)
-    if not metadata:
-        return True, None, None
-
+def _get_conditional_headers(metadata: Optional[dict]) -> dict:
+    """Build the conditional request headers from the stored metadata."""
     headers = {}
+    if not metadata:
+        return headers
     if metadata.get("etag"):
         headers["If-None-Match"] = metadata["etag"]
     if metadata.get("last_modified"):
         headers["If-Modified-Since"] = metadata["last_modified"]
-
-    if not headers:
-        return True, None, None
-
-    try:
-        response = requests.head(feed_url, headers=headers)
-
-        if response.status_code == 304:
-            logger.info(
-                "Feed has not been modified (304 Not Modified), skipping download"
-            )
-            return False, metadata.get("etag"), metadata.get("last_modified")
-        elif response.status_code == 200:
-            etag = response.headers.get("ETag")
-            last_modified = response.headers.get("Last-Modified")
-            return True, etag, last_modified
-        else:
-            logger.warning(
-                f"Unexpected response status {response.status_code} when checking for modifications, proceeding with download"
-            )
-            return True, None, None
-    except requests.RequestException as e:
-        logger.warning(
-            f"Failed to check if feed has been modified: {e}, proceeding with download"
-        )
-        return True, None, None
+    return headers
 
 
 def download_feed_from_url(
@@ -94,53 +71,71 @@ def download_feed_from_url(
     """
     Download GTFS feed from URL.
 
+    A single conditional GET is sent with the ETag and Last-Modified of the
+    previous download, and the body is streamed to disk while its SHA-256 is
+    computed. The download is skipped when the server answers 304 Not Modified,
+    or when the content is the same as the previous download, for servers that
+    ignore conditional headers or publish the same feed again.
+
     Args:
         feed_url: URL to download the GTFS feed from
         output_dir: Directory where reports will be written (used for metadata storage)
         force_download: If True, skip conditional download checks
 
     Returns:
-        Path to the directory containing the extracted GTFS files, or None if download was skipped
+        Path to the downloaded GTFS zip file, in a new temporary directory, or None
+        if download was skipped
     """
-
-    # Check if we need to download the feed
+    metadata = None
     if not force_download and output_dir:
-        is_modified, cached_etag, cached_last_modified = _check_if_modified(
-            feed_url, output_dir
-        )
-        if not is_modified:
-            logger.info("Feed has not been modified, skipping download")
-            return None
+        metadata = _load_metadata(output_dir)
+
+    headers = _get_conditional_headers(metadata)
 
     # Create a directory in the system temporary directory
     temp_dir = tempfile.mkdtemp(prefix="gtfs_feed_")
 
     # Create a temporary zip file in the temporary directory
     zip_filename = os.path.join(temp_dir, "gtfs_vigo.zip")
+    content_hash = hashlib.sha256()
 
-    headers = {}
-    response = requests.get(feed_url, headers=headers)
-
-    if response.status_code != 200:
-        raise Exception(f"Failed to download GTFS data: {response.status_code}")
+    try:
+        with requests.get(
+            feed_url, headers=headers, stream=True, timeout=DOWNLOAD_TIMEOUT
+        ) as response:
+            if response.status_code == 304:
+                logger.info(
+                    "Feed has not been modified (304 Not Modified), skipping download"
+                )
+                shutil.rmtree(temp_dir)
+                return None
+
+            if response.status_code != 200:
+                raise Exception(f"Failed to download GTFS data: {response.status_code}")
+
+            with open(zip_filename, "wb") as file:
+                for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                    file.write(chunk)
+                    content_hash.update(chunk)
 
-    with open(zip_filename, "wb") as file:
-        file.write(response.content)
+            etag = response.headers.get("ETag")
+            last_modified = response.headers.get("Last-Modified")
+    except BaseException:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        raise
 
-    # Extract and save metadata if output_dir is provided
+    sha256 = content_hash.hexdigest()
     if output_dir:
-        etag = response.headers.get("ETag")
-        last_modified = response.headers.get("Last-Modified")
-        if etag or last_modified:
-            _save_metadata(output_dir, etag, last_modified)
-
-    # Extract the zip file
-    with zipfile.ZipFile(zip_filename, "r") as zip_ref:
-        zip_ref.extractall(temp_dir)
+        _save_metadata(output_dir, etag, last_modified, sha256)
 
-    # Clean up the downloaded zip file
-    os.remove(zip_filename)
+    if metadata and metadata.get("sha256") == sha256:
+        logger.info(
+            f"Feed content has not changed (SHA-256 {sha256[:12]}), skipping download"
+        )
+        shutil.rmtree(temp_dir)
+        return None
 
-    logger.info(f"GTFS feed downloaded from {feed_url} and extracted to {temp_dir}")
+    # The feed is read straight from the zip file, without extracting it
+    logger.info(f"GTFS feed downloaded from {feed_url} to {zip_filename}")
 
-    return temp_dir
+    return zip_filename
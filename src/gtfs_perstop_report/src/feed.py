@@ -0,0 +1,122 @@
+"""
+Access to the files of a GTFS feed, either extracted to a directory or still
+packed in its zip file.
+
+Every loader receives the path of the feed, which may be a directory or a zip
+file, and opens its members through open_feed_file. Members of a zip are read
+as streams straight out of the archive, without extracting them to disk.
+"""
+
+import hashlib
+import io
+import os
+import zipfile
+from contextlib import contextmanager
+from typing import IO, Dict, Iterator, Optional
+
+from src.cache import FeedCache
+
+# Files of the feed read by the report
+FEED_FILES = (
+    "stops.txt",
+    "routes.txt",
+    "trips.txt",
+    "calendar.txt",
+    "calendar_dates.txt",
+    "stop_times.txt",
+    "shapes.txt",
+)
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# Zip path -> file name -> name of the member in the archive
+ZIP_MEMBERS: FeedCache[Dict[str, str]] = FeedCache("zip_members")
+
+
+def is_feed_zip(feed_dir: str) -> bool:
+    """Whether the feed path points to a zip file rather than a directory."""
+    return os.path.isfile(feed_dir)
+
+
+def _get_zip_members(feed_dir: str) -> Dict[str, str]:
+    """
+    Map the file names of a zipped feed to their members. Feeds packed inside a
+    folder of the archive are supported, the shallowest member winning when a
+    file name appears more than once.
+    """
+    members = ZIP_MEMBERS.get(feed_dir)
+    if members is not None:
+        return members
+
+    members = {}
+    with zipfile.ZipFile(feed_dir) as zip_file:
+        names = [name for name in zip_file.namelist() if not name.endswith("/")]
+    for name in sorted(names, key=lambda name: name.count("/")):
+        members.setdefault(name.rsplit("/", 1)[-1], name)
+
+    ZIP_MEMBERS[feed_dir] = members
+    return members
+
+
+def feed_file_exists(feed_dir: str, file_name: str) -> bool:
+    """Whether the feed contains the given file, such as 'shapes.txt'."""
+    if is_feed_zip(feed_dir):
+        return file_name in _get_zip_members(feed_dir)
+    return os.path.isfile(os.path.join(feed_dir, file_name))
+
+
+@contextmanager
+def open_feed_file(
+    feed_dir: str, file_name: str, newline: Optional[str] = None
+) -> Iterator[IO[str]]:
+    """
+    Open a file of the feed as a UTF-8 text stream.
+
+    Args:
+        feed_dir: Path to the feed directory or zip file
+        file_name: Name of the file in the feed, such as 'stop_times.txt'
+        newline: Newline handling of the stream, as in open()
+
+    Raises:
+        FileNotFoundError: If the feed does not contain the file.
+    """
+    if not is_feed_zip(feed_dir):
+        with open(
+            os.path.join(feed_dir, file_name), "r", encoding="utf-8", newline=newline
+        ) as f:
+            yield f
+        return
+
+    member = _get_zip_members(feed_dir).get(file_name)
+    if member is None:
+        raise FileNotFoundError(f"{file_name} not found in {feed_dir}")
+
+    with zipfile.ZipFile(feed_dir) as zip_file:
+        with io.TextIOWrapper(
+            zip_file.open(member), encoding="utf-8", newline=newline
+        ) as f:
+            yield f
+
+
+def get_feed_hash(feed_dir: str) -> str:
+    """
+    Get the SHA-256 of the contents of a feed. For a zip, it is the hash of the
+    whole file, the same one stored for downloaded feeds; for a directory, of the
+    names and contents of the feed files it holds.
+    """
+    content_hash = hashlib.sha256()
+    if is_feed_zip(feed_dir):
+        paths = [feed_dir]
+    else:
+        paths = []
+        for file_name in FEED_FILES:
+            path = os.path.join(feed_dir, file_name)
+            if os.path.isfile(path):
+                content_hash.update(f"{file_name}:{os.path.getsize(path)}\n".encode())
+                paths.append(path)
+
+    for path in paths:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+                content_hash.update(chunk)
+    return content_hash.hexdigest()
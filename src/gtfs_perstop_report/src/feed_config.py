@@ -0,0 +1,163 @@
+"""
+Configuration of the feeds generated together in a single run.
+
+The configuration file is a JSON object listing the feeds, each with its
+provider, its source and its output directory:
+
+{
+    "feeds": [
+        {
+            "name": "vitrasa",
+            "provider": "vitrasa",
+            "feed_url": "https://datos.vigo.org/data/transporte/gtfs_vigo.zip",
+            "output_dir": "./output/vitrasa",
+            "rolling_dates": "./rolling_dates.json"
+        }
+    ]
+}
+
+Each feed takes exactly one of feed_dir, feed_zip or feed_url. The name
+defaults to the provider, and must be unique. force_download and
+rolling_dates are optional. Relative paths are resolved from the directory of
+the configuration file.
+"""
+
+import json
+import os
+import zipfile
+from typing import List, Optional
+
+from src.logger import get_logger
+from src.providers import get_provider
+
+logger = get_logger("feed_config")
+
+FEED_SOURCE_KEYS = ("feed_dir", "feed_zip", "feed_url")
+FEED_CONFIG_KEYS = {
+    "name",
+    "provider",
+    "output_dir",
+    "rolling_dates",
+    "force_download",
+    *FEED_SOURCE_KEYS,
+}
+
+
+class FeedConfig:
+    """Source, provider and output of one of the feeds of a run."""
+
+    __slots__ = (
+        "name",
+        "provider",
+        "output_dir",
+        "feed_dir",
+        "feed_zip",
+        "feed_url",
+        "force_download",
+        "rolling_dates",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        provider: str,
+        output_dir: str,
+        feed_dir: Optional[str] = None,
+        feed_zip: Optional[str] = None,
+        feed_url: Optional[str] = None,
+        force_download: bool = False,
+        rolling_dates: Optional[str] = None,
+    ):
+        self.name = name
+        self.provider = provider
+        self.output_dir = output_dir
+        self.feed_dir = feed_dir
+        self.feed_zip = feed_zip
+        self.feed_url = feed_url
+        self.force_download = force_download
+        self.rolling_dates = rolling_dates
+
+
+def _parse_feed(entry: dict, base_dir: str, force_download: bool) -> FeedConfig:
+    if not isinstance(entry, dict):
+        raise ValueError("Every feed must be a JSON object")
+
+    unknown_keys = entry.keys() - FEED_CONFIG_KEYS
+    if unknown_keys:
+        raise ValueError(f"Unknown feed keys: {', '.join(sorted(unknown_keys))}")
+
+    provider = entry.get("provider", "default")
+    # Raises ValueError for unknown providers
+    get_provider(provider)
+    name = entry.get("name", provider)
+
+    sources = [key for key in FEED_SOURCE_KEYS if entry.get(key)]
+    if len(sources) != 1:
+        raise ValueError(
+            f"Feed {name} must have exactly one of {', '.join(FEED_SOURCE_KEYS)}"
+        )
+    if not entry.get("output_dir"):
+        raise ValueError(f"Feed {name} has no output_dir")
+
+    def resolve(key: str) -> Optional[str]:
+        path = entry.get(key)
+        return os.path.normpath(os.path.join(base_dir, path)) if path else None
+
+    feed = FeedConfig(
+        name=name,
+        provider=provider,
+        output_dir=resolve("output_dir"),
+        feed_dir=resolve("feed_dir"),
+        feed_zip=resolve("feed_zip"),
+        feed_url=entry.get("feed_url"),
+        force_download=bool(entry.get("force_download", force_download)),
+        rolling_dates=resolve("rolling_dates"),
+    )
+    if feed.feed_dir and not os.path.isdir(feed.feed_dir):
+        raise ValueError(f"Feed directory of {name} does not exist: {feed.feed_dir}")
+    if feed.feed_zip and not zipfile.is_zipfile(feed.feed_zip):
+        raise ValueError(
+            f"Feed zip file of {name} does not exist or is not a zip: {feed.feed_zip}"
+        )
+    return feed
+
+
+def load_feed_configs(
+    config_path: str, force_download: bool = False
+) -> List[FeedConfig]:
+    """
+    Load the feeds of a run from a JSON configuration file.
+
+    Args:
+        config_path: Path to the JSON configuration file
+        force_download: Default force_download of the feeds that do not set it
+
+    Returns:
+        Configuration of every feed, in file order.
+
+    Raises:
+        FileNotFoundError: If the config file doesn't exist.
+        json.JSONDecodeError: If the config file is not valid JSON.
+        ValueError: If a feed is not valid, or two feeds share a name or an
+            output directory.
+    """
+    with open(config_path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    if not isinstance(data, dict) or not isinstance(data.get("feeds"), list):
+        raise ValueError("Feeds config must be a JSON object with a list of feeds")
+    if not data["feeds"]:
+        raise ValueError("Feeds config has no feeds")
+
+    base_dir = os.path.dirname(os.path.abspath(config_path))
+    feeds = [_parse_feed(entry, base_dir, force_download) for entry in data["feeds"]]
+
+    names = [feed.name for feed in feeds]
+    output_dirs = [os.path.normpath(feed.output_dir) for feed in feeds]
+    for key, values in (("name", names), ("output_dir", output_dirs)):
+        duplicates = sorted({value for value in values if values.count(value) > 1})
+        if duplicates:
+            raise ValueError(f"Feeds share the same {key}: {', '.join(duplicates)}")
+
+    logger.info(f"Loaded {len(feeds)} feeds from {config_path}")
+    return feeds
@@ -0,0 +1,257 @@
+"""
+Instrumentation of a run: nested timing spans, counters and peak memory.
+
+Spans are named after the stage of the pipeline they time and nest into paths
+such as 'process_date/stop_arrivals/expansion', accumulating the calls and
+seconds of every span with the same path. Counters add up quantities such as
+rows parsed or bytes written. Worker processes drain their spans and counters
+and send them back to the parent, which merges them and writes the totals of
+the run to run_metrics.json in the output directory.
+
+Stages are the spans of the main steps of the run (loading the feed, each date
+and the shapes), which record the resident set size of the process when they
+end and can also be profiled with cProfile and tracemalloc, with one dump of
+each per run of the stage. Workers also send back their peak resident set size,
+as workers still alive are not counted by getrusage(RUSAGE_CHILDREN).
+"""
+
+import cProfile
+import datetime
+import json
+import os
+import re
+import resource
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from src.logger import get_logger
+
+logger = get_logger("metrics")
+
+RUN_METRICS_FILE_NAME = "run_metrics.json"
+
+# Span path -> [calls, seconds]
+SPANS: Dict[str, List[float]] = {}
+# Counter name -> value
+COUNTERS: Dict[str, int] = {}
+# Stage path -> largest RSS of the process at the end of the stage, in bytes
+STAGE_RSS: Dict[str, int] = {}
+# Largest peak RSS of the worker processes whose metrics were merged, in bytes
+WORKER_PEAK_RSS = 0
+
+# Spans, counters, stage RSS and peak RSS of a worker, 0 in the main process
+Metrics = Tuple[Dict[str, List[float]], Dict[str, int], Dict[str, int], int]
+
+# Process the module was imported in, as opposed to forked workers
+_main_pid = os.getpid()
+
+# Paths of the spans currently open, innermost last
+_open_spans: List[str] = []
+# Directory the stage profiles are dumped to, None when not profiling
+_profile_dir: Optional[str] = None
+_profiling = False
+
+
+class Span:
+    """Timing of an open span, with its elapsed seconds set once it closes."""
+
+    __slots__ = ("path", "start", "elapsed")
+
+    def __init__(self, path: str):
+        self.path = path
+        self.start = time.perf_counter()
+        self.elapsed = 0.0
+
+
+@contextmanager
+def span(name: str) -> Iterator[Span]:
+    """
+    Time a block of code as a span nested in the span currently open.
+
+    Args:
+        name: Name of the span, such as 'trips'
+    """
+    path = f"{_open_spans[-1]}/{name}" if _open_spans else name
+    current = Span(path)
+    _open_spans.append(path)
+    try:
+        yield current
+    finally:
+        current.elapsed = time.perf_counter() - current.start
+        _open_spans.pop()
+        totals = SPANS.get(path)
+        if totals is None:
+            SPANS[path] = [1, current.elapsed]
+        else:
+            totals[0] += 1
+            totals[1] += current.elapsed
+
+
+def count(name: str, value: int = 1) -> None:
+    """Add a value to a counter of the run."""
+    COUNTERS[name] = COUNTERS.get(name, 0) + value
+
+
+def get_peak_rss() -> int:
+    """Get the peak resident set size of this process so far, in bytes."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def get_current_rss() -> int:
+    """
+    Get the current resident set size of this process in bytes, or its peak so
+    far where /proc is not available.
+    """
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            resident_pages = int(f.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return get_peak_rss()
+    return resident_pages * resource.getpagesize()
+
+
+def enable_profiling(profile_dir: str) -> None:
+    """Dump a cProfile and a tracemalloc snapshot of every stage to profile_dir."""
+    global _profile_dir
+    os.makedirs(profile_dir, exist_ok=True)
+    _profile_dir = profile_dir
+
+
+@contextmanager
+def stage(name: str, label: Optional[str] = None) -> Iterator[Span]:
+    """
+    Time a stage of the pipeline, profiling it when profiling is enabled.
+
+    Args:
+        name: Name of the stage span, such as 'process_date'
+        label: Distinguishes the profiles of each run of the stage, such as the
+            date processed
+    """
+    global _profiling
+
+    if _profile_dir is None or _profiling:
+        with span(name) as current:
+            yield current
+        _record_stage_rss(current.path)
+        return
+
+    file_name = re.sub(r"[^\w.-]", "_", f"{name}-{label}" if label else name)
+    profile_path = os.path.join(_profile_dir, f"{file_name}.prof")
+    snapshot_path = os.path.join(_profile_dir, f"{file_name}.tracemalloc")
+
+    _profiling = True
+    profiler = cProfile.Profile()
+    tracemalloc.start()
+    try:
+        with span(name) as current:
+            profiler.enable()
+            try:
+                yield current
+            finally:
+                profiler.disable()
+        profiler.dump_stats(profile_path)
+        tracemalloc.take_snapshot().dump(snapshot_path)
+        logger.info(f"Profiled stage {current.path} to {profile_path}")
+    finally:
+        tracemalloc.stop()
+        _profiling = False
+    _record_stage_rss(current.path)
+
+
+def _record_stage_rss(path: str) -> None:
+    STAGE_RSS[path] = max(get_current_rss(), STAGE_RSS.get(path, 0))
+
+
+def reset_metrics() -> None:
+    """
+    Forget the spans, counters and stage RSS recorded so far, keeping the open
+    spans. Run in forked workers, so that they do not send back what the parent
+    recorded.
+    """
+    global WORKER_PEAK_RSS
+    SPANS.clear()
+    COUNTERS.clear()
+    STAGE_RSS.clear()
+    WORKER_PEAK_RSS = 0
+
+
+def drain_metrics() -> Metrics:
+    """
+    Take the spans, counters and stage RSS recorded so far, resetting them,
+    along with the peak RSS of the process when it is a worker. Used to send the
+    work done in a worker process back to the parent.
+    """
+    peak_rss = get_peak_rss() if os.getpid() != _main_pid else 0
+    changes = (dict(SPANS), dict(COUNTERS), dict(STAGE_RSS), peak_rss)
+    reset_metrics()
+    return changes
+
+
+def merge_metrics(
+    spans: Dict[str, List[float]],
+    counters: Dict[str, int],
+    stage_rss: Dict[str, int],
+    peak_rss: int = 0,
+) -> None:
+    """Merge the spans, counters, stage RSS and peak RSS drained from a worker."""
+    global WORKER_PEAK_RSS
+    for path, (calls, seconds) in spans.items():
+        totals = SPANS.get(path)
+        if totals is None:
+            SPANS[path] = [calls, seconds]
+        else:
+            totals[0] += calls
+            totals[1] += seconds
+    for name, value in counters.items():
+        count(name, value)
+    for path, rss in stage_rss.items():
+        STAGE_RSS[path] = max(rss, STAGE_RSS.get(path, 0))
+    WORKER_PEAK_RSS = max(WORKER_PEAK_RSS, peak_rss)
+
+
+def write_run_metrics(
+    output_dir: str, started: datetime.datetime, run_info: Dict[str, object]
+) -> str:
+    """
+    Write the spans, counters and peak memory of the run to run_metrics.json.
+
+    Spans that ran in worker processes add up the time of every worker, so
+    their seconds may exceed the wall time of the run. The RSS of each stage is
+    the largest measured at the end of one of its runs, in any process.
+
+    Args:
+        output_dir: Output directory of the run
+        started: When the run started
+        run_info: Options of the run to record along with the metrics
+
+    Returns:
+        Path to the metrics file.
+    """
+    finished = datetime.datetime.now(datetime.timezone.utc)
+    metrics = {
+        "started": started.isoformat(timespec="seconds"),
+        "finished": finished.isoformat(timespec="seconds"),
+        "elapsed": round((finished - started).total_seconds(), 3),
+        **run_info,
+        "spans": {
+            path: {"calls": calls, "seconds": round(seconds, 6)}
+            for path, (calls, seconds) in sorted(SPANS.items())
+        },
+        "counters": dict(sorted(COUNTERS.items())),
+        "peak_rss": {
+            "main": get_peak_rss(),
+            "workers": WORKER_PEAK_RSS,
+        },
+        "stage_rss": dict(sorted(STAGE_RSS.items())),
+    }
+
+    os.makedirs(output_dir, exist_ok=True)
+    path = os.path.join(output_dir, RUN_METRICS_FILE_NAME)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(metrics, f, indent=2)
+    return path
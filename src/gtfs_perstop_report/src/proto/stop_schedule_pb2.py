@@ -13,7 +13,7 @@ _sym_db = _symbol_database.Default()
 
 
 DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(
-    b'\n\x13stop_schedule.proto\x12\x05proto"!\n\tEpsg25829\x12\t\n\x01x\x18\x01 \x01(\x01\x12\t\n\x01y\x18\x02 \x01(\x01"\x83\x04\n\x0cStopArrivals\x12\x0f\n\x07stop_id\x18\x01 \x01(\t\x12"\n\x08location\x18\x03 \x01(\x0b\x32\x10.proto.Epsg25829\x12\x36\n\x08\x61rrivals\x18\x05 \x03(\x0b\x32$.proto.StopArrivals.ScheduledArrival\x1a\x85\x03\n\x10ScheduledArrival\x12\x12\n\nservice_id\x18\x01 \x01(\t\x12\x0f\n\x07trip_id\x18\x02 \x01(\t\x12\x0c\n\x04line\x18\x03 \x01(\t\x12\r\n\x05route\x18\x04 \x01(\t\x12\x10\n\x08shape_id\x18\x05 \x01(\t\x12\x1b\n\x13shape_dist_traveled\x18\x06 \x01(\x01\x12\x15\n\rstop_sequence\x18\x0b \x01(\r\x12\x14\n\x0cnext_streets\x18\x0c \x03(\t\x12\x15\n\rstarting_code\x18\x15 \x01(\t\x12\x15\n\rstarting_name\x18\x16 \x01(\t\x12\x15\n\rstarting_time\x18\x17 \x01(\t\x12\x14\n\x0c\x63\x61lling_time\x18! \x01(\t\x12\x13\n\x0b\x63\x61lling_ssm\x18" \x01(\r\x12\x15\n\rterminus_code\x18) \x01(\t\x12\x15\n\rterminus_name\x18* \x01(\t\x12\x15\n\rterminus_time\x18+ \x01(\t\x12\x1e\n\x16previous_trip_shape_id\x18\x33 \x01(\t";\n\x05Shape\x12\x10\n\x08shape_id\x18\x01 \x01(\t\x12 \n\x06points\x18\x03 \x03(\x0b\x32\x10.proto.Epsg25829B$\xaa\x02!Costasdev.Busurbano.Backend.Typesb\x06proto3'
+    b'\n\x13stop_schedule.proto\x12\x05proto"!\n\tEpsg25829\x12\t\n\x01x\x18\x01 \x01(\x01\x12\t\n\x01y\x18\x02 \x01(\x01"\x83\x04\n\x0cStopArrivals\x12\x0f\n\x07stop_id\x18\x01 \x01(\t\x12"\n\x08location\x18\x03 \x01(\x0b\x32\x10.proto.Epsg25829\x12\x36\n\x08\x61rrivals\x18\x05 \x03(\x0b\x32$.proto.StopArrivals.ScheduledArrival\x1a\x85\x03\n\x10ScheduledArrival\x12\x12\n\nservice_id\x18\x01 \x01(\t\x12\x0f\n\x07trip_id\x18\x02 \x01(\t\x12\x0c\n\x04line\x18\x03 \x01(\t\x12\r\n\x05route\x18\x04 \x01(\t\x12\x10\n\x08shape_id\x18\x05 \x01(\t\x12\x1b\n\x13shape_dist_traveled\x18\x06 \x01(\x01\x12\x15\n\rstop_sequence\x18\x0b \x01(\r\x12\x14\n\x0cnext_streets\x18\x0c \x03(\t\x12\x15\n\rstarting_code\x18\x15 \x01(\t\x12\x15\n\rstarting_name\x18\x16 \x01(\t\x12\x15\n\rstarting_time\x18\x17 \x01(\t\x12\x14\n\x0c\x63\x61lling_time\x18! \x01(\t\x12\x13\n\x0b\x63\x61lling_ssm\x18" \x01(\r\x12\x15\n\rterminus_code\x18) \x01(\t\x12\x15\n\rterminus_name\x18* \x01(\t\x12\x15\n\rterminus_time\x18+ \x01(\t\x12\x1e\n\x16previous_trip_shape_id\x18\x33 \x01(\t"\xaf\x05\n\x0eStopArrivalsV2\x12\x0f\n\x07stop_id\x18\x01 \x01(\t\x12\x0f\n\x07strings\x18\x02 \x03(\t\x12"\n\x08location\x18\x03 \x01(\x0b\x32\x10.proto.Epsg25829\x12>\n\x10street_sequences\x18\x04 \x03(\x0b\x32$.proto.StopArrivalsV2.StreetSequence\x12\x38\n\x08\x61rrivals\x18\x05 \x03(\x0b\x32&.proto.StopArrivalsV2.ScheduledArrival\x1a!\n\x0eStreetSequence\x12\x0f\n\x07streets\x18\x01 \x03(\r\x1a\xb9\x03\n\x10ScheduledArrival\x12\x12\n\nservice_id\x18\x01 \x01(\r\x12\x0f\n\x07trip_id\x18\x02 \x01(\r\x12\x0c\n\x04line\x18\x03 \x01(\r\x12\r\n\x05route\x18\x04 \x01(\r\x12\x10\n\x08shape_id\x18\x05 \x01(\r\x12\x1b\n\x13shape_dist_traveled\x18\x06 \x01(\x01\x12\x15\n\rstop_sequence\x18\x0b \x01(\r\x12\x17\n\x0fstreet_sequence\x18\x0c \x01(\r\x12\x1b\n\x13next_streets_offset\x18\r \x01(\r\x12\x15\n\rstarting_code\x18\x15 \x01(\r\x12\x15\n\rstarting_name\x18\x16 \x01(\r\x12\x19\n\x0cstarting_ssm\x18\x17 \x01(\rH\x00\x88\x01\x01\x12\x13\n\x0b\x63\x61lling_ssm\x18" \x01(\r\x12\x15\n\rterminus_code\x18) \x01(\r\x12\x15\n\rterminus_name\x18* \x01(\r\x12\x19\n\x0cterminus_ssm\x18+ \x01(\rH\x01\x88\x01\x01\x12\x1e\n\x16previous_trip_shape_id\x18\x33 \x01(\rB\x0f\n\r_starting_ssmB\x0f\n\r_terminus_ssm";\n\x05Shape\x12\x10\n\x08shape_id\x18\x01 \x01(\t\x12 \n\x06points\x18\x03 \x03(\x0b\x32\x10.proto.Epsg25829"\x7f\n\x0c\x43ompactShape\x12\x10\n\x08shape_id\x18\x01 \x01(\t\x12)\n\x06levels\x18\x03 \x03(\x0b\x32\x19.proto.CompactShape.Level\x1a\x32\n\x05Level\x12\x11\n\ttolerance\x18\x01 \x01(\x01\x12\n\n\x02\x64x\x18\x02 \x03(\x11\x12\n\n\x02\x64y\x18\x03 \x03(\x11"\x9f\x01\n\x0eShapeStopIndex\x12\x10\n\x08shape_id\x18\x01 \x01(\t\x12\x31\n\x05stops\x18\x03 \x03(\x0b\x32".proto.ShapeStopIndex.StopPosition\x1aH\n\x0cStopPosition\x12\x0f\n\x07stop_id\x18\x01 \x01(\t\x12\x15\n\rsegment_index\x18\x02 \x01(\r\x12\x10\n\x08\x64istance\x18\x03 \x01(\x01\x42$\xaa\x02!Costasdev.Busurbano.Backend.Typesb\x06proto3'
 )
 
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, globals())
@@ -27,6 +27,20 @@ if _descriptor._USE_C_DESCRIPTORS == False:
     _STOPARRIVALS._serialized_end = 581
     _STOPARRIVALS_SCHEDULEDARRIVAL._serialized_start = 192
     _STOPARRIVALS_SCHEDULEDARRIVAL._serialized_end = 581
-    _SHAPE._serialized_start = 583
-    _SHAPE._serialized_end = 642
+    _STOPARRIVALSV2._serialized_start = 584
+    _STOPARRIVALSV2._serialized_end = 1271
+    _STOPARRIVALSV2_STREETSEQUENCE._serialized_start = 794
+    _STOPARRIVALSV2_STREETSEQUENCE._serialized_end = 827
+    _STOPARRIVALSV2_SCHEDULEDARRIVAL._serialized_start = 830
+    _STOPARRIVALSV2_SCHEDULEDARRIVAL._serialized_end = 1271
+    _SHAPE._serialized_start = 1273
+    _SHAPE._serialized_end = 1332
+    _COMPACTSHAPE._serialized_start = 1334
+    _COMPACTSHAPE._serialized_end = 1461
+    _COMPACTSHAPE_LEVEL._serialized_start = 1411
+    _COMPACTSHAPE_LEVEL._serialized_end = 1461
+    _SHAPESTOPINDEX._serialized_start = 1464
+    _SHAPESTOPINDEX._serialized_end = 1623
+    _SHAPESTOPINDEX_STOPPOSITION._serialized_start = 1551
+    _SHAPESTOPINDEX_STOPPOSITION._serialized_end = 1623
 # @@protoc_insertion_point(module_scope)
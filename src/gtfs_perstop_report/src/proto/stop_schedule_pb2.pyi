@@ -11,6 +11,33 @@ from typing import (
 
 DESCRIPTOR: _descriptor.FileDescriptor
 
+class CompactShape(_message.Message):
+    __slots__ = ["levels", "shape_id"]
+    class Level(_message.Message):
+        __slots__ = ["dx", "dy", "tolerance"]
+        DX_FIELD_NUMBER: _ClassVar[int]
+        DY_FIELD_NUMBER: _ClassVar[int]
+        TOLERANCE_FIELD_NUMBER: _ClassVar[int]
+        dx: _containers.RepeatedScalarFieldContainer[int]
+        dy: _containers.RepeatedScalarFieldContainer[int]
+        tolerance: float
+        def __init__(
+            self,
+            tolerance: _Optional[float] = ...,
+            dx: _Optional[_Iterable[int]] = ...,
+            dy: _Optional[_Iterable[int]] = ...,
+        ) -> None: ...
+
+    LEVELS_FIELD_NUMBER: _ClassVar[int]
+    SHAPE_ID_FIELD_NUMBER: _ClassVar[int]
+    levels: _containers.RepeatedCompositeFieldContainer[CompactShape.Level]
+    shape_id: str
+    def __init__(
+        self,
+        shape_id: _Optional[str] = ...,
+        levels: _Optional[_Iterable[_Union[CompactShape.Level, _Mapping]]] = ...,
+    ) -> None: ...
+
 class Epsg25829(_message.Message):
     __slots__ = ["x", "y"]
     X_FIELD_NUMBER: _ClassVar[int]
@@ -33,6 +60,35 @@ class Shape(_message.Message):
         points: _Optional[_Iterable[_Union[Epsg25829, _Mapping]]] = ...,
     ) -> None: ...
 
+class ShapeStopIndex(_message.Message):
+    __slots__ = ["shape_id", "stops"]
+    class StopPosition(_message.Message):
+        __slots__ = ["distance", "segment_index", "stop_id"]
+        DISTANCE_FIELD_NUMBER: _ClassVar[int]
+        SEGMENT_INDEX_FIELD_NUMBER: _ClassVar[int]
+        STOP_ID_FIELD_NUMBER: _ClassVar[int]
+        distance: float
+        segment_index: int
+        stop_id: str
+        def __init__(
+            self,
+            stop_id: _Optional[str] = ...,
+            segment_index: _Optional[int] = ...,
+            distance: _Optional[float] = ...,
+        ) -> None: ...
+
+    SHAPE_ID_FIELD_NUMBER: _ClassVar[int]
+    STOPS_FIELD_NUMBER: _ClassVar[int]
+    shape_id: str
+    stops: _containers.RepeatedCompositeFieldContainer[ShapeStopIndex.StopPosition]
+    def __init__(
+        self,
+        shape_id: _Optional[str] = ...,
+        stops: _Optional[
+            _Iterable[_Union[ShapeStopIndex.StopPosition, _Mapping]]
+        ] = ...,
+    ) -> None: ...
+
 class StopArrivals(_message.Message):
     __slots__ = ["arrivals", "location", "stop_id"]
     class ScheduledArrival(_message.Message):
@@ -124,3 +180,113 @@ class StopArrivals(_message.Message):
             _Iterable[_Union[StopArrivals.ScheduledArrival, _Mapping]]
         ] = ...,
     ) -> None: ...
+
+class StopArrivalsV2(_message.Message):
+    __slots__ = ["arrivals", "location", "stop_id", "street_sequences", "strings"]
+    class ScheduledArrival(_message.Message):
+        __slots__ = [
+            "calling_ssm",
+            "line",
+            "next_streets_offset",
+            "previous_trip_shape_id",
+            "route",
+            "service_id",
+            "shape_dist_traveled",
+            "shape_id",
+            "starting_code",
+            "starting_name",
+            "starting_ssm",
+            "stop_sequence",
+            "street_sequence",
+            "terminus_code",
+            "terminus_name",
+            "terminus_ssm",
+            "trip_id",
+        ]
+        CALLING_SSM_FIELD_NUMBER: _ClassVar[int]
+        LINE_FIELD_NUMBER: _ClassVar[int]
+        NEXT_STREETS_OFFSET_FIELD_NUMBER: _ClassVar[int]
+        PREVIOUS_TRIP_SHAPE_ID_FIELD_NUMBER: _ClassVar[int]
+        ROUTE_FIELD_NUMBER: _ClassVar[int]
+        SERVICE_ID_FIELD_NUMBER: _ClassVar[int]
+        SHAPE_DIST_TRAVELED_FIELD_NUMBER: _ClassVar[int]
+        SHAPE_ID_FIELD_NUMBER: _ClassVar[int]
+        STARTING_CODE_FIELD_NUMBER: _ClassVar[int]
+        STARTING_NAME_FIELD_NUMBER: _ClassVar[int]
+        STARTING_SSM_FIELD_NUMBER: _ClassVar[int]
+        STOP_SEQUENCE_FIELD_NUMBER: _ClassVar[int]
+        STREET_SEQUENCE_FIELD_NUMBER: _ClassVar[int]
+        TERMINUS_CODE_FIELD_NUMBER: _ClassVar[int]
+        TERMINUS_NAME_FIELD_NUMBER: _ClassVar[int]
+        TERMINUS_SSM_FIELD_NUMBER: _ClassVar[int]
+        TRIP_ID_FIELD_NUMBER: _ClassVar[int]
+        calling_ssm: int
+        line: int
+        next_streets_offset: int
+        previous_trip_shape_id: int
+        route: int
+        service_id: int
+        shape_dist_traveled: float
+        shape_id: int
+        starting_code: int
+        starting_name: int
+        starting_ssm: int
+        stop_sequence: int
+        street_sequence: int
+        terminus_code: int
+        terminus_name: int
+        terminus_ssm: int
+        trip_id: int
+        def __init__(
+            self,
+            service_id: _Optional[int] = ...,
+            trip_id: _Optional[int] = ...,
+            line: _Optional[int] = ...,
+            route: _Optional[int] = ...,
+            shape_id: _Optional[int] = ...,
+            shape_dist_traveled: _Optional[float] = ...,
+            stop_sequence: _Optional[int] = ...,
+            street_sequence: _Optional[int] = ...,
+            next_streets_offset: _Optional[int] = ...,
+            starting_code: _Optional[int] = ...,
+            starting_name: _Optional[int] = ...,
+            starting_ssm: _Optional[int] = ...,
+            calling_ssm: _Optional[int] = ...,
+            terminus_code: _Optional[int] = ...,
+            terminus_name: _Optional[int] = ...,
+            terminus_ssm: _Optional[int] = ...,
+            previous_trip_shape_id: _Optional[int] = ...,
+        ) -> None: ...
+
+    class StreetSequence(_message.Message):
+        __slots__ = ["streets"]
+        STREETS_FIELD_NUMBER: _ClassVar[int]
+        streets: _containers.RepeatedScalarFieldContainer[int]
+        def __init__(self, streets: _Optional[_Iterable[int]] = ...) -> None: ...
+
+    ARRIVALS_FIELD_NUMBER: _ClassVar[int]
+    LOCATION_FIELD_NUMBER: _ClassVar[int]
+    STOP_ID_FIELD_NUMBER: _ClassVar[int]
+    STREET_SEQUENCES_FIELD_NUMBER: _ClassVar[int]
+    STRINGS_FIELD_NUMBER: _ClassVar[int]
+    arrivals: _containers.RepeatedCompositeFieldContainer[
+        StopArrivalsV2.ScheduledArrival
+    ]
+    location: Epsg25829
+    stop_id: str
+    street_sequences: _containers.RepeatedCompositeFieldContainer[
+        StopArrivalsV2.StreetSequence
+    ]
+    strings: _containers.RepeatedScalarFieldContainer[str]
+    def __init__(
+        self,
+        stop_id: _Optional[str] = ...,
+        strings: _Optional[_Iterable[str]] = ...,
+        location: _Optional[_Union[Epsg25829, _Mapping]] = ...,
+        street_sequences: _Optional[
+            _Iterable[_Union[StopArrivalsV2.StreetSequence, _Mapping]]
+        ] = ...,
+        arrivals: _Optional[
+            _Iterable[_Union[StopArrivalsV2.ScheduledArrival, _Mapping]]
+        ] = ...,
+    ) -> None: ...
@@ -3,81 +3,652 @@ Report writers for various output formats (HTML, JSON).
 Centralizes all write operations for different report types.
 """
 
+import hashlib
 import json
+import mmap
 import os
-from typing import Any, Dict, List
+import shutil
+import struct
+from typing import Any, Collection, Dict, List, Optional, Tuple
 
+from src.arrivals import ArrivalTrip, ScheduledArrival
 from src.logger import get_logger
-from src.proto.stop_schedule_pb2 import Epsg25829, StopArrivals
+from src.metrics import count, span
+from src.proto.stop_schedule_pb2 import Epsg25829, StopArrivals, StopArrivalsV2
 
 
-def write_stop_protobuf(
+def _write_file(file_path: str, data: bytes) -> None:
+    """
+    Write a file by replacing it, never by truncating it in place, so that other
+    dates hard-linked to the previous version of the file are left untouched.
+    """
+    temp_path = f"{file_path}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(data)
+    os.replace(temp_path, file_path)
+
+
+class OutputManifest:
+    """
+    Content hashes of the files written to an output directory.
+
+    Files whose new contents hash the same as in the previous run are not
+    rewritten, and files written by the previous run but not by the current one
+    are removed as stale once the run has finished.
+    """
+
+    FILE_NAME = ".outputmanifest"
+
+    def __init__(self, output_dir: str):
+        self.output_dir = output_dir
+        self.previous: Dict[str, str] = self._load()
+        self.current: Dict[str, str] = {}
+        self.written = 0
+        self.skipped = 0
+        self.deleted = 0
+
+    def _get_path(self) -> str:
+        return os.path.join(self.output_dir, self.FILE_NAME)
+
+    def _load(self) -> Dict[str, str]:
+        path = self._get_path()
+        if not os.path.exists(path):
+            return {}
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (json.JSONDecodeError, IOError) as e:
+            get_logger("report_writer").warning(
+                f"Failed to load output manifest from {path}, rewriting all files: {e}"
+            )
+            return {}
+
+    def _relative(self, file_path: str) -> str:
+        return os.path.relpath(file_path, self.output_dir).replace(os.sep, "/")
+
+    def write(self, file_path: str, data: bytes) -> bool:
+        """
+        Write a file unless the previous run wrote the same contents to it.
+
+        Returns:
+            True if the file was written, False if it was left untouched.
+        """
+        relative_path = self._relative(file_path)
+        digest = hashlib.sha256(data).hexdigest()
+        self.current[relative_path] = digest
+
+        if self.previous.get(relative_path) == digest and os.path.exists(file_path):
+            self.skipped += 1
+            return False
+
+        _write_file(file_path, data)
+        self.written += 1
+        return True
+
+    def get_hash(self, file_path: str) -> Optional[str]:
+        """Get the hash of a file written during this run."""
+        return self.current.get(self._relative(file_path))
+
+    def record(self, file_path: str, digest: str) -> None:
+        """Record a file materialised by other means than write()."""
+        self.current[self._relative(file_path)] = digest
+
+    def drain(self) -> Tuple[Dict[str, str], int, int]:
+        """
+        Take the entries and counts recorded so far, resetting them. Used to send
+        the work done in a worker process back to the parent.
+        """
+        changes = (self.current, self.written, self.skipped)
+        self.current = {}
+        self.written = 0
+        self.skipped = 0
+        return changes
+
+    def merge(self, entries: Dict[str, str], written: int, skipped: int) -> None:
+        """Merge the changes drained from a worker's manifest."""
+        self.current.update(entries)
+        self.written += written
+        self.skipped += skipped
+
+    def remove_stale(self) -> int:
+        """
+        Delete the files written by the previous run that this run did not write,
+        along with the directories left empty.
+        """
+        directories: set[str] = set()
+        for relative_path in self.previous.keys() - self.current.keys():
+            file_path = os.path.join(self.output_dir, relative_path)
+            try:
+                os.remove(file_path)
+                self.deleted += 1
+            except FileNotFoundError:
+                pass
+            directories.add(os.path.dirname(file_path))
+
+        for directory in sorted(directories, reverse=True):
+            try:
+                os.rmdir(directory)
+            except OSError:
+                pass  # Not empty
+
+        return self.deleted
+
+    def save(self) -> None:
+        """Save the hashes of this run as the base for the next one."""
+        os.makedirs(self.output_dir, exist_ok=True)
+        _write_file(
+            self._get_path(),
+            json.dumps(self.current, separators=(",", ":"), sort_keys=True).encode(
+                "utf-8"
+            ),
+        )
+        self.previous = dict(self.current)
+
+
+def write_output_file(
+    file_path: str, data: bytes, manifest: Optional[OutputManifest] = None
+) -> bool:
+    """
+    Write an output file, skipping it when the manifest shows it is unchanged.
+
+    Returns:
+        True if the file was written, False if it was left untouched.
+    """
+    if manifest is not None:
+        written = manifest.write(file_path, data)
+    else:
+        _write_file(file_path, data)
+        written = True
+    if written:
+        count("bytes_written", len(data))
+    return written
+
+
+# Output formats of the stop reports: JSON, StopArrivals and StopArrivalsV2
+REPORT_FORMATS = ("json", "pb", "pb2")
+
+# File name suffix of the per-stop reports of each format
+REPORT_FILE_SUFFIXES = {"json": ".json", "pb": ".pb", "pb2": ".v2.pb"}
+
+_encode_json_string = json.encoder.encode_basestring
+
+
+def _encode_json_float(value: float) -> str:
+    """Encode a float exactly as json.dumps does."""
+    if value != value:
+        return "NaN"
+    if value == float("inf"):
+        return "Infinity"
+    if value == -float("inf"):
+        return "-Infinity"
+    return float.__repr__(value)
+
+
+def _encode_json_optional(value) -> str:
+    """Encode an optional string or number exactly as json.dumps does."""
+    if value is None:
+        return "null"
+    if isinstance(value, str):
+        return _encode_json_string(value)
+    if isinstance(value, float):
+        return _encode_json_float(value)
+    return int.__repr__(value)
+
+
+def _encode_arrival_json(arrival: ScheduledArrival) -> str:
+    """
+    Encode an arrival as the JSON object json.dumps would produce for its
+    dictionary, without building the dictionary.
+    """
+    trip = arrival.trip
+    next_streets = ", ".join(map(_encode_json_string, arrival.next_streets))
+    return (
+        f'{{"service_id": {_encode_json_string(trip.service_id)}, '
+        f'"trip_id": {_encode_json_string(trip.trip_id)}, '
+        f'"line": {_encode_json_string(trip.line)}, '
+        f'"route": {_encode_json_string(trip.route)}, '
+        f'"shape_id": {_encode_json_optional(trip.shape_id)}, '
+        f'"stop_sequence": {int.__repr__(arrival.stop_sequence)}, '
+        f'"shape_dist_traveled": {_encode_json_optional(arrival.shape_dist_traveled)}, '
+        f'"next_streets": [{next_streets}], '
+        f'"starting_code": {_encode_json_string(trip.starting_code)}, '
+        f'"starting_name": {_encode_json_string(trip.starting_name)}, '
+        f'"starting_time": {_encode_json_string(trip.starting_time)}, '
+        f'"calling_time": {_encode_json_string(arrival.calling_time)}, '
+        f'"calling_ssm": {int.__repr__(arrival.calling_ssm)}, '
+        f'"terminus_code": {_encode_json_string(trip.terminus_code)}, '
+        f'"terminus_name": {_encode_json_string(trip.terminus_name)}, '
+        f'"terminus_time": {_encode_json_string(trip.terminus_time)}, '
+        '"previous_trip_shape_id": '
+        f"{_encode_json_string(trip.previous_trip_shape_id)}}}"
+    )
+
+
+def _encode_arrival_protobuf(
+    arrival: ScheduledArrival,
+) -> StopArrivals.ScheduledArrival:
+    trip = arrival.trip
+    return StopArrivals.ScheduledArrival(
+        service_id=trip.service_id,
+        trip_id=trip.trip_id,
+        line=trip.line,
+        route=trip.route,
+        shape_id=trip.shape_id,
+        shape_dist_traveled=arrival.shape_dist_traveled,
+        stop_sequence=arrival.stop_sequence,
+        next_streets=arrival.next_streets,
+        starting_code=trip.starting_code,
+        starting_name=trip.starting_name,
+        starting_time=trip.starting_time,
+        calling_time=arrival.calling_time,
+        calling_ssm=arrival.calling_ssm,
+        terminus_code=trip.terminus_code,
+        terminus_name=trip.terminus_name,
+        terminus_time=trip.terminus_time,
+        previous_trip_shape_id=trip.previous_trip_shape_id,
+    )
+
+
+def _intern_string(strings: Dict[str, int], value: Optional[str]) -> int:
+    """Get the index of a string in a StopArrivalsV2 string table, adding it if new."""
+    if not value:
+        return 0
+    return strings.setdefault(value, len(strings))
+
+
+def _encode_trip_protobuf_v2(
+    trip: ArrivalTrip, strings: Dict[str, int]
+) -> Dict[str, Optional[int]]:
+    """
+    Encode the trip-level fields of StopArrivalsV2.ScheduledArrival. A missing
+    first or last time leaves starting_ssm or terminus_ssm unset.
+    """
+    return {
+        "service_id": _intern_string(strings, trip.service_id),
+        "trip_id": _intern_string(strings, trip.trip_id),
+        "line": _intern_string(strings, trip.line),
+        "route": _intern_string(strings, trip.route),
+        "shape_id": _intern_string(strings, trip.shape_id),
+        "starting_code": _intern_string(strings, trip.starting_code),
+        "starting_name": _intern_string(strings, trip.starting_name),
+        "starting_ssm": trip.starting_ssm,
+        "terminus_code": _intern_string(strings, trip.terminus_code),
+        "terminus_name": _intern_string(strings, trip.terminus_name),
+        "terminus_ssm": trip.terminus_ssm,
+        "previous_trip_shape_id": _intern_string(strings, trip.previous_trip_shape_id),
+    }
+
+
+def _intern_street_sequence(
+    sequences: Dict[Tuple[int, ...], int],
+    strings: Dict[str, int],
+    street_sequence: List[str],
+) -> int:
+    """
+    Get the index of a street sequence in the street_sequences of a
+    StopArrivalsV2, adding it if new. Trips going through the same streets
+    share the same sequence.
+    """
+    if not street_sequence:
+        return 0
+    key = tuple(_intern_string(strings, street) for street in street_sequence)
+    return sequences.setdefault(key, len(sequences))
+
+
+def decode_next_streets(
+    report: StopArrivalsV2, arrival: StopArrivalsV2.ScheduledArrival
+) -> List[str]:
+    """
+    Rebuild the next_streets list of a StopArrivalsV2 arrival, as in StopArrivals.
+
+    Args:
+        report: The StopArrivalsV2 the arrival belongs to
+        arrival: The arrival
+
+    Returns:
+        Names of the streets the trip goes through after the stop.
+    """
+    if not arrival.street_sequence:
+        return []
+    streets = report.street_sequences[arrival.street_sequence].streets
+    return [report.strings[index] for index in streets[arrival.next_streets_offset :]]
+
+
+def encode_stop_reports(
+    stop_code: str,
+    arrivals: List[ScheduledArrival],
+    location: Optional[Tuple[float, float]],
+    formats: Collection[str] = REPORT_FORMATS,
+) -> Dict[str, bytes]:
+    """
+    Encode the reports of a stop in every requested format, encoding each
+    arrival for all of them in a single pass.
+
+    Args:
+        stop_code: Stop code identifier
+        arrivals: Arrivals at the stop, sorted by calling time
+        location: EPSG:25829 (x, y) of the stop, the Protobuf reports are only
+            encoded for stops with a location
+        formats: Formats to encode, any of REPORT_FORMATS
+
+    Returns:
+        Dictionary of format -> encoded report, without the skipped formats.
+    """
+    json_items: Optional[List[str]] = [] if "json" in formats else None
+    pb_items: Optional[List[StopArrivals.ScheduledArrival]] = (
+        [] if "pb" in formats and location is not None else None
+    )
+    pb2_items: Optional[List[StopArrivalsV2.ScheduledArrival]] = (
+        [] if "pb2" in formats and location is not None else None
+    )
+
+    # String and street sequence tables of the StopArrivalsV2 report, where
+    # index 0 is the empty string and the empty sequence
+    strings: Dict[str, int] = {"": 0}
+    sequences: Dict[Tuple[int, ...], int] = {(): 0}
+    trip_fields: Dict[ArrivalTrip, Dict[str, int]] = {}
+
+    for arrival in arrivals:
+        if json_items is not None:
+            json_items.append(_encode_arrival_json(arrival))
+        if pb_items is not None:
+            pb_items.append(_encode_arrival_protobuf(arrival))
+        if pb2_items is not None:
+            fields = trip_fields.get(arrival.trip)
+            if fields is None:
+                fields = _encode_trip_protobuf_v2(arrival.trip, strings)
+                fields["street_sequence"] = _intern_street_sequence(
+                    sequences, strings, arrival.trip.street_sequence
+                )
+                trip_fields[arrival.trip] = fields
+            pb2_items.append(
+                StopArrivalsV2.ScheduledArrival(
+                    shape_dist_traveled=arrival.shape_dist_traveled,
+                    stop_sequence=arrival.stop_sequence,
+                    next_streets_offset=arrival.next_streets_offset,
+                    calling_ssm=arrival.calling_ssm,
+                    **fields,
+                )
+            )
+
+    reports: Dict[str, bytes] = {}
+    if json_items is not None:
+        reports["json"] = ("[" + ", ".join(json_items) + "]").encode("utf-8")
+
+    if pb_items is not None:
+        reports["pb"] = StopArrivals(
+            stop_id=stop_code,
+            location=Epsg25829(x=location[0], y=location[1]),
+            arrivals=pb_items,
+        ).SerializeToString()
+
+    if pb2_items is not None:
+        reports["pb2"] = StopArrivalsV2(
+            stop_id=stop_code,
+            strings=list(strings),
+            location=Epsg25829(x=location[0], y=location[1]),
+            street_sequences=[
+                StopArrivalsV2.StreetSequence(streets=streets) for streets in sequences
+            ],
+            arrivals=pb2_items,
+        ).SerializeToString()
+
+    return reports
+
+
+def write_stop_reports(
     output_dir: str,
     date: str,
     stop_code: str,
-    arrivals: List[Dict[str, Any]],
-    stop_x: float,
-    stop_y: float,
-) -> None:
+    arrivals: List[ScheduledArrival],
+    location: Optional[Tuple[float, float]],
+    formats: Collection[str] = REPORT_FORMATS,
+    manifest: Optional[OutputManifest] = None,
+    bundles: Optional[Dict[str, Dict[str, bytes]]] = None,
+) -> Dict[str, int]:
     """
-    Write stop arrivals data to a Protobuf file.
+    Write the reports of a stop in every requested format.
 
     Args:
         output_dir: Base output directory
         date: Date string for the data
         stop_code: Stop code identifier
-        stop_arrivals_proto: Serialized Protobuf data
+        arrivals: Arrivals at the stop, sorted by calling time
+        location: EPSG:25829 (x, y) of the stop, the Protobuf reports are only
+            written for stops with a location
+        formats: Formats to write, any of REPORT_FORMATS
+        manifest: Optional manifest used to skip unchanged files
+        bundles: When given, the Protobuf reports of each format in it are added
+            to its dictionary of stop_code -> serialized message, to be written
+            with write_stop_bundle, instead of to their own files
+
+    Returns:
+        Dictionary of format -> size in bytes of the report written.
     """
     logger = get_logger("report_writer")
 
-    item = StopArrivals(
-        stop_id=stop_code,
-        location=Epsg25829(x=stop_x, y=stop_y),
-        arrivals=[
-            StopArrivals.ScheduledArrival(
-                service_id=arrival["service_id"],
-                trip_id=arrival["trip_id"],
-                line=arrival["line"],
-                route=arrival["route"],
-                shape_id=arrival["shape_id"],
-                shape_dist_traveled=arrival["shape_dist_traveled"],
-                stop_sequence=arrival["stop_sequence"],
-                next_streets=arrival["next_streets"],
-                starting_code=arrival["starting_code"],
-                starting_name=arrival["starting_name"],
-                starting_time=arrival["starting_time"],
-                calling_time=arrival["calling_time"],
-                calling_ssm=arrival["calling_ssm"],
-                terminus_code=arrival["terminus_code"],
-                terminus_name=arrival["terminus_name"],
-                terminus_time=arrival["terminus_time"],
-                previous_trip_shape_id=arrival.get("previous_trip_shape_id", ""),
+    with span("encode"):
+        reports = encode_stop_reports(stop_code, arrivals, location, formats)
+
+    # Create the stops directory for this date
+    date_dir = os.path.join(output_dir, date)
+    os.makedirs(date_dir, exist_ok=True)
+
+    for report_format, data in reports.items():
+        if bundles is not None and report_format in bundles:
+            bundles[report_format][stop_code] = data
+            continue
+
+        file_path = os.path.join(
+            date_dir, f"{stop_code}{REPORT_FILE_SUFFIXES[report_format]}"
+        )
+        try:
+            with span(report_format):
+                write_output_file(file_path, data, manifest)
+            logger.debug(f"Stop {report_format} report written to: {file_path}")
+        except Exception as e:
+            logger.error(
+                f"Error writing stop {report_format} report to {file_path}: {e}"
             )
-            for arrival in arrivals
-        ],
-    )
+            raise
 
-    try:
-        # Create the stops directory for this date
-        date_dir = os.path.join(output_dir, date)
-        os.makedirs(date_dir, exist_ok=True)
+    return {report_format: len(data) for report_format, data in reports.items()}
 
-        # Create the Protobuf file
-        file_path = os.path.join(date_dir, f"{stop_code}.pb")
 
-        with open(file_path, "wb") as f:
-            f.write(item.SerializeToString())
+# Per-date bundle of serialized StopArrivals (or StopArrivalsV2), stored in the
+# date directory:
+#
+#   magic "BSAB" | version u16 | reserved u16 | stop count u32
+#   index, one entry per stop sorted by stop code:
+#       code length u16 | code UTF-8 | offset u64 | length u32
+#   concatenated StopArrivals messages
+#
+# Integers are little-endian and offsets are from the start of the file.
+BUNDLE_FILE_NAME = "stop_arrivals.bundle"
+# Bundle file name of each Protobuf report format
+BUNDLE_FILE_NAMES = {"pb": BUNDLE_FILE_NAME, "pb2": "stop_arrivals_v2.bundle"}
+BUNDLE_MAGIC = b"BSAB"
+BUNDLE_VERSION = 1
+_BUNDLE_HEADER = struct.Struct("<4sHHI")
+_BUNDLE_CODE_LENGTH = struct.Struct("<H")
+_BUNDLE_ENTRY = struct.Struct("<QI")
 
-        logger.debug(f"Stop Protobuf written to: {file_path}")
+
+def write_stop_bundle(
+    output_dir: str,
+    date: str,
+    reports: Dict[str, bytes],
+    manifest: Optional[OutputManifest] = None,
+    file_name: str = BUNDLE_FILE_NAME,
+) -> str:
+    """
+    Write the serialized StopArrivals of every stop of a date to a single bundle.
+
+    Args:
+        output_dir: Base output directory
+        date: Date string for the data
+        reports: Dictionary of stop_code -> serialized StopArrivals
+        manifest: Optional manifest used to skip unchanged files
+        file_name: Name of the bundle file in the date directory
+
+    Returns:
+        Path to the bundle file.
+    """
+    logger = get_logger("report_writer")
+
+    stop_codes = sorted(reports)
+    encoded_codes = [stop_code.encode("utf-8") for stop_code in stop_codes]
+
+    index_size = sum(
+        _BUNDLE_CODE_LENGTH.size + len(code) + _BUNDLE_ENTRY.size
+        for code in encoded_codes
+    )
+    offset = _BUNDLE_HEADER.size + index_size
+
+    parts = [_BUNDLE_HEADER.pack(BUNDLE_MAGIC, BUNDLE_VERSION, 0, len(stop_codes))]
+    for stop_code, code in zip(stop_codes, encoded_codes):
+        length = len(reports[stop_code])
+        parts.append(_BUNDLE_CODE_LENGTH.pack(len(code)))
+        parts.append(code)
+        parts.append(_BUNDLE_ENTRY.pack(offset, length))
+        offset += length
+    parts.extend(reports[stop_code] for stop_code in stop_codes)
+
+    date_dir = os.path.join(output_dir, date)
+    os.makedirs(date_dir, exist_ok=True)
+    file_path = os.path.join(date_dir, file_name)
+    try:
+        with span("bundle"):
+            write_output_file(file_path, b"".join(parts), manifest)
+        logger.debug(f"Stop bundle written to: {file_path}")
     except Exception as e:
-        logger.error(
-            f"Error writing stop Protobuf to {output_dir}/stops/{date}/{stop_code}.pb: {e}"
-        )
+        logger.error(f"Error writing stop bundle to {file_path}: {e}")
         raise
 
+    return file_path
+
+
+class StopArrivalsBundle:
+    """
+    Reader for the per-date bundles written by write_stop_bundle.
+
+    The file is memory-mapped and lookups return views into the mapping, so no
+    report is copied or parsed until it is asked for. Bundles of StopArrivalsV2
+    reports are read by passing message_type=StopArrivalsV2. Use it as a context
+    manager, or call close, to unmap the file.
+    """
+
+    def __init__(self, file_path: str, message_type=StopArrivals):
+        self.file_path = file_path
+        self.message_type = message_type
+        with open(file_path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+        self._index: Dict[str, Tuple[int, int]] = {}
+
+        magic, version, _, count = _BUNDLE_HEADER.unpack_from(self._view, 0)
+        if magic != BUNDLE_MAGIC:
+            self.close()
+            raise ValueError(f"Not a stop arrivals bundle: {file_path}")
+        if version != BUNDLE_VERSION:
+            self.close()
+            raise ValueError(f"Unsupported bundle version {version}: {file_path}")
+
+        position = _BUNDLE_HEADER.size
+        for _ in range(count):
+            (code_length,) = _BUNDLE_CODE_LENGTH.unpack_from(self._view, position)
+            position += _BUNDLE_CODE_LENGTH.size
+            stop_code = str(self._view[position : position + code_length], "utf-8")
+            position += code_length
+            self._index[stop_code] = _BUNDLE_ENTRY.unpack_from(self._view, position)
+            position += _BUNDLE_ENTRY.size
+
+    def __enter__(self) -> "StopArrivalsBundle":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, stop_code: str) -> bool:
+        return stop_code in self._index
+
+    def stop_codes(self) -> List[str]:
+        """Get the codes of every stop in the bundle, in index order."""
+        return list(self._index)
+
+    def get_bytes(self, stop_code: str) -> Optional[memoryview]:
+        """
+        Get a zero-copy view of the serialized StopArrivals of a stop.
+
+        The view must not be used once the bundle is closed. Copy it with bytes()
+        to keep the report longer.
+        """
+        entry = self._index.get(stop_code)
+        if entry is None:
+            return None
+        offset, length = entry
+        return self._view[offset : offset + length]
+
+    def get(self, stop_code: str):
+        """Get the parsed report of a stop, as an instance of message_type."""
+        data = self.get_bytes(stop_code)
+        if data is None:
+            return None
+        item = self.message_type()
+        item.ParseFromString(data)
+        return item
+
+    def close(self) -> None:
+        """
+        Unmap the file. If views returned by get_bytes are still referenced, the
+        file stays mapped until the last of them is garbage collected.
+        """
+        if self._mmap is None:
+            return
+        self._view.release()
+        try:
+            self._mmap.close()
+        except BufferError:
+            # The views keep a reference to the mapping, closed along with them
+            pass
+        self._mmap = None
+
+
+def write_stop_protobuf(
+    output_dir: str,
+    date: str,
+    stop_code: str,
+    arrivals: List[ScheduledArrival],
+    stop_x: float,
+    stop_y: float,
+    manifest: Optional[OutputManifest] = None,
+) -> None:
+    """
+    Write stop arrivals data to a Protobuf file.
+
+    Args:
+        output_dir: Base output directory
+        date: Date string for the data
+        stop_code: Stop code identifier
+        arrivals: Arrivals at the stop
+        stop_x: EPSG:25829 X coordinate of the stop
+        stop_y: EPSG:25829 Y coordinate of the stop
+        manifest: Optional manifest used to skip unchanged files
+    """
+    write_stop_reports(
+        output_dir, date, stop_code, arrivals, (stop_x, stop_y), ("pb",), manifest
+    )
+
 
 def write_stop_json(
-    output_dir: str, date: str, stop_code: str, arrivals: List[Dict[str, Any]]
+    output_dir: str,
+    date: str,
+    stop_code: str,
+    arrivals: List[ScheduledArrival],
+    manifest: Optional[OutputManifest] = None,
 ) -> None:
     """
     Write stop arrivals data to a JSON file.
@@ -86,28 +657,70 @@ def write_stop_json(
         output_dir: Base output directory
         date: Date string for the data
         stop_code: Stop code identifier
-        arrivals: List of arrival dictionaries
-        pretty: Whether to format JSON with indentation
+        arrivals: Arrivals at the stop
+        manifest: Optional manifest used to skip unchanged files
+    """
+    write_stop_reports(output_dir, date, stop_code, arrivals, None, ("json",), manifest)
+
+
+def link_date_reports(
+    output_dir: str,
+    source_date: str,
+    target_date: str,
+    manifest: Optional[OutputManifest] = None,
+) -> Tuple[int, int]:
+    """
+    Materialise the reports of target_date as hard links to those of source_date,
+    for dates whose reports are identical. Falls back to copying the files when
+    the filesystem does not support hard links.
+
+    Args:
+        output_dir: Base output directory
+        source_date: Date whose reports have been generated
+        target_date: Date to materialise with the same reports
+        manifest: Optional manifest to record the linked files in
+
+    Returns:
+        Tuple of (number of files, total bytes) materialised.
     """
     logger = get_logger("report_writer")
 
-    try:
-        # Create the stops directory for this date
-        date_dir = os.path.join(output_dir, date)
-        os.makedirs(date_dir, exist_ok=True)
+    source_dir = os.path.join(output_dir, source_date)
+    if not os.path.isdir(source_dir):
+        return 0, 0
 
-        # Create the JSON file
-        file_path = os.path.join(date_dir, f"{stop_code}.json")
+    target_dir = os.path.join(output_dir, target_date)
+    os.makedirs(target_dir, exist_ok=True)
 
-        with open(file_path, "w", encoding="utf-8") as f:
-            json.dump(arrivals, f, ensure_ascii=False)
+    files = 0
+    total_bytes = 0
+    for entry in os.scandir(source_dir):
+        if not entry.is_file() or entry.name.endswith(".tmp"):
+            continue
 
-        logger.debug(f"Stop JSON written to: {file_path}")
-    except Exception as e:
-        logger.error(
-            f"Error writing stop JSON to {output_dir}/stops/{date}/{stop_code}.json: {e}"
-        )
-        raise
+        target_path = os.path.join(target_dir, entry.name)
+        if manifest is not None:
+            digest = manifest.get_hash(entry.path)
+            if digest is None:
+                continue  # Stale file from a previous run, not part of this date
+            manifest.record(target_path, digest)
+
+        try:
+            if os.path.lexists(target_path):
+                if os.path.samefile(entry.path, target_path):
+                    files += 1
+                    total_bytes += entry.stat().st_size
+                    continue
+                os.remove(target_path)
+            os.link(entry.path, target_path)
+        except OSError:
+            shutil.copyfile(entry.path, target_path)
+
+        files += 1
+        total_bytes += entry.stat().st_size
+
+    logger.debug(f"Linked {files} reports of {source_date} into {target_date}")
+    return files, total_bytes
 
 
 def write_index_json(
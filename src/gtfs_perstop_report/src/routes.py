@@ -2,31 +2,41 @@
 Module for loading and querying GTFS routes data.
 """
 
-import os
 import csv
+import os
+
+from src.cache import FeedCache
+from src.feed import open_feed_file
 from src.logger import get_logger
 
 logger = get_logger("routes")
 
+ROUTES_BY_FEED: FeedCache[dict[str, dict[str, str]]] = FeedCache("routes")
+
 
 def load_routes(feed_dir: str) -> dict[str, dict[str, str]]:
     """
     Load routes data from the GTFS feed.
 
     Returns:
-        dict[str, dict[str, str]]: A dictionary where keys are route IDs and values are dictionaries
-              containing route_short_name and route_color.
+        dict[str, dict[str, str]]: A dictionary where keys are route IDs and values
+              are dictionaries containing route_short_name and route_color.
     """
+    cached_routes = ROUTES_BY_FEED.get(feed_dir)
+    if cached_routes is not None:
+        return cached_routes
+
     routes: dict[str, dict[str, str]] = {}
     routes_file_path = os.path.join(feed_dir, "routes.txt")
 
     try:
-        with open(routes_file_path, "r", encoding="utf-8") as routes_file:
+        with open_feed_file(feed_dir, "routes.txt") as routes_file:
             reader = csv.DictReader(routes_file)
             header = reader.fieldnames or []
             if "route_color" not in header:
                 logger.warning(
-                    "Column 'route_color' not found in routes.txt. Defaulting to black (#000000)."
+                    "Column 'route_color' not found in routes.txt. Defaulting to "
+                    "black (#000000)."
                 )
 
             for row in reader:
@@ -44,4 +54,5 @@ def load_routes(feed_dir: str) -> dict[str, dict[str, str]]:
     except KeyError as e:
         raise KeyError(f"Missing required column in routes file: {e}")
 
+    ROUTES_BY_FEED[feed_dir] = routes
     return routes
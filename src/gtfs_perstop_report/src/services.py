@@ -1,120 +1,262 @@
-import os
+import csv
 import datetime
+
+from src.cache import FeedCache
+from src.feed import open_feed_file
 from src.logger import get_logger
 
 logger = get_logger("services")
 
 
-def get_active_services(feed_dir: str, date: str) -> list[str]:
-    """
-    Get active services for a given date based on the 'calendar.txt' and 'calendar_dates.txt' files.
+WEEKDAY_COLUMNS = [
+    "monday",
+    "tuesday",
+    "wednesday",
+    "thursday",
+    "friday",
+    "saturday",
+    "sunday",
+]
 
-    Args:
-        date (str): Date in 'YYYY-MM-DD' format.
 
-    Returns:
-        list[str]: List of active service IDs for the given date.
+def _parse_gtfs_date(value: str) -> datetime.date:
+    """Parse a GTFS YYYYMMDD date."""
+    return datetime.date(int(value[:4]), int(value[4:6]), int(value[6:8]))
 
-    Raises:
-        ValueError: If the date format is incorrect.
+
+class ServiceCalendar:
+    """
+    Activity bitmap of every service over all the dates covered by a feed.
+
+    Built once per feed from 'calendar.txt' and 'calendar_dates.txt', with the
+    exceptions already applied. Each day in the covered range has an integer
+    bitmask where bit N is set when service_ids[N] runs on that day.
     """
-    search_date = date.replace("-", "").replace(":", "").replace("/", "")
-    weekday = datetime.datetime.strptime(date, "%Y-%m-%d").weekday()
-    active_services: list[str] = []
+
+    def __init__(self):
+        self.service_ids: list[str] = []
+        self.start_date: datetime.date | None = None
+        # Range covered by calendar.txt only, used to enumerate the feed dates
+        self.calendar_start: datetime.date | None = None
+        self.calendar_end: datetime.date | None = None
+        # Dates where calendar_dates.txt adds a service (exception_type 1)
+        self.added_dates: set[datetime.date] = set()
+
+        self._service_index: dict[str, int] = {}
+        self._day_masks: list[int] = []
+        self._active_by_day: dict[int, list[str]] = {}
+
+    def _get_service_index(self, service_id: str) -> int:
+        index = self._service_index.get(service_id)
+        if index is None:
+            index = len(self.service_ids)
+            self._service_index[service_id] = index
+            self.service_ids.append(service_id)
+        return index
+
+    def _day_offset(self, date: datetime.date) -> int | None:
+        if self.start_date is None:
+            return None
+        offset = (date - self.start_date).days
+        if offset < 0 or offset >= len(self._day_masks):
+            return None
+        return offset
+
+    def get_active_services(self, date: str) -> list[str]:
+        """
+        Get the services active on a date in 'YYYY-MM-DD' format.
+
+        Raises:
+            ValueError: If the date format is incorrect.
+        """
+        day = datetime.datetime.strptime(date, "%Y-%m-%d").date()
+        offset = self._day_offset(day)
+        if offset is None:
+            return []
+
+        active = self._active_by_day.get(offset)
+        if active is None:
+            mask = self._day_masks[offset]
+            active = [
+                service_id
+                for index, service_id in enumerate(self.service_ids)
+                if mask >> index & 1
+            ]
+            self._active_by_day[offset] = active
+        return list(active)
+
+    def is_active(self, service_id: str, date: str) -> bool:
+        """Check whether a service runs on a date in 'YYYY-MM-DD' format."""
+        index = self._service_index.get(service_id)
+        if index is None:
+            return False
+        day = datetime.datetime.strptime(date, "%Y-%m-%d").date()
+        offset = self._day_offset(day)
+        if offset is None:
+            return False
+        return bool(self._day_masks[offset] >> index & 1)
+
+
+CalendarRow = tuple[str, list[bool], datetime.date, datetime.date]
+
+
+def _read_calendar(feed_dir: str) -> list[CalendarRow]:
+    """Read the weekly patterns from 'calendar.txt'."""
+    rows: list[CalendarRow] = []
 
     try:
-        with open(
-            os.path.join(feed_dir, "calendar.txt"), "r", encoding="utf-8"
-        ) as calendar_file:
-            lines = calendar_file.readlines()
-            if len(lines) > 1:
-                # First parse the header, get each column's index
-                header = lines[0].strip().split(",")
+        with open_feed_file(feed_dir, "calendar.txt", newline="") as calendar_file:
+            reader = csv.DictReader(calendar_file)
+            header = reader.fieldnames or []
+            required_columns = [
+                "service_id",
+                *WEEKDAY_COLUMNS,
+                "start_date",
+                "end_date",
+            ]
+            missing_columns = [col for col in required_columns if col not in header]
+            if header and missing_columns:
+                logger.error(f"Required columns not found in header: {missing_columns}")
+                return rows
+
+            for line_number, row in enumerate(reader, start=2):
                 try:
-                    service_id_index = header.index("service_id")
-                    monday_index = header.index("monday")
-                    tuesday_index = header.index("tuesday")
-                    wednesday_index = header.index("wednesday")
-                    thursday_index = header.index("thursday")
-                    friday_index = header.index("friday")
-                    saturday_index = header.index("saturday")
-                    sunday_index = header.index("sunday")
-                    start_date_index = header.index("start_date")
-                    end_date_index = header.index("end_date")
-                except ValueError as e:
-                    logger.error(f"Required column not found in header: {e}")
-                    return active_services
-                # Now read the rest of the file, find all services where the day of the week matches
-                weekday_columns = {
-                    0: monday_index,
-                    1: tuesday_index,
-                    2: wednesday_index,
-                    3: thursday_index,
-                    4: friday_index,
-                    5: saturday_index,
-                    6: sunday_index,
-                }
-
-                for idx, line in enumerate(lines[1:], 1):
-                    parts = line.strip().split(",")
-                    if len(parts) < len(header):
-                        logger.warning(
-                            f"Skipping malformed line in calendar.txt line {idx + 1}: {line.strip()}"
+                    rows.append(
+                        (
+                            row["service_id"],
+                            [row[column] == "1" for column in WEEKDAY_COLUMNS],
+                            _parse_gtfs_date(row["start_date"]),
+                            _parse_gtfs_date(row["end_date"]),
                         )
-                        continue
-
-                    service_id = parts[service_id_index]
-                    day_value = parts[weekday_columns[weekday]]
-                    start_date = parts[start_date_index]
-                    end_date = parts[end_date_index]
-
-                    # Check if day of week is active AND date is within the service range
-                    if day_value == "1" and start_date <= search_date <= end_date:
-                        active_services.append(service_id)
+                    )
+                except (TypeError, ValueError):
+                    logger.warning(
+                        f"Skipping malformed line in calendar.txt line {line_number}: "
+                        f"{row}"
+                    )
     except FileNotFoundError:
         logger.warning("calendar.txt file not found.")
 
+    return rows
+
+
+def _read_calendar_dates(feed_dir: str) -> list[tuple[str, datetime.date, str]]:
+    """Read the exceptions from 'calendar_dates.txt', in file order."""
+    rows: list[tuple[str, datetime.date, str]] = []
+
     try:
-        with open(
-            os.path.join(feed_dir, "calendar_dates.txt"), "r", encoding="utf-8"
+        with open_feed_file(
+            feed_dir, "calendar_dates.txt", newline=""
         ) as calendar_dates_file:
-            lines = calendar_dates_file.readlines()
-            if len(lines) <= 1:
-                logger.warning(
-                    "calendar_dates.txt file is empty or has only header line, not processing."
-                )
-                return active_services
-
-            header = lines[0].strip().split(",")
-            try:
-                service_id_index = header.index("service_id")
-                date_index = header.index("date")
-                exception_type_index = header.index("exception_type")
-            except ValueError as e:
-                logger.error(f"Required column not found in header: {e}")
-                return active_services
-
-            # Now read the rest of the file, find all services where 'date' matches the search_date
-            # Start from 1 to skip header
-            for idx, line in enumerate(lines[1:], 1):
-                parts = line.strip().split(",")
-                if len(parts) < len(header):
+            reader = csv.DictReader(calendar_dates_file)
+            header = reader.fieldnames or []
+            required_columns = ["service_id", "date", "exception_type"]
+            missing_columns = [col for col in required_columns if col not in header]
+            if header and missing_columns:
+                logger.error(f"Required columns not found in header: {missing_columns}")
+                return rows
+
+            for line_number, row in enumerate(reader, start=2):
+                try:
+                    rows.append(
+                        (
+                            row["service_id"],
+                            _parse_gtfs_date(row["date"]),
+                            row["exception_type"],
+                        )
+                    )
+                except (TypeError, ValueError):
                     logger.warning(
-                        f"Skipping malformed line in calendar_dates.txt line {idx + 1}: {line.strip()}"
+                        "Skipping malformed line in calendar_dates.txt line "
+                        f"{line_number}: {row}"
                     )
-                    continue
-
-                service_id = parts[service_id_index]
-                date_value = parts[date_index]
-                exception_type = parts[exception_type_index]
-
-                if date_value == search_date and exception_type == "1":
-                    active_services.append(service_id)
 
-                if date_value == search_date and exception_type == "2":
-                    if service_id in active_services:
-                        active_services.remove(service_id)
+            if not rows:
+                logger.warning(
+                    "calendar_dates.txt file is empty or has only header line, not "
+                    "processing."
+                )
     except FileNotFoundError:
         logger.warning("calendar_dates.txt file not found.")
 
-    return active_services
+    return rows
+
+
+def build_service_calendar(feed_dir: str) -> ServiceCalendar:
+    """
+    Build the service calendar for a feed, applying calendar_dates.txt exceptions
+    on top of the weekly patterns of calendar.txt.
+    """
+    calendar = ServiceCalendar()
+    calendar_rows = _read_calendar(feed_dir)
+    exception_rows = _read_calendar_dates(feed_dir)
+
+    bounds: list[datetime.date] = []
+    for _, _, start_date, end_date in calendar_rows:
+        bounds.append(start_date)
+        bounds.append(end_date)
+    if calendar_rows:
+        calendar.calendar_start = min(row[2] for row in calendar_rows)
+        calendar.calendar_end = max(row[3] for row in calendar_rows)
+    bounds.extend(row[1] for row in exception_rows)
+
+    if not bounds:
+        return calendar
+
+    start_date = min(bounds)
+    day_count = (max(bounds) - start_date).days + 1
+    calendar.start_date = start_date
+    day_masks = [0] * day_count
+
+    for service_id, weekdays, service_start, service_end in calendar_rows:
+        bit = 1 << calendar._get_service_index(service_id)
+        first = (service_start - start_date).days
+        last = (service_end - start_date).days
+        for offset in range(first, last + 1):
+            if weekdays[(start_date.weekday() + offset) % 7]:
+                day_masks[offset] |= bit
+
+    for service_id, date, exception_type in exception_rows:
+        bit = 1 << calendar._get_service_index(service_id)
+        offset = (date - start_date).days
+        if exception_type == "1":
+            day_masks[offset] |= bit
+            calendar.added_dates.add(date)
+        elif exception_type == "2":
+            day_masks[offset] &= ~bit
+
+    calendar._day_masks = day_masks
+    return calendar
+
+
+SERVICE_CALENDARS: FeedCache[ServiceCalendar] = FeedCache("service_calendars")
+
+
+def get_service_calendar(feed_dir: str) -> ServiceCalendar:
+    """Get the service calendar for a feed, building it on first use."""
+    calendar = SERVICE_CALENDARS.get(feed_dir)
+    if calendar is None:
+        calendar = build_service_calendar(feed_dir)
+        SERVICE_CALENDARS[feed_dir] = calendar
+        logger.debug(
+            f"Built service calendar for {len(calendar.service_ids)} services in "
+            f"{feed_dir}"
+        )
+    return calendar
+
+
+def get_active_services(feed_dir: str, date: str) -> list[str]:
+    """
+    Get active services for a given date based on the 'calendar.txt' and
+    'calendar_dates.txt' files.
+
+    Args:
+        date (str): Date in 'YYYY-MM-DD' format.
+
+    Returns:
+        list[str]: List of active service IDs for the given date.
+
+    Raises:
+        ValueError: If the date format is incorrect.
+    """
+    return get_service_calendar(feed_dir).get_active_services(date)
@@ -0,0 +1,352 @@
+"""
+Projection of the stops of each trip onto the shape it follows.
+
+The position of a stop along a shape is computed once per feed and stop
+pattern, so that it can fill the shape_dist_traveled values the feed leaves
+empty and be written to a per-shape index for the backend.
+"""
+
+import math
+import os
+from array import array
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from src.cache import FeedCache
+from src.logger import get_logger
+from src.proto.stop_schedule_pb2 import ShapeStopIndex
+from src.report_writer import OutputManifest, write_output_file
+from src.shapes import get_shapes
+from src.stop_times import get_full_stop_times
+from src.stops import get_all_stops, get_all_stops_by_code
+from src.trips import get_all_trips
+
+logger = get_logger("shape_index")
+
+
+# (segment index, distance in metres along the shape) of a stop
+StopProjection = Tuple[int, float]
+
+STOP_PROJECTIONS: FeedCache[Optional[List[StopProjection]]] = FeedCache(
+    "stop_projections"
+)
+
+# Side in metres of the grid cells the segments of a shape are bucketed in, and
+# distance to the stop within which the passes of a shape are candidates
+SEGMENT_GRID_SIZE = 100.0
+# Passes of the shape considered for each stop, the closest first
+MAX_CANDIDATES = 8
+# Cost in metres of every metre a stop would go back along the shape
+BACKTRACK_PENALTY = 10.0
+
+
+def _build_segment_grid(
+    xs: Sequence[float], ys: Sequence[float]
+) -> Dict[Tuple[int, int], List[int]]:
+    """
+    Bucket the segments of a shape into square cells of SEGMENT_GRID_SIZE, by
+    the cells of points sampled along each segment at most a cell apart.
+    """
+    grid: Dict[Tuple[int, int], List[int]] = {}
+    for segment in range(len(xs) - 1):
+        x0, y0 = xs[segment], ys[segment]
+        dx, dy = xs[segment + 1] - x0, ys[segment + 1] - y0
+        steps = max(1, math.ceil(math.hypot(dx, dy) / SEGMENT_GRID_SIZE))
+        cells = {
+            (
+                math.floor((x0 + dx * step / steps) / SEGMENT_GRID_SIZE),
+                math.floor((y0 + dy * step / steps) / SEGMENT_GRID_SIZE),
+            )
+            for step in range(steps + 1)
+        }
+        for cell in cells:
+            grid.setdefault(cell, []).append(segment)
+    return grid
+
+
+def project_stops_on_shape(
+    xs: Sequence[float],
+    ys: Sequence[float],
+    stop_points: Sequence[Optional[Tuple[float, float]]],
+) -> List[StopProjection]:
+    """
+    Project the stops of a trip, in order, onto the shape it follows.
+
+    The candidates of each stop are the closest segment of every pass of the
+    shape within SEGMENT_GRID_SIZE of it, found through a grid of the segments,
+    or the closest segment of the whole shape when there is none. The candidate
+    of each stop is then chosen for the stops to be as close to the shape as
+    possible while going forward along it, with every metre a stop would go
+    back costing BACKTRACK_PENALTY metres, so that shapes that loop or go
+    through the same street twice keep the stops in order.
+
+    Args:
+        xs: EPSG:25829 X coordinates of the shape points
+        ys: EPSG:25829 Y coordinates of the shape points
+        stop_points: EPSG:25829 (x, y) of each stop, None for stops without a
+            location, which are placed at the previous stop
+
+    Returns:
+        (segment index, distance along the shape) of each stop. The distances
+        never decrease: a stop that would go back along the shape is placed at
+        the previous stop, segment included.
+    """
+    segment_count = len(xs) - 1
+    if segment_count < 1:
+        return [(0, 0.0) for _ in stop_points]
+
+    # Segment vectors, squared lengths and distance along the shape to the
+    # start of each segment
+    segment_dx = array("d", [xs[i + 1] - xs[i] for i in range(segment_count)])
+    segment_dy = array("d", [ys[i + 1] - ys[i] for i in range(segment_count)])
+    squared_lengths = array(
+        "d", [dx * dx + dy * dy for dx, dy in zip(segment_dx, segment_dy)]
+    )
+    segment_starts = array("d", [0.0])
+    for squared_length in squared_lengths:
+        segment_starts.append(segment_starts[-1] + math.sqrt(squared_length))
+    grid = _build_segment_grid(xs, ys)
+
+    def project(segment: int, stop_x: float, stop_y: float) -> Tuple[float, float]:
+        """Distance from the stop to a segment and along the shape to it."""
+        px = stop_x - xs[segment]
+        py = stop_y - ys[segment]
+        dx = segment_dx[segment]
+        dy = segment_dy[segment]
+        squared_length = squared_lengths[segment]
+        t = (px * dx + py * dy) / squared_length if squared_length else 0.0
+        if t < 0.0:
+            t = 0.0
+        elif t > 1.0:
+            t = 1.0
+        along = segment_starts[segment] + t * math.sqrt(squared_length)
+        return math.hypot(px - t * dx, py - t * dy), along
+
+    def find_candidates(stop_x: float, stop_y: float) -> List[Tuple[int, float, float]]:
+        """(segment, distance to the stop, distance along the shape) candidates."""
+        cell_x = math.floor(stop_x / SEGMENT_GRID_SIZE)
+        cell_y = math.floor(stop_y / SEGMENT_GRID_SIZE)
+        near_segments = set()
+        # Segments within a cell of the stop have a sampled point at most two
+        # cells away from the cell of the stop
+        for x in range(cell_x - 2, cell_x + 3):
+            for y in range(cell_y - 2, cell_y + 3):
+                near_segments.update(grid.get((x, y), ()))
+
+        passes: List[Tuple[int, float, float]] = []
+        previous_segment = -2
+        for segment in sorted(near_segments):
+            distance, along = project(segment, stop_x, stop_y)
+            if distance > SEGMENT_GRID_SIZE:
+                continue
+            if segment != previous_segment + 1 or not passes:
+                passes.append((segment, distance, along))
+            elif distance < passes[-1][1]:
+                # Consecutive segments are the same pass of the shape
+                passes[-1] = (segment, distance, along)
+            previous_segment = segment
+
+        if not passes:
+            closest = min(
+                range(segment_count), key=lambda i: project(i, stop_x, stop_y)[0]
+            )
+            return [(closest, *project(closest, stop_x, stop_y))]
+        passes.sort(key=lambda candidate: candidate[1])
+        return passes[:MAX_CANDIDATES]
+
+    # Cheapest placement of the located stops: the cost of each candidate of a
+    # stop and the candidate of the previous stop it comes after
+    located = [i for i, point in enumerate(stop_points) if point is not None]
+    stop_candidates: List[List[Tuple[int, float, float]]] = []
+    previous_choices: List[List[int]] = []
+    costs: List[float] = []
+    for i in located:
+        candidates = find_candidates(*stop_points[i])
+        previous_candidates = stop_candidates[-1] if stop_candidates else []
+        candidate_costs: List[float] = []
+        choices: List[int] = []
+        for _, distance, along in candidates:
+            best_cost = 0.0
+            best_choice = -1
+            for choice, (_, _, previous_along) in enumerate(previous_candidates):
+                cost = costs[choice] + BACKTRACK_PENALTY * max(
+                    0.0, previous_along - along
+                )
+                if best_choice < 0 or cost < best_cost:
+                    best_cost = cost
+                    best_choice = choice
+            candidate_costs.append(best_cost + distance)
+            choices.append(best_choice)
+        stop_candidates.append(candidates)
+        previous_choices.append(choices)
+        costs = candidate_costs
+
+    chosen: Dict[int, Tuple[int, float]] = {}
+    if located:
+        choice = min(range(len(costs)), key=costs.__getitem__)
+        for position in range(len(located) - 1, -1, -1):
+            segment, _, along = stop_candidates[position][choice]
+            chosen[located[position]] = (segment, along)
+            choice = previous_choices[position][choice]
+
+    projections: List[StopProjection] = []
+    previous_segment = 0
+    previous_distance = 0.0
+    for i in range(len(stop_points)):
+        if i in chosen:
+            segment, along = chosen[i]
+            # A stop placed behind the previous one stays at its position, so
+            # that the segment and the distance keep matching
+            if along >= previous_distance:
+                previous_segment = segment
+                previous_distance = along
+        projections.append((previous_segment, previous_distance))
+
+    return projections
+
+
+def fill_shape_distances(
+    distances: Sequence[Optional[float]], projections: Sequence[StopProjection]
+) -> List[float]:
+    """
+    Fill the empty shape_dist_traveled values of a trip from the projection of
+    its stops onto the shape.
+
+    When the trip has no distances at all, the projected distances in metres are
+    used. Otherwise, the empty values are interpolated between the known values
+    around them in proportion to the projected distances, so that they stay in
+    the units of the feed and never go past the next known value.
+
+    Args:
+        distances: shape_dist_traveled of each stop of the trip, None if empty
+        projections: projection of each stop of the trip onto the shape
+
+    Returns:
+        The distance of each stop of the trip.
+    """
+    known = [i for i, distance in enumerate(distances) if distance is not None]
+    if not known:
+        return [distance for _, distance in projections]
+
+    filled: List[float] = []
+    next_known = 0
+    for i, distance in enumerate(distances):
+        if distance is not None:
+            filled.append(distance)
+            if next_known < len(known) and known[next_known] == i:
+                next_known += 1
+            continue
+
+        if next_known == 0:
+            filled.append(distances[known[0]])
+            continue
+        if next_known == len(known):
+            filled.append(distances[known[-1]])
+            continue
+
+        start, end = known[next_known - 1], known[next_known]
+        start_distance, end_distance = distances[start], distances[end]
+        span = projections[end][1] - projections[start][1]
+        if span > 0:
+            ratio = (projections[i][1] - projections[start][1]) / span
+        else:
+            ratio = (i - start) / (end - start)
+        filled.append(start_distance + ratio * (end_distance - start_distance))
+
+    return filled
+
+
+def get_stop_projections(
+    feed_dir: str, shape_id: str, stop_ids: tuple[str, ...]
+) -> Optional[List[StopProjection]]:
+    """
+    Get the projection onto a shape of a sequence of stops, computed once per
+    feed, shape and stop sequence.
+
+    Returns:
+        (segment index, distance along the shape) of each stop, or None if the
+        shape is not in the feed.
+    """
+    key = (feed_dir, shape_id, stop_ids)
+    if key in STOP_PROJECTIONS:
+        return STOP_PROJECTIONS[key]
+
+    shape = get_shapes(feed_dir).get(shape_id)
+    projections = None
+    if shape is not None:
+        # Makes sure the EPSG:25829 coordinates of the stops are computed
+        get_all_stops_by_code(feed_dir)
+        stops = get_all_stops(feed_dir)
+        stop_points: List[Optional[Tuple[float, float]]] = []
+        for stop_id in stop_ids:
+            stop = stops.get(stop_id)
+            if stop is None or stop.stop_25829_x is None or stop.stop_25829_y is None:
+                stop_points.append(None)
+            else:
+                stop_points.append((stop.stop_25829_x, stop.stop_25829_y))
+        projections = project_stops_on_shape(shape[0], shape[1], stop_points)
+
+    STOP_PROJECTIONS[key] = projections
+    return projections
+
+
+def write_shape_stop_indexes(
+    feed_dir: str, out_dir: str, manifest: Optional[OutputManifest] = None
+) -> None:
+    """
+    Write the position of the stops along every shape to
+    'shapes/<shape_id>.stops.pb', as a ShapeStopIndex.
+
+    A stop served more than once by the trips of a shape, such as the first
+    and last stop of a circular route, is indexed at its first position along
+    the shape.
+
+    Every trip of the feed is indexed, as every shape is written, even when the
+    run only loaded the stop times of the trips of its dates.
+    """
+    stop_times = get_full_stop_times(feed_dir)
+
+    # Distinct stop patterns of the trips of every shape, in feed order
+    patterns_by_shape: Dict[str, Dict[tuple[str, ...], None]] = {}
+    for trip in get_all_trips(feed_dir):
+        if not trip.shape_id:
+            continue
+        trip_stops = stop_times.get_trip(trip.trip_id)
+        if not trip_stops:
+            continue
+        stop_ids = tuple(stop_time.stop_id for stop_time in trip_stops)
+        patterns_by_shape.setdefault(trip.shape_id, {})[stop_ids] = None
+
+    for shape_id, patterns in patterns_by_shape.items():
+        positions: Dict[str, StopProjection] = {}
+        for stop_ids in patterns:
+            projections = get_stop_projections(feed_dir, shape_id, stop_ids)
+            if projections is None:
+                break
+            for stop_id, projection in zip(stop_ids, projections):
+                if stop_id not in positions or projection[1] < positions[stop_id][1]:
+                    positions[stop_id] = projection
+
+        if not positions:
+            continue
+
+        index = ShapeStopIndex(
+            shape_id=shape_id,
+            stops=[
+                ShapeStopIndex.StopPosition(
+                    stop_id=stop_id, segment_index=segment, distance=distance
+                )
+                for stop_id, (segment, distance) in sorted(
+                    positions.items(), key=lambda item: item[1][1]
+                )
+            ],
+        )
+
+        file_path = os.path.join(out_dir, "shapes", f"{shape_id}.stops.pb")
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        try:
+            write_output_file(file_path, index.SerializeToString(), manifest)
+            logger.debug(f"Shape stop index written to: {file_path}")
+        except Exception as e:
+            logger.error(f"Error writing shape stop index to {file_path}: {e}")
+
+    logger.info(f"Wrote stop indexes for {len(patterns_by_shape)} shapes")
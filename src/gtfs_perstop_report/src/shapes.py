@@ -1,103 +1,291 @@
 import csv
-from dataclasses import dataclass
 import os
-from typing import Dict, Optional
+from array import array
+from typing import Dict, Optional, Sequence, Tuple
 
 from pyproj import Transformer
 
+from src.cache import FeedCache
+from src.feed import open_feed_file
 from src.logger import get_logger
-
+from src.proto.stop_schedule_pb2 import CompactShape
+from src.report_writer import OutputManifest, write_output_file
 
 logger = get_logger("shapes")
 
 
-@dataclass
-class Shape:
-    shape_id: str
-    shape_pt_lat: Optional[float]
-    shape_pt_lon: Optional[float]
-    shape_pt_position: Optional[int]
-    shape_dist_traveled: Optional[float]
+# EPSG:25829 X and Y coordinates of the points of a shape, in order
+ShapePoints = Tuple[array, array]
 
-    shape_pt_25829_x: Optional[float] = None
-    shape_pt_25829_y: Optional[float] = None
 
+def load_shapes(feed_dir: str) -> Dict[str, ShapePoints]:
+    """
+    Load the points of every shape in 'shapes.txt', in EPSG:25829.
 
-def process_shapes(feed_dir: str, out_dir: str) -> None:
-    file_path = os.path.join(feed_dir, "shapes.txt")
-    shapes: Dict[str, list[Shape]] = {}
+    The coordinates of all the points are collected into contiguous arrays and
+    transformed in a single call. Points without coordinates are skipped, and the
+    points of each shape are sorted by shape_pt_position.
 
-    transformer = Transformer.from_crs(4326, 25829, always_xy=True)
+    Returns:
+        Dictionary of shape_id -> (X array, Y array).
+    """
+    file_path = os.path.join(feed_dir, "shapes.txt")
+    # shape_id -> (shape_pt_position, index into the coordinate arrays)
+    shape_rows: Dict[str, list[Tuple[int, int]]] = {}
+    lons = array("d")
+    lats = array("d")
 
     try:
-        with open(file_path, "r", encoding="utf-8", newline="") as f:
-            reader = csv.DictReader(f, quotechar='"', delimiter=",")
+        with open_feed_file(feed_dir, "shapes.txt", newline="") as f:
+            reader = csv.reader(f, quotechar='"', delimiter=",")
+            header = next(reader, [])
+            shape_id_index = header.index("shape_id") if "shape_id" in header else -1
+            lat_index = header.index("shape_pt_lat") if "shape_pt_lat" in header else -1
+            lon_index = header.index("shape_pt_lon") if "shape_pt_lon" in header else -1
+            position_index = (
+                header.index("shape_pt_position")
+                if "shape_pt_position" in header
+                else -1
+            )
+            if shape_id_index < 0 or lat_index < 0 or lon_index < 0:
+                logger.error(
+                    "Required columns (shape_id, shape_pt_lat, shape_pt_lon) not "
+                    "found in shapes.txt"
+                )
+                return {}
+
             for row_num, row in enumerate(reader, start=2):
                 try:
-                    shape = Shape(
-                        shape_id=row["shape_id"],
-                        shape_pt_lat=float(row["shape_pt_lat"])
-                        if row.get("shape_pt_lat")
-                        else None,
-                        shape_pt_lon=float(row["shape_pt_lon"])
-                        if row.get("shape_pt_lon")
-                        else None,
-                        shape_pt_position=int(row["shape_pt_position"])
-                        if row.get("shape_pt_position")
-                        else None,
-                        shape_dist_traveled=float(row["shape_dist_traveled"])
-                        if row.get("shape_dist_traveled")
-                        else None,
+                    shape_id = row[shape_id_index]
+                    lat = row[lat_index]
+                    lon = row[lon_index]
+                    if not lat or not lon:
+                        continue
+                    position = (
+                        row[position_index] if 0 <= position_index < len(row) else ""
                     )
-
-                    if (
-                        shape.shape_pt_lat is not None
-                        and shape.shape_pt_lon is not None
-                    ):
-                        shape_pt_25829_x, shape_pt_25829_y = transformer.transform(
-                            shape.shape_pt_lon, shape.shape_pt_lat
-                        )
-                        shape.shape_pt_25829_x = shape_pt_25829_x
-                        shape.shape_pt_25829_y = shape_pt_25829_y
-
-                    if shape.shape_id not in shapes:
-                        shapes[shape.shape_id] = []
-                    shapes[shape.shape_id].append(shape)
-                except Exception as e:
+                    position = int(position) if position else 0
+                    lat = float(lat)
+                    lon = float(lon)
+                except (IndexError, ValueError) as e:
                     logger.warning(
-                        f"Error parsing stops.txt line {row_num}: {e} - line data: {row}"
+                        f"Error parsing shapes.txt line {row_num}: {e} - line data: "
+                        f"{row}"
                     )
+                    continue
+
+                shape_rows.setdefault(shape_id, []).append((position, len(lons)))
+                lons.append(lon)
+                lats.append(lat)
     except FileNotFoundError:
         logger.error(f"File not found: {file_path}")
     except Exception as e:
-        logger.error(f"Error reading stops.txt: {e}")
+        logger.error(f"Error reading shapes.txt: {e}")
 
-    # Write shapes to Protobuf files
-    from src.proto.stop_schedule_pb2 import Epsg25829, Shape as PbShape
-
-    for shape_id, shape_points in shapes.items():
-        points = sorted(
-            shape_points,
-            key=lambda sp: sp.shape_pt_position
-            if sp.shape_pt_position is not None
-            else 0,
+    transformer = Transformer.from_crs(4326, 25829, always_xy=True)
+    xs, ys = transformer.transform(lons, lats)
+
+    shapes: Dict[str, ShapePoints] = {}
+    for shape_id, rows in shape_rows.items():
+        rows.sort(key=lambda row: row[0])
+        shapes[shape_id] = (
+            array("d", [xs[index] for _, index in rows]),
+            array("d", [ys[index] for _, index in rows]),
+        )
+    return shapes
+
+
+SHAPES_BY_FEED: FeedCache[Dict[str, ShapePoints]] = FeedCache("shapes")
+
+
+def get_shapes(feed_dir: str) -> Dict[str, ShapePoints]:
+    """Get the points of every shape of a feed, loading them on first use."""
+    shapes = SHAPES_BY_FEED.get(feed_dir)
+    if shapes is None:
+        shapes = load_shapes(feed_dir)
+        SHAPES_BY_FEED[feed_dir] = shapes
+    return shapes
+
+
+def simplify_shape(xs: array, ys: array, tolerance: float) -> list[int]:
+    """
+    Simplify a shape with the Douglas-Peucker algorithm.
+
+    Args:
+        xs: X coordinates of the points, in metres
+        ys: Y coordinates of the points, in metres
+        tolerance: Maximum distance in metres from a removed point to the
+            simplified line
+
+    Returns:
+        Sorted indexes of the points kept, always including the first and last.
+    """
+    point_count = len(xs)
+    if point_count <= 2:
+        return list(range(point_count))
+
+    keep = bytearray(point_count)
+    keep[0] = keep[-1] = 1
+    squared_tolerance = tolerance * tolerance
+    stack = [(0, point_count - 1)]
+    while stack:
+        first, last = stack.pop()
+        ax, ay = xs[first], ys[first]
+        dx, dy = xs[last] - ax, ys[last] - ay
+        squared_length = dx * dx + dy * dy
+
+        farthest = -1
+        farthest_distance = squared_tolerance
+        for index in range(first + 1, last):
+            px = xs[index] - ax
+            py = ys[index] - ay
+            # Squared distance to the closest point of the segment
+            dot = px * dx + py * dy
+            if dot <= 0:
+                distance = px * px + py * py
+            elif dot >= squared_length:
+                px -= dx
+                py -= dy
+                distance = px * px + py * py
+            else:
+                cross = px * dy - py * dx
+                distance = cross * cross / squared_length
+            if distance > farthest_distance:
+                farthest = index
+                farthest_distance = distance
+
+        if farthest >= 0:
+            keep[farthest] = 1
+            stack.append((first, farthest))
+            stack.append((farthest, last))
+
+    return [index for index in range(point_count) if keep[index]]
+
+
+def _delta_encode(values: list[int]) -> list[int]:
+    """Replace each value by its difference from the previous one."""
+    previous = 0
+    deltas = []
+    for value in values:
+        deltas.append(value - previous)
+        previous = value
+    return deltas
+
+
+def encode_compact_shape(
+    shape_id: str, xs: array, ys: array, tolerances: Sequence[float] = ()
+) -> CompactShape:
+    """
+    Encode a shape as a CompactShape, with the full resolution shape followed by
+    a Douglas-Peucker simplified level for each tolerance.
+
+    Args:
+        shape_id: Shape identifier
+        xs: EPSG:25829 X coordinates of the points
+        ys: EPSG:25829 Y coordinates of the points
+        tolerances: Tolerances in metres of the simplified levels
+    """
+    xs_cm = [round(x * 100) for x in xs]
+    ys_cm = [round(y * 100) for y in ys]
+
+    levels = [CompactShape.Level(dx=_delta_encode(xs_cm), dy=_delta_encode(ys_cm))]
+    for tolerance in sorted(tolerances):
+        kept = simplify_shape(xs, ys, tolerance)
+        levels.append(
+            CompactShape.Level(
+                tolerance=tolerance,
+                dx=_delta_encode([xs_cm[index] for index in kept]),
+                dy=_delta_encode([ys_cm[index] for index in kept]),
+            )
         )
 
+    return CompactShape(shape_id=shape_id, levels=levels)
+
+
+def decode_compact_shape(
+    compact_shape: CompactShape, level: int = 0
+) -> Tuple[list[float], list[float]]:
+    """
+    Decode a level of a CompactShape back into EPSG:25829 coordinates in metres.
+
+    Returns:
+        Tuple of (X coordinates, Y coordinates).
+    """
+    shape_level = compact_shape.levels[level]
+    xs: list[float] = []
+    ys: list[float] = []
+    x = y = 0
+    for dx, dy in zip(shape_level.dx, shape_level.dy):
+        x += dx
+        y += dy
+        xs.append(x / 100)
+        ys.append(y / 100)
+    return xs, ys
+
+
+def process_shapes(
+    feed_dir: str,
+    out_dir: str,
+    manifest: Optional[OutputManifest] = None,
+    compact: bool = False,
+    tolerances: Sequence[float] = (),
+) -> None:
+    """
+    Write every shape of the feed to 'shapes/<shape_id>.pb'.
+
+    Args:
+        feed_dir: GTFS feed directory
+        out_dir: Base output directory
+        manifest: Optional manifest used to skip unchanged files
+        compact: Also write each shape as a CompactShape to
+            'shapes/<shape_id>.compact.pb'
+        tolerances: Tolerances in metres of the simplified levels of the
+            compact shapes
+    """
+    shapes = get_shapes(feed_dir)
+
+    # Write shapes to Protobuf files
+    from src.proto.stop_schedule_pb2 import Epsg25829
+    from src.proto.stop_schedule_pb2 import Shape as PbShape
+
+    full_size = 0
+    compact_size = 0
+    for shape_id, (xs, ys) in shapes.items():
         pb_shape = PbShape(
             shape_id=shape_id,
-            points=[
-                Epsg25829(x=pt.shape_pt_25829_x, y=pt.shape_pt_25829_y)
-                for pt in points
-                if pt.shape_pt_25829_x is not None and pt.shape_pt_25829_y is not None
-            ],
+            points=[Epsg25829(x=x, y=y) for x, y in zip(xs, ys)],
         )
 
         shape_file_path = os.path.join(out_dir, "shapes", f"{shape_id}.pb")
         os.makedirs(os.path.dirname(shape_file_path), exist_ok=True)
 
+        shape_data = pb_shape.SerializeToString()
         try:
-            with open(shape_file_path, "wb") as f:
-                f.write(pb_shape.SerializeToString())
+            write_output_file(shape_file_path, shape_data, manifest)
             logger.debug(f"Shape Protobuf written to: {shape_file_path}")
         except Exception as e:
             logger.error(f"Error writing shape Protobuf to {shape_file_path}: {e}")
+
+        if not compact:
+            continue
+
+        compact_data = encode_compact_shape(
+            shape_id, xs, ys, tolerances
+        ).SerializeToString()
+        compact_file_path = os.path.join(out_dir, "shapes", f"{shape_id}.compact.pb")
+        try:
+            write_output_file(compact_file_path, compact_data, manifest)
+            logger.debug(f"Compact shape Protobuf written to: {compact_file_path}")
+        except Exception as e:
+            logger.error(
+                f"Error writing compact shape Protobuf to {compact_file_path}: {e}"
+            )
+        full_size += len(shape_data)
+        compact_size += len(compact_data)
+
+    if compact and full_size:
+        logger.info(
+            f"Compact shapes take {compact_size / 1024:.1f} KiB against "
+            f"{full_size / 1024:.1f} KiB "
+            f"({(1 - compact_size / full_size) * 100:.1f}% smaller)"
+        )
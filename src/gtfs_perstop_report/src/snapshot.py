@@ -0,0 +1,321 @@
+"""
+Binary snapshot of a parsed feed, to skip parsing its CSV files on later runs.
+
+A snapshot holds the stops, routes, trips and service calendar of a feed, along
+with its columnar stop times and transformed shapes. It is stored under the
+content hash of the feed, so a feed that changed never reads a stale snapshot.
+
+The columns are written as native arrays aligned to 8 bytes, and read back as
+memoryviews over a read-only mmap of the file, which the forked workers share
+without copying. The smaller tables are stored as JSON in the header:
+
+    magic | version, header length (uint32) | header | padding | arrays
+"""
+
+import datetime
+import json
+import mmap
+import os
+import struct
+import sys
+import time
+from typing import Dict, List, Tuple
+
+from src.cache import invalidate_feed
+from src.feed import get_feed_hash
+from src.logger import get_logger
+from src.routes import ROUTES_BY_FEED, load_routes
+from src.services import SERVICE_CALENDARS, ServiceCalendar, get_service_calendar
+from src.shapes import SHAPES_BY_FEED, get_shapes
+from src.stop_times import (
+    FULL_STOP_TIMES_BY_FEED,
+    StopTimesStore,
+    get_full_stop_times,
+)
+from src.stops import CACHED_STOPS, Stop, get_all_stops
+from src.trips import TRIPS_BY_SERVICE_ID, TripLine, get_trips_for_services
+
+logger = get_logger("snapshot")
+
+SNAPSHOT_MAGIC = b"GTFSSNAP"
+# Bumped whenever the layout of the file or the parsed structures change
+SNAPSHOT_VERSION = 1
+SNAPSHOT_ALIGNMENT = 8
+_PREFIX = struct.Struct("<II")
+
+STOP_TIMES_COLUMNS = (
+    "trip_offsets",
+    "stop",
+    "arrival",
+    "departure",
+    "sequence",
+    "distance",
+)
+
+
+def _align(offset: int) -> int:
+    return -(-offset // SNAPSHOT_ALIGNMENT) * SNAPSHOT_ALIGNMENT
+
+
+def get_snapshot_path(snapshot_dir: str, feed_hash: str) -> str:
+    """Get the path of the snapshot of a feed with the given content hash."""
+    return os.path.join(snapshot_dir, f"{feed_hash}.v{SNAPSHOT_VERSION}.snapshot")
+
+
+def _encode_calendar(calendar: ServiceCalendar) -> dict:
+    def encode_date(date):
+        return date.isoformat() if date is not None else None
+
+    return {
+        "service_ids": calendar.service_ids,
+        "start_date": encode_date(calendar.start_date),
+        "calendar_start": encode_date(calendar.calendar_start),
+        "calendar_end": encode_date(calendar.calendar_end),
+        "added_dates": sorted(date.isoformat() for date in calendar.added_dates),
+        # Hexadecimal, as the masks of feeds with many services go past the
+        # digit limit of decimal integers
+        "day_masks": [format(mask, "x") for mask in calendar._day_masks],
+    }
+
+
+def _decode_calendar(data: dict) -> ServiceCalendar:
+    def decode_date(value):
+        return datetime.date.fromisoformat(value) if value is not None else None
+
+    calendar = ServiceCalendar()
+    for service_id in data["service_ids"]:
+        calendar._get_service_index(service_id)
+    calendar.start_date = decode_date(data["start_date"])
+    calendar.calendar_start = decode_date(data["calendar_start"])
+    calendar.calendar_end = decode_date(data["calendar_end"])
+    calendar.added_dates = {decode_date(value) for value in data["added_dates"]}
+    calendar._day_masks = [int(mask, 16) for mask in data["day_masks"]]
+    return calendar
+
+
+def write_snapshot(feed_dir: str, path: str) -> int:
+    """
+    Parse a feed and write its snapshot to a file.
+
+    Returns:
+        Size of the snapshot in bytes.
+    """
+    stops = get_all_stops(feed_dir)
+    routes = load_routes(feed_dir)
+    # Loading the trips for any list of services caches the whole trips.txt
+    get_trips_for_services(feed_dir, [])
+    trips_by_service = TRIPS_BY_SERVICE_ID.get(feed_dir, {})
+    calendar = get_service_calendar(feed_dir)
+    stop_times = get_full_stop_times(feed_dir)
+    shapes = get_shapes(feed_dir)
+
+    tables = {
+        "stops": [
+            [stop.stop_id, stop.stop_code, stop.stop_name, stop.stop_lat, stop.stop_lon]
+            for stop in stops.values()
+        ],
+        "routes": routes,
+        "trips": {
+            service_id: [
+                [
+                    trip.route_id,
+                    trip.trip_id,
+                    trip.headsign,
+                    trip.direction_id,
+                    trip.shape_id,
+                    trip.block_id,
+                ]
+                for trip in trips
+            ]
+            for service_id, trips in trips_by_service.items()
+        },
+        "calendar": _encode_calendar(calendar),
+    }
+
+    # Lists of strings are stored joined by NUL characters
+    shape_offsets = [0]
+    for xs, _ in shapes.values():
+        shape_offsets.append(shape_offsets[-1] + len(xs))
+    sections: List[Tuple[str, str, bytes]] = [
+        ("trip_ids", "s", "\0".join(stop_times.trip_ids).encode("utf-8")),
+        ("stop_ids", "s", "\0".join(stop_times.stop_ids).encode("utf-8")),
+        *(
+            (
+                name,
+                getattr(stop_times, name).typecode,
+                getattr(stop_times, name).tobytes(),
+            )
+            for name in STOP_TIMES_COLUMNS
+        ),
+        ("shape_ids", "s", "\0".join(shapes).encode("utf-8")),
+        ("shape_offsets", "I", struct.pack(f"={len(shape_offsets)}I", *shape_offsets)),
+        ("shape_xs", "d", b"".join(bytes(xs) for xs, _ in shapes.values())),
+        ("shape_ys", "d", b"".join(bytes(ys) for _, ys in shapes.values())),
+    ]
+
+    section_index: Dict[str, list] = {}
+    offset = 0
+    for name, typecode, data in sections:
+        section_index[name] = [offset, len(data), typecode]
+        offset = _align(offset + len(data))
+    counts = {
+        "trip_ids": len(stop_times.trip_ids),
+        "stop_ids": len(stop_times.stop_ids),
+        "shape_ids": len(shapes),
+    }
+
+    header = json.dumps(
+        {
+            "byteorder": sys.byteorder,
+            "sections": section_index,
+            "counts": counts,
+            "tables": tables,
+        },
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(SNAPSHOT_MAGIC)
+        f.write(_PREFIX.pack(SNAPSHOT_VERSION, len(header)))
+        f.write(header)
+        data_start = _align(f.tell())
+        f.write(bytes(data_start - f.tell()))
+        for name, _, data in sections:
+            f.write(bytes(data_start + section_index[name][0] - f.tell()))
+            f.write(data)
+        size = f.tell()
+    os.replace(temp_path, path)
+    return size
+
+
+def read_snapshot(feed_dir: str, path: str) -> None:
+    """
+    Fill the caches of the feed loaders from a snapshot file.
+
+    Raises:
+        ValueError: If the file is not a snapshot readable by this version.
+    """
+    with open(path, "rb") as f:
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    view = memoryview(data)
+
+    prefix_end = len(SNAPSHOT_MAGIC) + _PREFIX.size
+    if bytes(view[: len(SNAPSHOT_MAGIC)]) != SNAPSHOT_MAGIC:
+        raise ValueError("not a feed snapshot")
+    if len(view) < prefix_end:
+        raise ValueError("truncated snapshot")
+    version, header_length = _PREFIX.unpack_from(data, len(SNAPSHOT_MAGIC))
+    if version != SNAPSHOT_VERSION:
+        raise ValueError(f"snapshot version {version}, expected {SNAPSHOT_VERSION}")
+    if prefix_end + header_length > len(view):
+        raise ValueError("truncated snapshot")
+    header = json.loads(bytes(view[prefix_end : prefix_end + header_length]))
+    if header["byteorder"] != sys.byteorder:
+        raise ValueError(f"snapshot written on a {header['byteorder']}-endian system")
+
+    data_start = _align(prefix_end + header_length)
+    counts = header["counts"]
+
+    def read_section(name: str):
+        offset, size, typecode = header["sections"][name]
+        if data_start + offset + size > len(view):
+            raise ValueError("truncated snapshot")
+        section = view[data_start + offset : data_start + offset + size]
+        if typecode != "s":
+            return section.cast(typecode)
+        if not counts[name]:
+            return []
+        return str(section, "utf-8").split("\0")
+
+    stop_times = StopTimesStore()
+    stop_times.trip_ids = read_section("trip_ids")
+    stop_times.trip_index = {
+        trip_id: trip for trip, trip_id in enumerate(stop_times.trip_ids)
+    }
+    stop_times.stop_ids = read_section("stop_ids")
+    stop_times.stop_index = {
+        stop_id: stop for stop, stop_id in enumerate(stop_times.stop_ids)
+    }
+    for name in STOP_TIMES_COLUMNS:
+        setattr(stop_times, name, read_section(name))
+
+    shape_offsets = read_section("shape_offsets")
+    shape_xs = read_section("shape_xs")
+    shape_ys = read_section("shape_ys")
+    shapes = {
+        shape_id: (
+            shape_xs[shape_offsets[i] : shape_offsets[i + 1]],
+            shape_ys[shape_offsets[i] : shape_offsets[i + 1]],
+        )
+        for i, shape_id in enumerate(read_section("shape_ids"))
+    }
+
+    tables = header["tables"]
+    stops = {row[0]: Stop(*row) for row in tables["stops"]}
+    trips_by_service = {
+        service_id: [
+            TripLine(
+                route_id=route_id,
+                service_id=service_id,
+                trip_id=trip_id,
+                headsign=headsign,
+                direction_id=direction_id,
+                shape_id=shape_id,
+                block_id=block_id,
+            )
+            for route_id, trip_id, headsign, direction_id, shape_id, block_id in trips
+        ]
+        for service_id, trips in tables["trips"].items()
+    }
+    calendar = _decode_calendar(tables["calendar"])
+
+    # Only filled once the whole snapshot has been read, replacing whatever was
+    # cached for the feed
+    invalidate_feed(feed_dir)
+    CACHED_STOPS[feed_dir] = stops
+    ROUTES_BY_FEED[feed_dir] = tables["routes"]
+    TRIPS_BY_SERVICE_ID[feed_dir] = trips_by_service
+    SERVICE_CALENDARS[feed_dir] = calendar
+    FULL_STOP_TIMES_BY_FEED[feed_dir] = stop_times
+    SHAPES_BY_FEED[feed_dir] = shapes
+
+
+def load_feed_snapshot(feed_dir: str, snapshot_dir: str) -> bool:
+    """
+    Fill the caches of the feed loaders from the snapshot of a feed, parsing the
+    feed and writing its snapshot when there is none yet.
+
+    Snapshots of other feeds are kept in the directory, so that alternating
+    between feeds does not invalidate them.
+
+    Args:
+        feed_dir: Path to the feed directory or zip file
+        snapshot_dir: Directory holding the snapshots
+
+    Returns:
+        True if an existing snapshot was loaded.
+    """
+    start_time = time.perf_counter()
+    path = get_snapshot_path(snapshot_dir, get_feed_hash(feed_dir))
+
+    if os.path.exists(path):
+        try:
+            read_snapshot(feed_dir, path)
+            elapsed = time.perf_counter() - start_time
+            logger.info(f"Loaded feed snapshot {path} in {elapsed:.2f}s")
+            return True
+        except (OSError, ValueError, KeyError, TypeError, struct.error) as e:
+            logger.warning(f"Ignoring unreadable feed snapshot {path}: {e}")
+
+    try:
+        os.makedirs(snapshot_dir, exist_ok=True)
+        size = write_snapshot(feed_dir, path)
+        elapsed = time.perf_counter() - start_time
+        logger.info(
+            f"Wrote feed snapshot {path} ({size / (1024 * 1024):.1f} MiB) in "
+            f"{elapsed:.2f}s"
+        )
+    except OSError as e:
+        logger.warning(f"Failed to write feed snapshot {path}: {e}")
+    return False
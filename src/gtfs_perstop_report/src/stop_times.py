@@ -3,60 +3,277 @@ Functions for handling GTFS stop_times data.
 """
 
 import csv
-import os
+import math
+from array import array
+from typing import Callable, Collection
+
+from src.cache import FeedCache
+from src.common import format_gtfs_time, parse_gtfs_time
+from src.feed import open_feed_file
 from src.logger import get_logger
+from src.metrics import count
 
 logger = get_logger("stop_times")
 
 
-STOP_TIMES_BY_FEED: dict[str, dict[str, list["StopTime"]]] = {}
-STOP_TIMES_BY_REQUEST: dict[
-    tuple[str, frozenset[str]], dict[str, list["StopTime"]]
-] = {}
+# The stores of the run, that only hold the trips of the filter given on the
+# first load of the feed, so they are never evicted: loading them again without
+# that filter would change the trips seen by later callers
+STOP_TIMES_BY_FEED: FeedCache["StopTimesStore"] = FeedCache(
+    "stop_times", evictable=False
+)
+# Stores with every trip of a feed, from which filtered loads are served
+# without reading stop_times.txt again
+FULL_STOP_TIMES_BY_FEED: FeedCache["StopTimesStore"] = FeedCache("full_stop_times")
+
+# Either a collection of trip ids or a predicate on the trip id
+TripFilter = Collection[str] | Callable[[str], bool]
+
+
+class StopTimesStore:
+    """
+    Columnar storage for the stop_times of a feed.
+
+    Trip and stop ids are interned to integers, and every column is a typed array.
+    Rows are grouped by trip and sorted by stop_sequence, with trip_offsets
+    holding the first row of each trip (CSR layout), so the rows of trip N are
+    trip_offsets[N]:trip_offsets[N + 1].
+    """
+
+    def __init__(self):
+        self.trip_ids: list[str] = []
+        self.trip_index: dict[str, int] = {}
+        self.stop_ids: list[str] = []
+        self.stop_index: dict[str, int] = {}
+
+        self.trip_offsets = array("I", [0])
+        self.stop = array("i")
+        self.arrival = array("i")
+        self.departure = array("i")
+        self.sequence = array("H")
+        # Kept as doubles, as the distances are written unchanged to the reports
+        self.distance = array("d")
+        # Filter the trips were loaded with, None when loaded without one
+        self.trip_filter: TripFilter | None = None
+
+    def __len__(self) -> int:
+        return len(self.trip_index)
+
+    def __contains__(self, trip_id: str) -> bool:
+        return trip_id in self.trip_index
+
+    def get_trip(self, trip_id: str) -> "TripStopTimes | None":
+        """Get a view over the stop times of a trip, or None if it has none."""
+        trip = self.trip_index.get(trip_id)
+        if trip is None:
+            return None
+        start = self.trip_offsets[trip]
+        end = self.trip_offsets[trip + 1]
+        if start == end:
+            return None
+        return TripStopTimes(self, trip, start, end)
+
+    def restrict(self, trip_matches: Callable[[str], bool]) -> "StopTimesStore":
+        """
+        Get a store that only holds the trips matching a predicate, sharing the
+        columns of this one.
+        """
+        store = StopTimesStore()
+        store.trip_ids = self.trip_ids
+        store.trip_index = {
+            trip_id: trip
+            for trip_id, trip in self.trip_index.items()
+            if trip_matches(trip_id)
+        }
+        store.stop_ids = self.stop_ids
+        store.stop_index = self.stop_index
+        store.trip_offsets = self.trip_offsets
+        store.stop = self.stop
+        store.arrival = self.arrival
+        store.departure = self.departure
+        store.sequence = self.sequence
+        store.distance = self.distance
+        return store
 
 
 class StopTime:
     """
-    Class representing a stop time entry in the GTFS data.
-    """
-
-    def __init__(
-        self,
-        trip_id: str,
-        arrival_time: str,
-        departure_time: str,
-        stop_id: str,
-        stop_sequence: int,
-        shape_dist_traveled: float | None,
-    ):
-        self.trip_id = trip_id
-        self.arrival_time = arrival_time
-        self.departure_time = departure_time
-        self.stop_id = stop_id
-        self.stop_sequence = stop_sequence
-        self.shape_dist_traveled = shape_dist_traveled
-        self.day_change = False  # New attribute to indicate day change
+    Lightweight view of a single stop time entry in a StopTimesStore.
+    """
+
+    __slots__ = ("_store", "_trip", "_row")
+
+    def __init__(self, store: StopTimesStore, trip: int, row: int):
+        self._store = store
+        self._trip = trip
+        self._row = row
+
+    @property
+    def trip_id(self) -> str:
+        return self._store.trip_ids[self._trip]
+
+    @property
+    def stop_id(self) -> str:
+        return self._store.stop_ids[self._store.stop[self._row]]
+
+    @property
+    def arrival_seconds(self) -> int:
+        return self._store.arrival[self._row]
+
+    @property
+    def departure_seconds(self) -> int:
+        return self._store.departure[self._row]
+
+    @property
+    def arrival_time(self) -> str:
+        return format_gtfs_time(self._store.arrival[self._row])
+
+    @property
+    def departure_time(self) -> str:
+        return format_gtfs_time(self._store.departure[self._row])
+
+    @property
+    def stop_sequence(self) -> int:
+        return self._store.sequence[self._row]
+
+    @property
+    def shape_dist_traveled(self) -> float | None:
+        dist = self._store.distance[self._row]
+        return None if math.isnan(dist) else dist
 
     def __str__(self):
-        return f"StopTime({self.trip_id=}, {self.arrival_time=}, {self.departure_time=}, {self.stop_id=}, {self.stop_sequence=})"
+        return (
+            f"StopTime({self.trip_id=}, {self.arrival_time=}, "
+            f"{self.departure_time=}, {self.stop_id=}, {self.stop_sequence=})"
+        )
+
+
+class TripStopTimes:
+    """
+    Read-only sequence of the stop times of one trip, ordered by stop_sequence.
+    """
+
+    __slots__ = ("_store", "_trip", "_start", "_end")
+
+    def __init__(self, store: StopTimesStore, trip: int, start: int, end: int):
+        self._store = store
+        self._trip = trip
+        self._start = start
+        self._end = end
+
+    def __len__(self) -> int:
+        return self._end - self._start
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        length = self._end - self._start
+        if index < 0:
+            index += length
+        if index < 0 or index >= length:
+            raise IndexError("stop time index out of range")
+        return StopTime(self._store, self._trip, self._start + index)
+
+    def __iter__(self):
+        for row in range(self._start, self._end):
+            yield StopTime(self._store, self._trip, row)
+
+
+def _build_store(
+    trip_ids: list[str],
+    trip_index: dict[str, int],
+    stop_ids: list[str],
+    stop_index: dict[str, int],
+    trip_column: array,
+    columns: dict[str, array],
+) -> StopTimesStore:
+    """Group the parsed rows by trip and sort each trip by stop_sequence."""
+    store = StopTimesStore()
+    store.trip_ids = trip_ids
+    store.trip_index = trip_index
+    store.stop_ids = stop_ids
+    store.stop_index = stop_index
+
+    row_count = len(trip_column)
+    counts = array("I", bytes(4 * len(trip_ids)))
+    for trip in trip_column:
+        counts[trip] += 1
+
+    offsets = array("I", [0])
+    for trip_count in counts:
+        offsets.append(offsets[-1] + trip_count)
+    store.trip_offsets = offsets
+
+    # Feeds are usually already grouped by trip, in which case no reordering of
+    # the rows is needed beyond sorting the trips whose sequences are out of order
+    grouped = all(
+        trip_column[row - 1] <= trip_column[row] for row in range(1, row_count)
+    )
+    if grouped:
+        order = None
+    else:
+        positions = array("I", offsets[:-1])
+        order = array("I", bytes(4 * row_count))
+        for row, trip in enumerate(trip_column):
+            order[positions[trip]] = row
+            positions[trip] += 1
+
+    sequence = columns["sequence"]
+    for trip in range(len(trip_ids)):
+        start, end = offsets[trip], offsets[trip + 1]
+        rows = range(start, end) if order is None else order[start:end]
+        if any(sequence[rows[i - 1]] > sequence[rows[i]] for i in range(1, len(rows))):
+            if order is None:
+                order = array("I", range(row_count))
+            order[start:end] = array("I", sorted(rows, key=lambda r: sequence[r]))
+
+    for name, column in columns.items():
+        if order is not None:
+            column = array(column.typecode, (column[row] for row in order))
+        setattr(store, name, column)
+
+    return store
+
+
+def _split_row(line: str) -> list[str]:
+    """Split a CSV line, only going through the csv module for quoted lines."""
+    if '"' in line:
+        return next(csv.reader([line]))
+    return line.rstrip("\r\n").split(",")
+
 
+def _read_stop_times(
+    feed_dir: str, trip_matches: Callable[[str], bool] | None
+) -> StopTimesStore:
+    """
+    Parse 'stop_times.txt' into a StopTimesStore.
 
-def _load_stop_times_for_feed(feed_dir: str) -> dict[str, list[StopTime]]:
-    """Load and cache all stop_times for a feed directory."""
-    if feed_dir in STOP_TIMES_BY_FEED:
-        return STOP_TIMES_BY_FEED[feed_dir]
+    When trip_matches is given, rows of trips not matching it are skipped after
+    reading only their trip_id column, and no record is built for them.
+    """
+    trip_ids: list[str] = []
+    trip_index: dict[str, int] = {}
+    stop_ids: list[str] = []
+    stop_index: dict[str, int] = {}
 
-    stops: dict[str, list[StopTime]] = {}
+    trip_column = array("i")
+    columns = {
+        "stop": array("i"),
+        "arrival": array("i"),
+        "departure": array("i"),
+        "sequence": array("H"),
+        "distance": array("d"),
+    }
+    skipped_rows = 0
+    padded_rows = 0
 
     try:
-        with open(
-            os.path.join(feed_dir, "stop_times.txt"), "r", encoding="utf-8", newline=""
-        ) as stop_times_file:
-            reader = csv.DictReader(stop_times_file)
-            if reader.fieldnames is None:
+        with open_feed_file(feed_dir, "stop_times.txt", newline="") as stop_times_file:
+            header_line = stop_times_file.readline()
+            if not header_line:
                 logger.error("stop_times.txt missing header row.")
-                STOP_TIMES_BY_FEED[feed_dir] = {}
-                return STOP_TIMES_BY_FEED[feed_dir]
+                return StopTimesStore()
+            header = _split_row(header_line.lstrip("\ufeff"))
 
             required_columns = [
                 "trip_id",
@@ -65,87 +282,229 @@ def _load_stop_times_for_feed(feed_dir: str) -> dict[str, list[StopTime]]:
                 "stop_id",
                 "stop_sequence",
             ]
-            missing_columns = [
-                col for col in required_columns if col not in reader.fieldnames
-            ]
+            missing_columns = [col for col in required_columns if col not in header]
             if missing_columns:
                 logger.error(f"Required columns not found in header: {missing_columns}")
-                STOP_TIMES_BY_FEED[feed_dir] = {}
-                return STOP_TIMES_BY_FEED[feed_dir]
+                return StopTimesStore()
 
-            has_shape_dist = "shape_dist_traveled" in reader.fieldnames
+            trip_id_index = header.index("trip_id")
+            arrival_index = header.index("arrival_time")
+            departure_index = header.index("departure_time")
+            stop_id_index = header.index("stop_id")
+            sequence_index = header.index("stop_sequence")
+
+            has_shape_dist = "shape_dist_traveled" in header
             if not has_shape_dist:
                 logger.warning(
-                    "Column 'shape_dist_traveled' not found in stop_times.txt. Distances will be set to None."
+                    "Column 'shape_dist_traveled' not found in stop_times.txt. "
+                    "Distances will be set to None."
                 )
+            dist_index = header.index("shape_dist_traveled") if has_shape_dist else -1
 
-            for row in reader:
-                trip_id = row["trip_id"]
-                if trip_id not in stops:
-                    stops[trip_id] = []
+            stop_column = columns["stop"]
+            arrival_column = columns["arrival"]
+            departure_column = columns["departure"]
+            distance_column = columns["distance"]
 
-                dist = None
-                if has_shape_dist and row["shape_dist_traveled"]:
-                    try:
-                        dist = float(row["shape_dist_traveled"])
-                    except ValueError:
-                        pass
+            for line in stop_times_file:
+                if not line.strip():
+                    continue
+
+                if trip_matches is not None and '"' not in line:
+                    # Only split as far as the trip_id column to decide on the
+                    # row, short rows go through the full split below
+                    fields = line.split(",", trip_id_index + 1)
+                    if len(fields) > trip_id_index and not trip_matches(
+                        fields[trip_id_index].rstrip("\r\n")
+                    ):
+                        skipped_rows += 1
+                        continue
+
+                row = _split_row(line)
+                if len(row) < len(header):
+                    # Missing trailing columns are empty, as with csv.DictReader
+                    row.extend([""] * (len(header) - len(row)))
+                    padded_rows += 1
+
+                trip_id = row[trip_id_index]
+                if trip_matches is not None and not trip_matches(trip_id):
+                    skipped_rows += 1
+                    continue
 
                 try:
-                    stops[trip_id].append(
-                        StopTime(
-                            trip_id=trip_id,
-                            arrival_time=row["arrival_time"],
-                            departure_time=row["departure_time"],
-                            stop_id=row["stop_id"],
-                            stop_sequence=int(row["stop_sequence"]),
-                            shape_dist_traveled=dist,
-                        )
-                    )
+                    sequence = int(row[sequence_index])
                 except ValueError as e:
                     logger.warning(
                         f"Error parsing stop_sequence for trip {trip_id}: {e}"
                     )
+                    continue
+
+                trip = trip_index.get(trip_id)
+                if trip is None:
+                    trip = len(trip_ids)
+                    trip_index[trip_id] = trip
+                    trip_ids.append(trip_id)
+
+                stop_id = row[stop_id_index]
+                stop = stop_index.get(stop_id)
+                if stop is None:
+                    stop = len(stop_ids)
+                    stop_index[stop_id] = stop
+                    stop_ids.append(stop_id)
+
+                dist = math.nan
+                if has_shape_dist and row[dist_index]:
+                    try:
+                        dist = float(row[dist_index])
+                    except ValueError:
+                        pass
+
+                try:
+                    columns["sequence"].append(sequence)
+                except OverflowError:
+                    # Sequences beyond 65535 are rare, widen the column only then
+                    columns["sequence"] = array("I", columns["sequence"])
+                    columns["sequence"].append(sequence)
+
+                trip_column.append(trip)
+                stop_column.append(stop)
+                arrival_column.append(parse_gtfs_time(row[arrival_index]))
+                departure_column.append(parse_gtfs_time(row[departure_index]))
+                distance_column.append(dist)
+
+        store = _build_store(
+            trip_ids, trip_index, stop_ids, stop_index, trip_column, columns
+        )
+        count("stop_times_rows", len(trip_column) + skipped_rows)
+
+        if padded_rows:
+            logger.warning(
+                f"{padded_rows} rows of stop_times.txt have fewer columns than "
+                "the header, their missing columns were read as empty."
+            )
 
-        for trip_stop_times in stops.values():
-            trip_stop_times.sort(key=lambda st: st.stop_sequence)
+        if trip_matches is not None:
+            logger.info(
+                f"Loaded {len(trip_column)} stop times for {len(trip_ids)} trips, "
+                f"skipped {skipped_rows} rows of other trips."
+            )
+            if not skipped_rows:
+                # Every trip matched, so the store also serves the loads of the
+                # feed that need every trip
+                FULL_STOP_TIMES_BY_FEED[feed_dir] = store
 
     except FileNotFoundError:
         logger.warning("stop_times.txt file not found.")
-        stops = {}
+        store = StopTimesStore()
 
-    STOP_TIMES_BY_FEED[feed_dir] = stops
-    return stops
+    return store
 
 
-def get_stops_for_trips(
-    feed_dir: str, trip_ids: list[str]
-) -> dict[str, list[StopTime]]:
+def _get_trip_matches(trip_filter: TripFilter | None) -> Callable[[str], bool] | None:
+    if trip_filter is None or callable(trip_filter):
+        return trip_filter
+    return trip_filter.__contains__
+
+
+def _same_trip_filter(first: TripFilter | None, second: TripFilter | None) -> bool:
+    if first is second:
+        return True
+    if first is None or second is None or callable(first) or callable(second):
+        return False
+    return set(first) == set(second)
+
+
+def _load_stop_times_for_feed(
+    feed_dir: str, trip_filter: TripFilter | None = None
+) -> StopTimesStore:
+    """
+    Load the stop_times of the trips of a feed matching a filter.
+
+    When a trip_filter is given, either a collection of trip ids or a predicate
+    on the trip id, only the trips matching it are loaded, and every trip
+    otherwise. The store of the first load of the feed is cached as the store of
+    the run, kept until invalidate_feed is called for the feed. Later loads with
+    another filter are served from the store with every trip of the feed, read
+    once for them, instead of the store of the run.
+    """
+    cached_store = STOP_TIMES_BY_FEED.get(feed_dir)
+    if cached_store is not None:
+        if _same_trip_filter(cached_store.trip_filter, trip_filter):
+            return cached_store
+        logger.debug(
+            f"Stop times of {feed_dir} were loaded for other trips, serving them "
+            "from every trip of the feed."
+        )
+        full_store = get_full_stop_times(feed_dir)
+        if trip_filter is None:
+            return full_store
+        store = full_store.restrict(_get_trip_matches(trip_filter))
+        store.trip_filter = trip_filter
+        return store
+
+    trip_matches = _get_trip_matches(trip_filter)
+    full_store = FULL_STOP_TIMES_BY_FEED.get(feed_dir)
+    if full_store is None:
+        store = _read_stop_times(feed_dir, trip_matches)
+    elif trip_matches is None:
+        store = full_store
+    else:
+        store = full_store.restrict(trip_matches)
+    store.trip_filter = trip_filter
+
+    STOP_TIMES_BY_FEED[feed_dir] = store
+    return store
+
+
+def get_run_stop_times(feed_dir: str) -> StopTimesStore:
     """
-    Get stops for a list of trip IDs based on the cached 'stop_times.txt' data.
+    Get the stop_times of the trips the run loaded for a feed, those of the
+    filter of its first load, or of every trip when the feed was not loaded yet.
+
+    Meant for the callers that only work on the trips of the generated dates,
+    which must not load the whole feed when the run has filtered it.
+    """
+    store = STOP_TIMES_BY_FEED.get(feed_dir)
+    if store is None:
+        store = _load_stop_times_for_feed(feed_dir)
+    return store
+
+
+def get_full_stop_times(feed_dir: str) -> StopTimesStore:
+    """
+    Get a store with the stop times of every trip of a feed, loading it on first
+    use. It is kept apart from the store of the run, which may only hold some
+    trips, and is used to serve the loads of the feed with other filters.
+    """
+    store = FULL_STOP_TIMES_BY_FEED.get(feed_dir)
+    if store is None:
+        store = _read_stop_times(feed_dir, None)
+        FULL_STOP_TIMES_BY_FEED[feed_dir] = store
+    return store
+
+
+def get_stops_for_trips(feed_dir: str, trip_ids: list[str]) -> dict[str, TripStopTimes]:
+    """
+    Get stops for a list of trip IDs from the stop times loaded for the run.
+
+    The result is not cached: it only holds views over the cached store, and
+    dates with the same services are generated only once.
     """
     if not trip_ids:
         return {}
 
-    request_key = (feed_dir, frozenset(trip_ids))
-    cached_subset = STOP_TIMES_BY_REQUEST.get(request_key)
-    if cached_subset is not None:
-        return cached_subset
-
-    feed_cache = _load_stop_times_for_feed(feed_dir)
+    feed_cache = get_run_stop_times(feed_dir)
     if not feed_cache:
-        STOP_TIMES_BY_REQUEST[request_key] = {}
         return {}
 
-    result: dict[str, list[StopTime]] = {}
+    result: dict[str, TripStopTimes] = {}
     seen: set[str] = set()
     for trip_id in trip_ids:
         if trip_id in seen:
             continue
         seen.add(trip_id)
-        trip_stop_times = feed_cache.get(trip_id)
+        trip_stop_times = feed_cache.get_trip(trip_id)
         if trip_stop_times:
             result[trip_id] = trip_stop_times
 
-    STOP_TIMES_BY_REQUEST[request_key] = result
     return result
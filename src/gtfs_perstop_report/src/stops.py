@@ -1,10 +1,13 @@
 import csv
 import os
+from array import array
 from dataclasses import dataclass
 from typing import Dict, Optional
 
 from pyproj import Transformer
 
+from src.cache import FeedCache
+from src.feed import open_feed_file
 from src.logger import get_logger
 
 logger = get_logger("stops")
@@ -22,24 +25,34 @@ class Stop:
     stop_25829_y: Optional[float] = None
 
 
-CACHED_STOPS: dict[str, dict[str, Stop]] = {}
-CACHED_BY_CODE: dict[str, dict[str, Stop]] = {}
+CACHED_STOPS: FeedCache[dict[str, Stop]] = FeedCache("stops")
+CACHED_BY_CODE: FeedCache[dict[str, Stop]] = FeedCache("stops_by_code")
 
 
 def get_all_stops_by_code(feed_dir: str) -> Dict[str, Stop]:
-    if feed_dir in CACHED_BY_CODE:
-        return CACHED_BY_CODE[feed_dir]
-
-    transformer = Transformer.from_crs(4326, 25829, always_xy=True)
+    cached_stops = CACHED_BY_CODE.get(feed_dir)
+    if cached_stops is not None:
+        return cached_stops
 
     stops_by_code: Dict[str, Stop] = {}
     all_stops = get_all_stops(feed_dir)
 
-    for stop in all_stops.values():
-        stop_25829_x, stop_25829_y = transformer.transform(stop.stop_lon, stop.stop_lat)
+    # Transform the coordinates of every stop in a single call
+    located_stops = [
+        stop
+        for stop in all_stops.values()
+        if stop.stop_lat is not None and stop.stop_lon is not None
+    ]
+    transformer = Transformer.from_crs(4326, 25829, always_xy=True)
+    xs, ys = transformer.transform(
+        array("d", [stop.stop_lon for stop in located_stops]),
+        array("d", [stop.stop_lat for stop in located_stops]),
+    )
+    for stop, stop_25829_x, stop_25829_y in zip(located_stops, xs, ys):
         stop.stop_25829_x = stop_25829_x
         stop.stop_25829_y = stop_25829_y
 
+    for stop in all_stops.values():
         if stop.stop_code:
             stops_by_code[get_numeric_code(stop.stop_code)] = stop
         else:
@@ -51,14 +64,15 @@ def get_all_stops_by_code(feed_dir: str) -> Dict[str, Stop]:
 
 
 def get_all_stops(feed_dir: str) -> Dict[str, Stop]:
-    if feed_dir in CACHED_STOPS:
-        return CACHED_STOPS[feed_dir]
+    cached_stops = CACHED_STOPS.get(feed_dir)
+    if cached_stops is not None:
+        return cached_stops
 
     stops: Dict[str, Stop] = {}
     file_path = os.path.join(feed_dir, "stops.txt")
 
     try:
-        with open(file_path, "r", encoding="utf-8", newline="") as f:
+        with open_feed_file(feed_dir, "stops.txt", newline="") as f:
             reader = csv.DictReader(f, quotechar='"', delimiter=",")
             for row_num, row in enumerate(reader, start=2):
                 try:
@@ -78,7 +92,8 @@ def get_all_stops(feed_dir: str) -> Dict[str, Stop]:
                     stops[stop.stop_id] = stop
                 except Exception as e:
                     logger.warning(
-                        f"Error parsing stops.txt line {row_num}: {e} - line data: {row}"
+                        f"Error parsing stops.txt line {row_num}: {e} - line data: "
+                        f"{row}"
                     )
 
     except FileNotFoundError:
@@ -1,5 +1,10 @@
 import re
 
+from src.cache import FeedCache
+from src.logger import get_logger
+from src.stops import get_all_stops
+
+logger = get_logger("street_name")
 
 re_remove_quotation_marks = re.compile(r'[""”]', re.IGNORECASE)
 re_anything_before_stopcharacters_with_parentheses = re.compile(
@@ -26,26 +31,68 @@ NAME_REPLACEMENTS = {
 }
 
 
+# Matches any NAME_REPLACEMENTS key in a lowercased name, with one group per key
+# in dictionary order
+_NAME_REPLACEMENT_KEYS = list(NAME_REPLACEMENTS)
+_LOWERCASE_REPLACEMENT_KEYS = [old_name.lower() for old_name in _NAME_REPLACEMENT_KEYS]
+re_name_replacements = re.compile(
+    "|".join(f"({re.escape(old_name)})" for old_name in _LOWERCASE_REPLACEMENT_KEYS)
+)
+
+
 def get_street_name(original_name: str) -> str:
-    original_name = re.sub(re_remove_quotation_marks, "", original_name).strip()
-    match = re.match(re_anything_before_stopcharacters_with_parentheses, original_name)
+    original_name = re_remove_quotation_marks.sub("", original_name).strip()
+    match = re_anything_before_stopcharacters_with_parentheses.match(original_name)
     if match:
         street_name = match.group(1)
     else:
         street_name = original_name
 
-    for old_name, new_name in NAME_REPLACEMENTS.items():
-        if old_name.lower() in street_name.lower():
-            street_name = street_name.replace(old_name, new_name)
-            return street_name.strip()
+    lowercase_name = street_name.lower()
+    match = re_name_replacements.search(lowercase_name)
+    if match:
+        # The leftmost key found is not necessarily the first in dictionary order,
+        # which is the one applied, but only the keys before it can be
+        index = match.lastindex - 1
+        for earlier_index in range(index):
+            if _LOWERCASE_REPLACEMENT_KEYS[earlier_index] in lowercase_name:
+                index = earlier_index
+                break
+        old_name = _NAME_REPLACEMENT_KEYS[index]
+        street_name = street_name.replace(old_name, NAME_REPLACEMENTS[old_name])
+        return street_name.strip()
 
     return street_name
 
 
+STREET_NAMES: FeedCache[dict[str, str]] = FeedCache("street_names")
+
+
+def get_street_names(feed_dir: str, provider) -> dict[str, str]:
+    """
+    Get the street name the provider extracts from every distinct stop name in
+    the feed, keyed by stop name. Computed once per feed and provider.
+    """
+    key = (feed_dir, provider)
+    street_names = STREET_NAMES.get(key)
+    if street_names is None:
+        street_names = {}
+        for stop in get_all_stops(feed_dir).values():
+            if stop.stop_name is not None and stop.stop_name not in street_names:
+                street_names[stop.stop_name] = provider.extract_street_name(
+                    stop.stop_name
+                )
+        STREET_NAMES[key] = street_names
+        logger.debug(
+            f"Extracted street names of {len(street_names)} stop names in {feed_dir}"
+        )
+    return street_names
+
+
 def normalise_stop_name(original_name: str | None) -> str:
     if original_name is None:
         return ""
-    stop_name = re.sub(re_remove_quotation_marks, "", original_name).strip()
+    stop_name = re_remove_quotation_marks.sub("", original_name).strip()
 
     stop_name = stop_name.replace("  ", ", ")
 
@@ -0,0 +1,230 @@
+"""
+Feed-wide index of the trips run one after the other by the same vehicle.
+
+Trips are chained by their block_id when the feed has one, and otherwise by
+the line and shift parsed from their trip_id, as in VIGO_20241122_003001-12.
+The chains are built once per feed, ordered and with the first and last stop of
+every trip, so that finding the previous trip of each trip on a date only has
+to pick the trips of the services active on it.
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from src.cache import FeedCache
+from src.logger import get_logger
+from src.stop_times import get_run_stop_times
+from src.trips import get_all_trips
+
+logger = get_logger("trip_chains")
+
+
+def parse_trip_id_components(trip_id: str) -> Optional[Tuple[str, str, int]]:
+    """
+    Parse a trip ID in format XXXYYY-Z or XXXYYY_Z where:
+    - XXX = line number (e.g., 003)
+    - YYY = shift/internal ID (e.g., 001)
+    - Z = trip number (e.g., 12)
+
+    Supported formats:
+    1. ..._XXXYYY_Z (e.g. "C1 01SNA00_001001_18")
+    2. ..._XXXYYY-Z (e.g. "VIGO_20241122_003001-12")
+
+    Returns tuple of (line, shift_id, trip_number) or None if parsing fails.
+    """
+    try:
+        parts = trip_id.split("_")
+        if len(parts) < 2:
+            return None
+
+        # Try format 1: ..._XXXYYY_Z
+        # Check if second to last part is 6 digits (XXXYYY) and last part is numeric
+        if len(parts) >= 2:
+            shift_part = parts[-2]
+            trip_num_str = parts[-1]
+            if len(shift_part) == 6 and shift_part.isdigit() and trip_num_str.isdigit():
+                line = shift_part[:3]
+                shift_id = shift_part[3:6]
+                trip_number = int(trip_num_str)
+                return (line, shift_id, trip_number)
+
+        # Try format 2: ..._XXXYYY-Z
+        # The trip ID is the last part in format XXXYYY-Z
+        trip_part = parts[-1]
+
+        if "-" in trip_part:
+            shift_part, trip_num_str = trip_part.split("-", 1)
+
+            # shift_part should be 6 digits: XXXYYY
+            if len(shift_part) == 6 and shift_part.isdigit():
+                line = shift_part[:3]  # First 3 digits
+                shift_id = shift_part[3:6]  # Next 3 digits
+                trip_number = int(trip_num_str)
+                return (line, shift_id, trip_number)
+
+        return None
+    except (ValueError, IndexError):
+        return None
+
+
+class ChainedTrip:
+    """A trip of a chain, with what is needed to link it to the previous one."""
+
+    __slots__ = (
+        "trip_id",
+        "service_id",
+        "shape_id",
+        "position",
+        "start_stop_id",
+        "end_stop_id",
+    )
+
+    def __init__(
+        self,
+        trip_id: str,
+        service_id: str,
+        shape_id: str | None,
+        position: int,
+        start_stop_id: str,
+        end_stop_id: str,
+    ):
+        self.trip_id = trip_id
+        self.service_id = service_id
+        self.shape_id = shape_id
+        # Trip number within a shift, or departure seconds within a block
+        self.position = position
+        self.start_stop_id = start_stop_id
+        self.end_stop_id = end_stop_id
+
+
+class TripChain:
+    """
+    The trips of a block or a shift, ordered by position.
+
+    Trips of a shift are only linked when their trip numbers are consecutive,
+    while trips of a block are linked to the trip before them.
+    """
+
+    __slots__ = ("trips", "consecutive", "has_ties")
+
+    def __init__(self, trips: List[ChainedTrip], consecutive: bool):
+        self.trips = trips
+        self.consecutive = consecutive
+        # Whether some trips share a position, and are then ordered by the
+        # services of the date
+        self.has_ties = any(
+            previous.position == current.position
+            for previous, current in zip(trips, trips[1:])
+        )
+
+
+TRIP_CHAINS: FeedCache[List[TripChain]] = FeedCache("trip_chains")
+
+
+def _build_trip_chains(feed_dir: str) -> List[TripChain]:
+    stop_times = get_run_stop_times(feed_dir)
+
+    trips_by_block: Dict[str, List[Tuple[int, int, ChainedTrip]]] = {}
+    trips_by_shift: Dict[str, List[Tuple[int, int, ChainedTrip]]] = {}
+    for index, trip in enumerate(get_all_trips(feed_dir)):
+        if trip.block_id:
+            chains, chain_key = trips_by_block, trip.block_id
+            position = None
+        else:
+            parsed = parse_trip_id_components(trip.trip_id)
+            if not parsed:
+                continue
+            line, shift_id, position = parsed
+            chains, chain_key = trips_by_shift, f"{line}{shift_id}"
+
+        trip_stops = stop_times.get_trip(trip.trip_id)
+        if not trip_stops or len(trip_stops) < 2:
+            continue
+
+        first_stop = trip_stops[0]
+        if position is None:
+            position = first_stop.departure_seconds
+        chains.setdefault(chain_key, []).append(
+            (
+                position,
+                index,
+                ChainedTrip(
+                    trip.trip_id,
+                    trip.service_id,
+                    trip.shape_id,
+                    position,
+                    first_stop.stop_id,
+                    trip_stops[-1].stop_id,
+                ),
+            )
+        )
+
+    trip_chains: List[TripChain] = []
+    for chains, consecutive in ((trips_by_block, False), (trips_by_shift, True)):
+        for chain_trips in chains.values():
+            if len(chain_trips) < 2:
+                continue
+            # Trips with the same position stay in feed order
+            chain_trips.sort(key=lambda item: item[:2])
+            trip_chains.append(
+                TripChain([trip for _, _, trip in chain_trips], consecutive)
+            )
+
+    logger.info(
+        f"Indexed {len(trips_by_block)} blocks and {len(trips_by_shift)} shifts "
+        f"into {len(trip_chains)} trip chains for {feed_dir}"
+    )
+    return trip_chains
+
+
+def get_trip_chains(feed_dir: str) -> List[TripChain]:
+    """
+    Get the chains of trips of a feed with at least two trips with stop times
+    loaded for the run, which holds the trips of every service of its dates.
+    Built on first use and cached per feed.
+    """
+    trip_chains = TRIP_CHAINS.get(feed_dir)
+    if trip_chains is None:
+        trip_chains = _build_trip_chains(feed_dir)
+        TRIP_CHAINS[feed_dir] = trip_chains
+    return trip_chains
+
+
+def get_previous_trip_shapes(
+    feed_dir: str, service_ids: Iterable[str]
+) -> Dict[str, str]:
+    """
+    Map each trip of the given services to the shape of the trip run by the
+    same vehicle just before it, when that trip ends where it starts.
+
+    Args:
+        feed_dir: Path to the GTFS feed directory
+        service_ids: Services active on the date, ordering the trips of a shift
+            that share a trip number
+
+    Returns:
+        Dictionary mapping trip_id to previous_trip_shape_id, for the trips
+        that have one.
+    """
+    service_ranks = {service_id: i for i, service_id in enumerate(service_ids)}
+
+    previous_shapes: Dict[str, str] = {}
+    for chain in get_trip_chains(feed_dir):
+        trips = [trip for trip in chain.trips if trip.service_id in service_ranks]
+        if len(trips) < 2:
+            continue
+        if chain.has_ties:
+            trips.sort(key=lambda trip: (trip.position, service_ranks[trip.service_id]))
+
+        for previous, current in zip(trips, trips[1:]):
+            # Link the trips if they are consecutive, if the previous trip's
+            # terminus matches the current trip's start, and if both trips have
+            # valid shape IDs
+            if (
+                (not chain.consecutive or current.position == previous.position + 1)
+                and previous.end_stop_id == current.start_stop_id
+                and previous.shape_id
+                and current.shape_id
+            ):
+                previous_shapes[current.trip_id] = previous.shape_id
+
+    return previous_shapes
@@ -0,0 +1,239 @@
+"""
+Date-invariant expansion of the trips of a feed.
+
+Everything about a trip's arrivals that does not depend on the date (stop codes,
+street segments, normalised names and provider formatting) is computed once per
+feed and provider, so that processing a date only has to pick the active trips.
+"""
+
+from src.cache import FeedCache
+from src.common import NO_TIME
+from src.logger import get_logger
+from src.routes import load_routes
+from src.shape_index import fill_shape_distances, get_stop_projections
+from src.stop_times import get_run_stop_times
+from src.stops import get_all_stops, get_numeric_code
+from src.street_name import get_street_names, normalise_stop_name
+from src.trips import get_all_trips
+
+logger = get_logger("trip_templates")
+
+
+class StopCall:
+    """
+    A stop of a trip that gets an arrival in the report (every stop but the terminus).
+    """
+
+    __slots__ = (
+        "stop_code",
+        "stop_sequence",
+        "shape_dist_traveled",
+        "departure_seconds",
+        "next_streets_offset",
+    )
+
+    def __init__(
+        self,
+        stop_code: str,
+        stop_sequence: int,
+        shape_dist_traveled: float | None,
+        departure_seconds: int,
+        next_streets_offset: int,
+    ):
+        self.stop_code = stop_code
+        self.stop_sequence = stop_sequence
+        self.shape_dist_traveled = shape_dist_traveled
+        self.departure_seconds = departure_seconds
+        # The next streets of the call are street_sequence[next_streets_offset:]
+        self.next_streets_offset = next_streets_offset
+
+
+class TripTemplate:
+    """
+    The date-invariant part of the arrivals generated by a trip.
+    """
+
+    __slots__ = (
+        "trip_id",
+        "service_id",
+        "line",
+        "route",
+        "shape_id",
+        "formatted_service_id",
+        "formatted_trip_id",
+        "starting_code",
+        "starting_name",
+        "starting_seconds",
+        "terminus_code",
+        "terminus_name",
+        "terminus_seconds",
+        "street_sequence",
+        "calls",
+    )
+
+    def __init__(self, trip_id: str, service_id: str):
+        self.trip_id = trip_id
+        self.service_id = service_id
+        self.line = ""
+        self.route = ""
+        self.shape_id: str | None = None
+        self.formatted_service_id = ""
+        self.formatted_trip_id = ""
+        self.starting_code = ""
+        self.starting_name = ""
+        # Seconds since midnight of the service day, or NO_TIME
+        self.starting_seconds = NO_TIME
+        self.terminus_code = ""
+        self.terminus_name = ""
+        self.terminus_seconds = NO_TIME
+        # Streets the trip goes through, in order and without repetitions
+        self.street_sequence: list[str] = []
+        self.calls: list[StopCall] = []
+
+
+TRIP_TEMPLATES: FeedCache[dict[str, TripTemplate]] = FeedCache("trip_templates")
+
+
+def _build_trip_templates(feed_dir: str, provider) -> dict[str, TripTemplate]:
+    stops = get_all_stops(feed_dir)
+    routes = load_routes(feed_dir)
+    stop_times = get_run_stop_times(feed_dir)
+    street_names = get_street_names(feed_dir, provider)
+
+    # Create a reverse lookup from stop_id to stop_code (or stop_id as fallback)
+    stop_id_to_code = {}
+    for stop_id, stop in stops.items():
+        if stop.stop_code:
+            stop_id_to_code[stop_id] = get_numeric_code(stop.stop_code)
+        else:
+            # Fallback to stop_id if stop_code is not available (e.g., train stations)
+            stop_id_to_code[stop_id] = stop_id
+
+    templates: dict[str, TripTemplate] = {}
+    filled_distances = 0
+
+    for trip in get_all_trips(feed_dir):
+        trip_stops = stop_times.get_trip(trip.trip_id)
+        if not trip_stops:
+            continue
+
+        template = TripTemplate(trip.trip_id, trip.service_id)
+
+        route_info = routes.get(trip.route_id, {})
+        template.line = route_info.get("route_short_name", "")
+        template.shape_id = getattr(trip, "shape_id", "")
+        trip_headsign = getattr(trip, "headsign", "") or ""
+
+        # Pair stop_times with stop metadata once to avoid repeated lookups
+        trip_stop_pairs = []
+        stop_names = []
+        for stop_time in trip_stops:
+            stop = stops.get(stop_time.stop_id)
+            trip_stop_pairs.append((stop_time, stop))
+            stop_names.append(stop.stop_name if stop else "Unknown Stop")
+
+        # Build the sequence of streets of the trip. The next streets of a stop
+        # are those after the street of the stop, so they are a suffix of it.
+        street_sequence: list[str] = []
+        next_streets_offsets: list[int] = []
+        previous_street: str | None = None
+        for name in stop_names:
+            street = street_names.get(name)
+            if street is None:
+                # Stops missing from stops.txt, named "Unknown Stop"
+                street = provider.extract_street_name(name)
+                street_names[name] = street
+            if street != previous_street:
+                if street:
+                    street_sequence.append(street)
+                previous_street = street
+            next_streets_offsets.append(len(street_sequence))
+
+        first_stop_time, first_stop = trip_stop_pairs[0]
+        last_stop_time, last_stop = trip_stop_pairs[-1]
+
+        starting_stop_name = first_stop.stop_name if first_stop else "Unknown Stop"
+        terminus_stop_name = last_stop.stop_name if last_stop else "Unknown Stop"
+
+        # Get stop codes with fallback to stop_id if stop_code is empty
+        if first_stop:
+            starting_code = get_numeric_code(first_stop.stop_code)
+            if not starting_code:
+                starting_code = first_stop_time.stop_id
+        else:
+            starting_code = ""
+
+        if last_stop:
+            terminus_code = get_numeric_code(last_stop.stop_code)
+            if not terminus_code:
+                terminus_code = last_stop_time.stop_id
+        else:
+            terminus_code = ""
+
+        template.starting_code = starting_code
+        template.terminus_code = terminus_code
+        template.starting_name = normalise_stop_name(starting_stop_name)
+        template.terminus_name = normalise_stop_name(terminus_stop_name)
+        template.starting_seconds = first_stop_time.departure_seconds
+        template.terminus_seconds = last_stop_time.arrival_seconds
+
+        # Format IDs and route using provider-specific logic
+        template.formatted_service_id = provider.format_service_id(trip.service_id)
+        template.formatted_trip_id = provider.format_trip_id(trip.trip_id)
+        template.route = provider.format_route(trip_headsign, template.terminus_name)
+        template.street_sequence = street_sequence
+
+        # Fill the distances the feed leaves empty from the projection of the
+        # stops onto the shape
+        distances = [stop_time.shape_dist_traveled for stop_time, _ in trip_stop_pairs]
+        if template.shape_id and None in distances[:-1]:
+            projections = get_stop_projections(
+                feed_dir,
+                template.shape_id,
+                tuple(stop_time.stop_id for stop_time, _ in trip_stop_pairs),
+            )
+            if projections is not None:
+                filled_distances += sum(
+                    1 for distance in distances[:-1] if distance is None
+                )
+                distances = fill_shape_distances(distances, projections)
+
+        # The terminus is skipped to avoid duplicating the arrival of the next trip
+        for i, (stop_time, _) in enumerate(trip_stop_pairs[:-1]):
+            stop_code = stop_id_to_code.get(stop_time.stop_id)
+            if not stop_code:
+                continue  # Skip stops without a code
+
+            template.calls.append(
+                StopCall(
+                    stop_code=stop_code,
+                    stop_sequence=stop_time.stop_sequence,
+                    shape_dist_traveled=distances[i],
+                    departure_seconds=stop_time.departure_seconds,
+                    next_streets_offset=next_streets_offsets[i],
+                )
+            )
+
+        templates[trip.trip_id] = template
+
+    if filled_distances:
+        logger.info(
+            f"Filled {filled_distances} empty shape_dist_traveled values from the "
+            "shapes"
+        )
+
+    return templates
+
+
+def get_trip_templates(feed_dir: str, provider) -> dict[str, TripTemplate]:
+    """
+    Get the templates of every trip with stop times loaded for the run of the
+    feed, keyed by trip_id. Built on first use and cached per feed and provider.
+    """
+    key = (feed_dir, provider)
+    templates = TRIP_TEMPLATES.get(key)
+    if templates is None:
+        templates = _build_trip_templates(feed_dir, provider)
+        TRIP_TEMPLATES[key] = templates
+        logger.info(f"Expanded {len(templates)} trip templates for {feed_dir}")
+    return templates
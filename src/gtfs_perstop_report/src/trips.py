@@ -2,7 +2,8 @@
 Functions for handling GTFS trip data.
 """
 
-import os
+from src.cache import FeedCache
+from src.feed import open_feed_file
 from src.logger import get_logger
 
 logger = get_logger("trips")
@@ -34,10 +35,14 @@ class TripLine:
         self.route_color = ""
 
     def __str__(self):
-        return f"TripLine({self.route_id=}, {self.service_id=}, {self.trip_id=}, {self.headsign=}, {self.direction_id=}, {self.shape_id=}, {self.block_id=})"
+        return (
+            f"TripLine({self.route_id=}, {self.service_id=}, {self.trip_id=}, "
+            f"{self.headsign=}, {self.direction_id=}, {self.shape_id=}, "
+            f"{self.block_id=})"
+        )
 
 
-TRIPS_BY_SERVICE_ID: dict[str, dict[str, list[TripLine]]] = {}
+TRIPS_BY_SERVICE_ID: FeedCache[dict[str, list[TripLine]]] = FeedCache("trips")
 
 
 def get_trips_for_services(
@@ -52,23 +57,22 @@ def get_trips_for_services(
         service_ids (list[str]): List of service IDs to find trips for.
 
     Returns:
-        dict[str, list[TripLine]]: Dictionary mapping service IDs to lists of trip objects.
+        dict[str, list[TripLine]]: Dictionary mapping service IDs to lists of trip
+            objects.
     """
     # Check if we already have cached data for this feed directory
-    if feed_dir in TRIPS_BY_SERVICE_ID:
+    cached_trips = TRIPS_BY_SERVICE_ID.get(feed_dir)
+    if cached_trips is not None:
         logger.debug(f"Using cached trips data for {feed_dir}")
         # Return only the trips for the requested service IDs
         return {
-            service_id: TRIPS_BY_SERVICE_ID[feed_dir].get(service_id, [])
-            for service_id in service_ids
+            service_id: cached_trips.get(service_id, []) for service_id in service_ids
         }
 
     trips: dict[str, list[TripLine]] = {}
 
     try:
-        with open(
-            os.path.join(feed_dir, "trips.txt"), "r", encoding="utf-8"
-        ) as trips_file:
+        with open_feed_file(feed_dir, "trips.txt") as trips_file:
             lines = trips_file.readlines()
             if len(lines) <= 1:
                 logger.warning(
@@ -101,8 +105,8 @@ def get_trips_for_services(
             else:
                 logger.info("block_id column not found in trips.txt")
 
-            # Initialize cache for this feed directory
-            TRIPS_BY_SERVICE_ID[feed_dir] = {}
+            # Every trip of the feed, cached once the whole file has been read
+            trips_by_service: dict[str, list[TripLine]] = {}
 
             for line in lines[1:]:
                 parts = line.strip().split(",")
@@ -116,8 +120,8 @@ def get_trips_for_services(
                 trip_id = parts[trip_id_index]
 
                 # Cache all trips, not just the ones requested
-                if service_id not in TRIPS_BY_SERVICE_ID[feed_dir]:
-                    TRIPS_BY_SERVICE_ID[feed_dir][service_id] = []
+                if service_id not in trips_by_service:
+                    trips_by_service[service_id] = []
 
                 # Get shape_id if available
                 shape_id = None
@@ -141,15 +145,65 @@ def get_trips_for_services(
                     block_id=block_id,
                 )
 
-                TRIPS_BY_SERVICE_ID[feed_dir][service_id].append(trip_line)
+                trips_by_service[service_id].append(trip_line)
 
-                # Also build the result for the requested service IDs
-                if service_id in service_ids:
-                    if service_id not in trips:
-                        trips[service_id] = []
-                    trips[service_id].append(trip_line)
+            TRIPS_BY_SERVICE_ID[feed_dir] = trips_by_service
+
+            # Built the same way as from the cache, as the entry may be evicted
+            # and the file read again between two calls
+            trips = {
+                service_id: trips_by_service.get(service_id, [])
+                for service_id in service_ids
+            }
 
     except FileNotFoundError:
         logger.warning("trips.txt file not found.")
 
     return trips
+
+
+def get_all_trips(feed_dir: str) -> list[TripLine]:
+    """
+    Get every trip in the 'trips.txt' file of a feed, in file order per service.
+    """
+    # Loading the trips for any list of services caches the whole trips.txt
+    get_trips_for_services(feed_dir, [])
+    return [
+        trip
+        for trip_list in TRIPS_BY_SERVICE_ID.get(feed_dir, {}).values()
+        for trip in trip_list
+    ]
+
+
+def get_trip_ids(
+    feed_dir: str,
+    service_ids: list[str] | set[str] | None = None,
+    route_ids: list[str] | set[str] | None = None,
+) -> set[str]:
+    """
+    Get the IDs of the trips matching the given services and routes.
+
+    Args:
+        feed_dir (str): Directory containing the GTFS feed files.
+        service_ids: Services the trips must belong to, or None for any service.
+        route_ids: Routes the trips must belong to, or None for any route.
+
+    Returns:
+        set[str]: IDs of the matching trips, usable as a stop_times trip filter.
+    """
+    # Loading the trips for any list of services caches the whole trips.txt
+    get_trips_for_services(feed_dir, [])
+    trips_by_service = TRIPS_BY_SERVICE_ID.get(feed_dir, {})
+
+    wanted_services = set(service_ids) if service_ids is not None else None
+    wanted_routes = set(route_ids) if route_ids is not None else None
+
+    trip_ids: set[str] = set()
+    for service_id, trip_list in trips_by_service.items():
+        if wanted_services is not None and service_id not in wanted_services:
+            continue
+        for trip in trip_list:
+            if wanted_routes is None or trip.route_id in wanted_routes:
+                trip_ids.add(trip.trip_id)
+
+    return trip_ids
@@ -1,27 +1,74 @@
 import argparse
+import datetime
+import multiprocessing
 import os
 import shutil
 import sys
 import time
 import traceback
-from typing import Any, Dict, List, Optional, Tuple
-
-from src.shapes import process_shapes
-from src.common import get_all_feed_dates
+import zipfile
+from concurrent.futures import (
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    as_completed,
+)
+from itertools import zip_longest
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from src.arrivals import ArrivalTrip, ScheduledArrival
+from src.cache import (
+    DEFAULT_MEMORY_BUDGET,
+    get_cache_size,
+    get_cache_stats,
+    invalidate_feed,
+    pin_feed,
+    set_memory_budget,
+)
+from src.common import (
+    NO_TIME,
+    SECONDS_PER_DAY,
+    format_gtfs_time,
+    get_all_feed_dates,
+)
 from src.download import download_feed_from_url
+from src.feed_config import FeedConfig, load_feed_configs
 from src.logger import get_logger
-from src.report_writer import write_stop_json, write_stop_protobuf
-from src.routes import load_routes
-from src.services import get_active_services
-from src.rolling_dates import create_rolling_date_config
-from src.stop_times import get_stops_for_trips, StopTime
-from src.stops import get_all_stops, get_all_stops_by_code, get_numeric_code
-from src.street_name import normalise_stop_name
-from src.trips import get_trips_for_services, TripLine
+from src.metrics import (
+    Metrics,
+    count,
+    drain_metrics,
+    enable_profiling,
+    merge_metrics,
+    reset_metrics,
+    span,
+    stage,
+    write_run_metrics,
+)
 from src.providers import get_provider
+from src.report_writer import (
+    BUNDLE_FILE_NAMES,
+    REPORT_FORMATS,
+    OutputManifest,
+    link_date_reports,
+    write_stop_bundle,
+    write_stop_reports,
+)
+from src.rolling_dates import create_rolling_date_config
+from src.services import get_active_services, get_service_calendar
+from src.shape_index import write_shape_stop_indexes
+from src.shapes import process_shapes
+from src.snapshot import load_feed_snapshot
+from src.stop_times import _load_stop_times_for_feed
+from src.stops import get_all_stops, get_all_stops_by_code
+from src.trip_chains import get_previous_trip_shapes, get_trip_chains
+from src.trip_templates import get_trip_templates
+from src.trips import get_trip_ids, get_trips_for_services
 
 logger = get_logger("stop_report")
 
+# Per-stop Protobuf files, or a single bundle of them per date
+OUTPUT_LAYOUTS = ("files", "bundle")
+
 
 def parse_args():
     parser = argparse.ArgumentParser(
@@ -30,10 +77,14 @@ def parse_args():
     parser.add_argument(
         "--output-dir",
         type=str,
-        default="./output/",
         help="Directory to write reports to (default: ./output/)",
     )
     parser.add_argument("--feed-dir", type=str, help="Path to the feed directory")
+    parser.add_argument(
+        "--feed-zip",
+        type=str,
+        help="Path to the feed zip file, read without extracting it",
+    )
     parser.add_argument(
         "--feed-url",
         type=str,
@@ -42,239 +93,171 @@ def parse_args():
     parser.add_argument(
         "--force-download",
         action="store_true",
-        help="Force download even if the feed hasn't been modified (only applies when using --feed-url)",
+        help="Force download even if the feed hasn't been modified (only applies "
+        "when using --feed-url, or to the feeds of --config that do not set "
+        "force_download)",
+    )
+    parser.add_argument(
+        "--config",
+        type=str,
+        help="JSON file listing several feeds to generate in a single run, each with "
+        "its provider, source, output directory and rolling dates, instead of a "
+        "single feed",
     )
     parser.add_argument(
         "--provider",
         type=str,
-        default="default",
         help="Feed provider type (vitrasa, renfe, default). Default: default",
     )
-    parser.add_argument('--rolling-dates', type=str,
-                    help="Path to rolling dates configuration file (JSON)")
+    parser.add_argument(
+        "--rolling-dates",
+        type=str,
+        help="Path to rolling dates configuration file (JSON)",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of worker processes used to generate dates in parallel "
+        "(default: 1)",
+    )
+    parser.add_argument(
+        "--formats",
+        type=str,
+        default=",".join(REPORT_FORMATS),
+        help="Comma-separated stop report formats to write (json, pb, pb2). Default: "
+        "json,pb,pb2",
+    )
+    parser.add_argument(
+        "--layout",
+        choices=OUTPUT_LAYOUTS,
+        default="files",
+        help="Write one Protobuf file per stop (files) or a single bundle per format "
+        "and date (bundle). Default: files",
+    )
+    parser.add_argument(
+        "--snapshot-dir",
+        type=str,
+        help="Directory for binary snapshots of the parsed feed, keyed by its "
+        "content hash, to skip parsing the CSV files on later runs of the same feed "
+        "(default: disabled)",
+    )
+    parser.add_argument(
+        "--compact-shapes",
+        action="store_true",
+        help="Also write each shape as delta-encoded centimetre coordinates "
+        "(<shape_id>.compact.pb)",
+    )
+    parser.add_argument(
+        "--shape-tolerances",
+        type=str,
+        default="",
+        help="Comma-separated Douglas-Peucker tolerances in metres of the simplified "
+        "levels of the compact shapes (e.g. 2,10)",
+    )
+    parser.add_argument(
+        "--cache-budget",
+        type=int,
+        default=DEFAULT_MEMORY_BUDGET // (1024 * 1024),
+        help="Memory budget in MiB of the caches of the parsed feed, evicting the "
+        "least recently used entries over it (default: "
+        f"{DEFAULT_MEMORY_BUDGET // (1024 * 1024)})",
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="",
+        metavar="DIR",
+        help="Dump a cProfile and a tracemalloc snapshot of every stage of the run "
+        "to DIR (default: <output-dir>/profile, of the first feed with --config)",
+    )
     args = parser.parse_args()
 
-    if args.feed_dir and args.feed_url:
-        parser.error("Specify either --feed-dir or --feed-url, not both.")
-    if not args.feed_dir and not args.feed_url:
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1.")
+    if args.cache_budget < 1:
+        parser.error("--cache-budget must be at least 1 MiB.")
+
+    args.formats = tuple(
+        dict.fromkeys(f.strip().lower() for f in args.formats.split(",") if f.strip())
+    )
+    unknown_formats = [f for f in args.formats if f not in REPORT_FORMATS]
+    if not args.formats or unknown_formats:
         parser.error(
-            "You must specify either a path to the existing feed (unzipped) or a URL to download the GTFS feed from."
+            f"Invalid --formats value. Available formats: {', '.join(REPORT_FORMATS)}"
         )
-    if args.feed_dir and not os.path.exists(args.feed_dir):
-        parser.error(f"Feed directory does not exist: {args.feed_dir}")
-    return args
-
-
-def time_to_seconds(time_str: str) -> int:
-    """
-    Convert HH:MM:SS to seconds since midnight.
-    Handles GTFS times that can exceed 24 hours (e.g., 25:30:00 for 1:30 AM next day).
-    """
-    if not time_str:
-        return 0
-
-    parts = time_str.split(":")
-    if len(parts) != 3:
-        return 0
-
-    try:
-        hours, minutes, seconds = map(int, parts)
-        return hours * 3600 + minutes * 60 + seconds
-    except ValueError:
-        return 0
-
-
-def normalize_gtfs_time(time_str: str) -> str:
-    """
-    Normalize GTFS time format to standard HH:MM:SS (0-23 hours).
-    Converts times like 25:30:00 to 01:30:00.
-
-    Args:
-        time_str: Time in HH:MM:SS format, possibly with hours >= 24
-
-    Returns:
-        Normalized time string in HH:MM:SS format
-    """
-    if not time_str:
-        return time_str
-
-    parts = time_str.split(":")
-    if len(parts) != 3:
-        return time_str
-
-    try:
-        hours, minutes, seconds = map(int, parts)
-        normalized_hours = hours % 24
-        return f"{normalized_hours:02d}:{minutes:02d}:{seconds:02d}"
-    except ValueError:
-        return time_str
-
-
-def format_gtfs_time(time_str: str) -> str:
-    """
-    Format GTFS time to HH:MM:SS, preserving hours >= 24.
-    """
-    if not time_str:
-        return time_str
-
-    parts = time_str.split(":")
-    if len(parts) != 3:
-        return time_str
-
-    try:
-        hours, minutes, seconds = map(int, parts)
-        return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
-    except ValueError:
-        return time_str
-
-
-def is_next_day_service(time_str: str) -> bool:
-    """
-    Check if a GTFS time represents a service on the next day (hours >= 24).
-
-    Args:
-        time_str: Time in HH:MM:SS format
-
-    Returns:
-        True if the time is >= 24:00:00, False otherwise
-    """
-    if not time_str:
-        return False
-
-    parts = time_str.split(":")
-    if len(parts) != 3:
-        return False
 
     try:
-        hours = int(parts[0])
-        return hours >= 24
+        args.shape_tolerances = tuple(
+            sorted({float(t) for t in args.shape_tolerances.split(",") if t.strip()})
+        )
     except ValueError:
-        return False
-
-
-def parse_trip_id_components(trip_id: str) -> Optional[Tuple[str, str, int]]:
-    """
-    Parse a trip ID in format XXXYYY-Z or XXXYYY_Z where:
-    - XXX = line number (e.g., 003)
-    - YYY = shift/internal ID (e.g., 001)
-    - Z = trip number (e.g., 12)
-
-    Supported formats:
-    1. ..._XXXYYY_Z (e.g. "C1 01SNA00_001001_18")
-    2. ..._XXXYYY-Z (e.g. "VIGO_20241122_003001-12")
-
-    Returns tuple of (line, shift_id, trip_number) or None if parsing fails.
-    """
-    try:
-        parts = trip_id.split("_")
-        if len(parts) < 2:
-            return None
-
-        # Try format 1: ..._XXXYYY_Z
-        # Check if second to last part is 6 digits (XXXYYY) and last part is numeric
-        if len(parts) >= 2:
-            shift_part = parts[-2]
-            trip_num_str = parts[-1]
-            if len(shift_part) == 6 and shift_part.isdigit() and trip_num_str.isdigit():
-                line = shift_part[:3]
-                shift_id = shift_part[3:6]
-                trip_number = int(trip_num_str)
-                return (line, shift_id, trip_number)
-
-        # Try format 2: ..._XXXYYY-Z
-        # The trip ID is the last part in format XXXYYY-Z
-        trip_part = parts[-1]
-
-        if "-" in trip_part:
-            shift_part, trip_num_str = trip_part.split("-", 1)
-
-            # shift_part should be 6 digits: XXXYYY
-            if len(shift_part) == 6 and shift_part.isdigit():
-                line = shift_part[:3]  # First 3 digits
-                shift_id = shift_part[3:6]  # Next 3 digits
-                trip_number = int(trip_num_str)
-                return (line, shift_id, trip_number)
-
-        return None
-    except (ValueError, IndexError):
-        return None
+        parser.error("Invalid --shape-tolerances value, expected numbers in metres.")
+    if any(t <= 0 for t in args.shape_tolerances):
+        parser.error("--shape-tolerances must be greater than 0.")
+    if args.shape_tolerances and not args.compact_shapes:
+        parser.error("--shape-tolerances requires --compact-shapes.")
+
+    feed_sources = [args.feed_dir, args.feed_zip, args.feed_url]
+    if args.config:
+        single_feed_options = [
+            args.output_dir,
+            args.provider,
+            args.rolling_dates,
+            *feed_sources,
+        ]
+        if any(single_feed_options):
+            parser.error(
+                "--config cannot be combined with --output-dir, --provider, "
+                "--rolling-dates, --feed-dir, --feed-zip or --feed-url."
+            )
+        try:
+            args.feeds = load_feed_configs(args.config, args.force_download)
+        except (OSError, ValueError) as e:
+            parser.error(f"Invalid feeds config {args.config}: {e}")
+        return args
+
+    if sum(1 for source in feed_sources if source) > 1:
+        parser.error("Specify only one of --feed-dir, --feed-zip or --feed-url.")
+    if not any(feed_sources):
+        parser.error(
+            "You must specify either a path to the existing feed (unzipped or zipped) "
+            "or a URL to download the GTFS feed from."
+        )
+    if args.feed_dir and not os.path.isdir(args.feed_dir):
+        parser.error(f"Feed directory does not exist: {args.feed_dir}")
+    if args.feed_zip and not zipfile.is_zipfile(args.feed_zip):
+        parser.error(f"Feed zip file does not exist or is not a zip: {args.feed_zip}")
+
+    args.provider = args.provider or "default"
+    args.feeds = [
+        FeedConfig(
+            name=args.provider,
+            provider=args.provider,
+            output_dir=args.output_dir or "./output/",
+            feed_dir=args.feed_dir,
+            feed_zip=args.feed_zip,
+            feed_url=args.feed_url,
+            force_download=args.force_download,
+            rolling_dates=args.rolling_dates,
+        )
+    ]
+    return args
 
 
-def build_trip_previous_shape_map(
-    trips: Dict[str, List[TripLine]],
-    stops_for_all_trips: Dict[str, List[StopTime]],
-) -> Dict[str, Optional[str]]:
+def normalize_gtfs_seconds(seconds: int) -> int:
     """
-    Build a mapping from trip_id to previous_trip_shape_id.
-
-    Links trips based on trip ID structure (XXXYYY-Z) where trips with the same
-    XXX (line) and YYY (shift) and sequential Z (trip numbers) are connected
-    if the terminus of trip N matches the start of trip N+1.
-
-    Args:
-        trips: Dictionary of service_id -> list of trips
-        stops_for_all_trips: Dictionary of trip_id -> list of stop times
-
-    Returns:
-        Dictionary mapping trip_id to previous_trip_shape_id (or None)
+    Normalize a GTFS time in seconds to the 0-24 hour range, so that 25:30:00
+    becomes 01:30:00. NO_TIME is kept as is.
     """
-    trip_previous_shape: Dict[str, Optional[str]] = {}
-
-    # Collect all trips across all services
-    all_trips_list: List[TripLine] = []
-    for trip_list in trips.values():
-        all_trips_list.extend(trip_list)
-
-    # Group trips by shift ID (line + shift combination)
-    trips_by_shift: Dict[str, List[Tuple[TripLine, int, str, str]]] = {}
-
-    for trip in all_trips_list:
-        parsed = parse_trip_id_components(trip.trip_id)
-        if not parsed:
-            continue
-
-        line, shift_id, trip_number = parsed
-        shift_key = f"{line}{shift_id}"
-
-        trip_stops = stops_for_all_trips.get(trip.trip_id)
-        if not trip_stops or len(trip_stops) < 2:
-            continue
-
-        first_stop = trip_stops[0]
-        last_stop = trip_stops[-1]
-
-        if shift_key not in trips_by_shift:
-            trips_by_shift[shift_key] = []
-
-        trips_by_shift[shift_key].append(
-            (trip, trip_number, first_stop.stop_id, last_stop.stop_id)
-        )
-    # For each shift, sort trips by trip number and link consecutive trips
-    for shift_key, shift_trips in trips_by_shift.items():
-        # Sort by trip number
-        shift_trips.sort(key=lambda x: x[1])
-        # Link consecutive trips if their stops match
-        for i in range(1, len(shift_trips)):
-            current_trip, current_num, current_start_stop, _ = shift_trips[i]
-            prev_trip, prev_num, _, prev_end_stop = shift_trips[i - 1]
-
-            # Check if trips are consecutive (trip numbers differ by 1),
-            # if previous trip's terminus matches current trip's start,
-            # and if both trips have valid shape IDs
-            if (
-                current_num == prev_num + 1
-                and prev_end_stop == current_start_stop
-                and prev_trip.shape_id
-                and current_trip.shape_id
-            ):
-                trip_previous_shape[current_trip.trip_id] = prev_trip.shape_id
-
-    return trip_previous_shape
+    if seconds == NO_TIME:
+        return seconds
+    return seconds % SECONDS_PER_DAY
 
 
 def get_stop_arrivals(
     feed_dir: str, date: str, provider, rolling_config=None
-) -> Dict[str, List[Dict[str, Any]]]:
+) -> Dict[str, List[ScheduledArrival]]:
     """
     Process trips for the given date and organize stop arrivals.
     Also includes night services from the previous day (times >= 24:00:00).
@@ -298,56 +281,49 @@ def get_stop_arrivals(
         effective_date = rolling_config.get_source_date(date)
         logger.info(f"Using source date {effective_date} for rolling date {date}")
 
-    active_services = get_active_services(feed_dir, effective_date)
+    with span("calendar"):
+        active_services = get_active_services(feed_dir, effective_date)
     if not active_services:
         logger.info(f"No active services found for the given date {effective_date}.")
 
-    logger.info(f"Found {len(active_services)} active services for date {effective_date}.")
+    logger.info(
+        f"Found {len(active_services)} active services for date {effective_date}."
+    )
 
     # Also get services from the previous day to include night services (times >= 24:00)
-    prev_date = (datetime.strptime(effective_date, "%Y-%m-%d") - timedelta(days=1)).strftime(
-        "%Y-%m-%d"
-    )
-    prev_services = get_active_services(feed_dir, prev_date)
+    prev_date = (
+        datetime.strptime(effective_date, "%Y-%m-%d") - timedelta(days=1)
+    ).strftime("%Y-%m-%d")
+    with span("calendar"):
+        prev_services = get_active_services(feed_dir, prev_date)
     logger.info(
-        f"Found {len(prev_services)} active services for previous date {prev_date} (for night services)."
+        f"Found {len(prev_services)} active services for previous date {prev_date} "
+        "(for night services)."
     )
 
-    all_services = list(set(active_services + prev_services))
+    # Sorted, so that the output does not depend on the hash seed of the run
+    all_services = sorted(set(active_services + prev_services))
 
     if not all_services:
         logger.info("No active services found for current or previous date.")
         return {}
 
-    trips = get_trips_for_services(feed_dir, all_services)
+    with span("trips"):
+        trips = get_trips_for_services(feed_dir, all_services)
     total_trip_count = sum(len(trip_list) for trip_list in trips.values())
+    count("trips", total_trip_count)
     logger.info(f"Found {total_trip_count} trips for active services.")
 
-    # Get all trip IDs
-    all_trip_ids = [trip.trip_id for trip_list in trips.values() for trip in trip_list]
-
-    # Get stops for all trips
-    stops_for_all_trips = get_stops_for_trips(feed_dir, all_trip_ids)
-    logger.info(f"Precomputed stops for {len(stops_for_all_trips)} trips.")
-
     # Build mapping from trip_id to previous trip's shape_id
-    trip_previous_shape_map = build_trip_previous_shape_map(trips, stops_for_all_trips)
+    with span("previous_shapes"):
+        trip_previous_shape_map = get_previous_trip_shapes(feed_dir, all_services)
     logger.info(
         f"Built previous trip shape mapping for {len(trip_previous_shape_map)} trips."
     )
 
-    # Load routes information
-    routes = load_routes(feed_dir)
-    logger.info(f"Loaded {len(routes)} routes from feed.")
-
-    # Create a reverse lookup from stop_id to stop_code (or stop_id as fallback)
-    stop_id_to_code = {}
-    for stop_id, stop in stops.items():
-        if stop.stop_code:
-            stop_id_to_code[stop_id] = get_numeric_code(stop.stop_code)
-        else:
-            # Fallback to stop_id if stop_code is not available (e.g., train stations)
-            stop_id_to_code[stop_id] = stop_id
+    # Date-invariant expansion of every trip, computed once per feed
+    with span("templates"):
+        trip_templates = get_trip_templates(feed_dir, provider)
 
     # Organize data by stop_code
     stop_arrivals = {}
@@ -355,188 +331,129 @@ def get_stop_arrivals(
     active_services_set = set(active_services)
     prev_services_set = set(prev_services)
 
-    for service_id, trip_list in trips.items():
-        is_active = service_id in active_services_set
-        is_prev = service_id in prev_services_set
+    with span("expansion"):
+        for service_id, trip_list in trips.items():
+            is_active = service_id in active_services_set
+            is_prev = service_id in prev_services_set
 
-        if not is_active and not is_prev:
-            continue
+            if not is_active and not is_prev:
+                continue
 
-        for trip in trip_list:
-            # Get route information once per trip
-            route_info = routes.get(trip.route_id, {})
-            route_short_name = route_info.get("route_short_name", "")
-            trip_headsign = getattr(trip, "headsign", "") or ""
-            trip_id = trip.trip_id
+            for trip in trip_list:
+                template = trip_templates.get(trip.trip_id)
+                if template is None:
+                    continue
 
-            # Get stop times for this trip
-            trip_stops = stops_for_all_trips.get(trip.trip_id, [])
-            if not trip_stops:
-                continue
+                # Get previous trip shape_id if available
+                previous_trip_shape_id = trip_previous_shape_map.get(trip.trip_id, "")
 
-            # Pair stop_times with stop metadata once to avoid repeated lookups
-            trip_stop_pairs = []
-            stop_names = []
-            for stop_time in trip_stops:
-                stop = stops.get(stop_time.stop_id)
-                trip_stop_pairs.append((stop_time, stop))
-                stop_names.append(stop.stop_name if stop else "Unknown Stop")
-
-            # Memoize street names per stop name for this trip and build segments
-            street_cache: dict[str, str] = {}
-            segment_names: list[str] = []
-            stop_to_segment_idx: list[int] = []
-            previous_street: str | None = None
-            for name in stop_names:
-                street = street_cache.get(name)
-                if street is None:
-                    street = provider.extract_street_name(name)
-                    street_cache[name] = street
-                if street != previous_street:
-                    segment_names.append(street)
-                    previous_street = street
-                stop_to_segment_idx.append(len(segment_names) - 1)
-
-            # Precompute future street transitions per segment
-            future_suffix_by_segment: list[tuple[str, ...]] = [()] * len(segment_names)
-            future_tuple: tuple[str, ...] = ()
-            for idx in range(len(segment_names) - 1, -1, -1):
-                future_suffix_by_segment[idx] = future_tuple
-                current_street = segment_names[idx]
-                future_tuple = (
-                    (current_street,) + future_tuple
-                    if current_street is not None
-                    else future_tuple
-                )
+                # Determine processing passes for this trip
+                passes = []
+                if is_active:
+                    passes.append("current")
+                if is_prev:
+                    passes.append("previous")
 
-            segment_future_lists: dict[int, list[str]] = {}
-
-            first_stop_time, first_stop = trip_stop_pairs[0]
-            last_stop_time, last_stop = trip_stop_pairs[-1]
-
-            starting_stop_name = first_stop.stop_name if first_stop else "Unknown Stop"
-            terminus_stop_name = last_stop.stop_name if last_stop else "Unknown Stop"
-
-            # Get stop codes with fallback to stop_id if stop_code is empty
-            if first_stop:
-                starting_code = get_numeric_code(first_stop.stop_code)
-                if not starting_code:
-                    starting_code = first_stop_time.stop_id
-            else:
-                starting_code = ""
-
-            if last_stop:
-                terminus_code = get_numeric_code(last_stop.stop_code)
-                if not terminus_code:
-                    terminus_code = last_stop_time.stop_id
-            else:
-                terminus_code = ""
-
-            starting_name = normalise_stop_name(starting_stop_name)
-            terminus_name = normalise_stop_name(terminus_stop_name)
-            starting_time = first_stop_time.departure_time
-            terminus_time = last_stop_time.arrival_time
-
-            # Determine processing passes for this trip
-            passes = []
-            if is_active:
-                passes.append("current")
-            if is_prev:
-                passes.append("previous")
-
-            for mode in passes:
-                is_current_mode = mode == "current"
-
-                for i, (stop_time, _) in enumerate(trip_stop_pairs):
-                    # Skip the last stop of the trip (terminus) to avoid duplication
-                    if i == len(trip_stop_pairs) - 1:
-                        continue
-
-                    stop_code = stop_id_to_code.get(stop_time.stop_id)
-
-                    if not stop_code:
-                        continue  # Skip stops without a code
-
-                    dep_time = stop_time.departure_time
-
-                    if not is_current_mode:
-                        # Previous day service: only include if calling_time >= 24:00:00 (night services rolling to this day)
-                        if not is_next_day_service(dep_time):
-                            continue
-
-                        # Normalize times for display on current day (e.g. 25:30 -> 01:30)
-                        final_starting_time = normalize_gtfs_time(starting_time)
-                        final_calling_time = normalize_gtfs_time(dep_time)
-                        final_terminus_time = normalize_gtfs_time(terminus_time)
-                        # SSM should be small (early morning)
-                        final_calling_ssm = time_to_seconds(final_calling_time)
-                    else:
-                        # Current day service: include ALL times
-                        # Keep times as is (e.g. 25:30 stays 25:30)
-                        final_starting_time = format_gtfs_time(starting_time)
-                        final_calling_time = format_gtfs_time(dep_time)
-                        final_terminus_time = format_gtfs_time(terminus_time)
-                        # SSM should be large if > 24:00
-                        final_calling_ssm = time_to_seconds(dep_time)
-
-                    if stop_code not in stop_arrivals:
-                        stop_arrivals[stop_code] = []
-
-                    if segment_names:
-                        segment_idx = stop_to_segment_idx[i]
-                        if segment_idx not in segment_future_lists:
-                            segment_future_lists[segment_idx] = list(
-                                future_suffix_by_segment[segment_idx]
-                            )
-                        next_streets = segment_future_lists[segment_idx].copy()
+                for mode in passes:
+                    is_current_mode = mode == "current"
+
+                    if is_current_mode:
+                        # Current day service: keep times as is (e.g. 25:30 stays 25:30)
+                        starting_seconds = template.starting_seconds
+                        terminus_seconds = template.terminus_seconds
                     else:
-                        next_streets = []
-
-                    # Format IDs and route using provider-specific logic
-                    service_id_fmt = provider.format_service_id(service_id)
-                    trip_id_fmt = provider.format_trip_id(trip_id)
-                    route_fmt = provider.format_route(trip_headsign, terminus_name)
-
-                    # Get previous trip shape_id if available
-                    previous_trip_shape_id = trip_previous_shape_map.get(trip_id, "")
-
-                    stop_arrivals[stop_code].append(
-                        {
-                            "service_id": service_id_fmt,
-                            "trip_id": trip_id_fmt,
-                            "line": route_short_name,
-                            "route": route_fmt,
-                            "shape_id": getattr(trip, "shape_id", ""),
-                            "stop_sequence": stop_time.stop_sequence,
-                            "shape_dist_traveled": getattr(
-                                stop_time, "shape_dist_traveled", 0
-                            ),
-                            "next_streets": [s for s in next_streets if s != ""],
-                            "starting_code": starting_code,
-                            "starting_name": starting_name,
-                            "starting_time": final_starting_time,
-                            "calling_time": final_calling_time,
-                            "calling_ssm": final_calling_ssm,
-                            "terminus_code": terminus_code,
-                            "terminus_name": terminus_name,
-                            "terminus_time": final_terminus_time,
-                            "previous_trip_shape_id": previous_trip_shape_id,
-                        }
+                        # Previous day service: normalize times for display on
+                        # current day
+                        starting_seconds = normalize_gtfs_seconds(
+                            template.starting_seconds
+                        )
+                        terminus_seconds = normalize_gtfs_seconds(
+                            template.terminus_seconds
+                        )
+
+                    # Shared by every arrival this trip produces in this pass
+                    arrival_trip = ArrivalTrip(
+                        service_id=template.formatted_service_id,
+                        trip_id=template.formatted_trip_id,
+                        line=template.line,
+                        route=template.route,
+                        shape_id=template.shape_id,
+                        starting_code=template.starting_code,
+                        starting_name=template.starting_name,
+                        starting_time=format_gtfs_time(starting_seconds),
+                        starting_ssm=(
+                            None if starting_seconds == NO_TIME else starting_seconds
+                        ),
+                        terminus_code=template.terminus_code,
+                        terminus_name=template.terminus_name,
+                        terminus_time=format_gtfs_time(terminus_seconds),
+                        terminus_ssm=(
+                            None if terminus_seconds == NO_TIME else terminus_seconds
+                        ),
+                        previous_trip_shape_id=previous_trip_shape_id,
+                        street_sequence=template.street_sequence,
                     )
 
-    # Sort each stop's arrivals by arrival time
-    for stop_code in stop_arrivals:
-        # Filter out entries with None arrival_seconds
-        stop_arrivals[stop_code] = [
-            item for item in stop_arrivals[stop_code] if item["calling_ssm"] is not None
-        ]
-        stop_arrivals[stop_code].sort(key=lambda x: x["calling_ssm"])
+                    for call in template.calls:
+                        # Current day service: include ALL times, with SSM > 24:00
+                        # kept as is
+                        calling_seconds = call.departure_seconds
+
+                        if not is_current_mode:
+                            # Previous day service: only include if calling_time >=
+                            # 24:00:00 (night services rolling to this day)
+                            if calling_seconds < SECONDS_PER_DAY:
+                                continue
+
+                            # Normalize times for display on current day
+                            # (e.g. 25:30 -> 01:30)
+                            # SSM should be small (early morning)
+                            calling_seconds %= SECONDS_PER_DAY
+
+                        arrivals = stop_arrivals.get(call.stop_code)
+                        if arrivals is None:
+                            arrivals = stop_arrivals[call.stop_code] = []
+
+                        arrivals.append(
+                            ScheduledArrival(
+                                arrival_trip,
+                                call.stop_sequence,
+                                call.shape_dist_traveled,
+                                call.next_streets_offset,
+                                format_gtfs_time(calling_seconds),
+                                max(calling_seconds, 0),
+                            )
+                        )
+
+    # Sort each stop's arrivals by arrival time, breaking ties on the trip so
+    # that unchanged feeds produce identical files
+    arrival_count = 0
+    with span("sorting"):
+        for stop_code in stop_arrivals:
+            # Filter out entries with None arrival_seconds
+            stop_arrivals[stop_code] = [
+                item
+                for item in stop_arrivals[stop_code]
+                if item.calling_ssm is not None
+            ]
+            stop_arrivals[stop_code].sort(
+                key=lambda x: (x.calling_ssm, x.trip_id, x.stop_sequence)
+            )
+            arrival_count += len(stop_arrivals[stop_code])
+    count("arrivals", arrival_count)
 
     return stop_arrivals
 
 
 def process_date(
-    feed_dir: str, date: str, output_dir: str, provider, rolling_config=None
+    feed_dir: str,
+    date: str,
+    output_dir: str,
+    provider,
+    rolling_config=None,
+    manifest: Optional[OutputManifest] = None,
+    formats: Sequence[str] = REPORT_FORMATS,
+    layout: str = "files",
 ) -> tuple[str, Dict[str, int]]:
     """
     Process a single date and write its stop JSON files.
@@ -549,7 +466,8 @@ def process_date(
         stops_by_code = get_all_stops_by_code(feed_dir)
 
         # Get all stop arrivals for the current date
-        stop_arrivals = get_stop_arrivals(feed_dir, date, provider, rolling_config)
+        with span("stop_arrivals"):
+            stop_arrivals = get_stop_arrivals(feed_dir, date, provider, rolling_config)
 
         if not stop_arrivals:
             logger.warning(f"No stop arrivals found for date {date}")
@@ -559,39 +477,63 @@ def process_date(
             f"Writing stop reports for {len(stop_arrivals)} stops for date {date}"
         )
 
-        # Write individual stop JSON files
-        writing_start_time = time.perf_counter()
-        for stop_code, arrivals in stop_arrivals.items():
-            write_stop_json(output_dir, date, stop_code, arrivals)
-        writing_end_time = time.perf_counter()
-        writing_elapsed = writing_end_time - writing_start_time
-
-        logger.info(
-            f"Finished writing stop JSON reports for date {date} in {writing_elapsed:.2f}s"
-        )
-
-        # Write individual stop JSON files
-        writing_start_time = time.perf_counter()
-        for stop_code, arrivals in stop_arrivals.items():
-            stop_by_code = stops_by_code.get(stop_code)
-
-            if stop_by_code is not None:
-                write_stop_protobuf(
+        # Write the reports of every stop, in all formats at once
+        with span("write") as writing_span:
+            bundles: Optional[Dict[str, Dict[str, bytes]]] = (
+                {
+                    report_format: {}
+                    for report_format in formats
+                    if report_format in BUNDLE_FILE_NAMES
+                }
+                if layout == "bundle"
+                else None
+            )
+            report_sizes: Dict[str, int] = dict.fromkeys(formats, 0)
+            for stop_code, arrivals in stop_arrivals.items():
+                stop_by_code = stops_by_code.get(stop_code)
+                location = (
+                    (stop_by_code.stop_25829_x or 0.0, stop_by_code.stop_25829_y or 0.0)
+                    if stop_by_code is not None
+                    else None
+                )
+                sizes = write_stop_reports(
                     output_dir,
                     date,
                     stop_code,
                     arrivals,
-                    stop_by_code.stop_25829_x or 0.0,
-                    stop_by_code.stop_25829_y or 0.0,
+                    location,
+                    formats,
+                    manifest,
+                    bundles,
                 )
-
-        writing_end_time = time.perf_counter()
-        writing_elapsed = writing_end_time - writing_start_time
+                for report_format, size in sizes.items():
+                    report_sizes[report_format] += size
+            for report_format, reports in (bundles or {}).items():
+                if reports:
+                    write_stop_bundle(
+                        output_dir,
+                        date,
+                        reports,
+                        manifest,
+                        BUNDLE_FILE_NAMES[report_format],
+                    )
+        writing_elapsed = writing_span.elapsed
 
         logger.info(
-            f"Finished writing stop protobuf reports for date {date} in {writing_elapsed:.2f}s"
+            f"Finished writing stop {'/'.join(formats)} reports for date {date} in "
+            f"{writing_elapsed:.2f}s"
         )
 
+        if report_sizes.get("pb") and "pb2" in report_sizes:
+            v1_size = report_sizes["pb"]
+            v2_size = report_sizes["pb2"]
+            logger.info(
+                f"Protobuf v2 reports for date {date} take {v2_size / 1024:.1f} KiB "
+                "against "
+                f"{v1_size / 1024:.1f} KiB in v1 ({(1 - v2_size / v1_size) * 100:.1f}% "
+                "smaller)"
+            )
+
         logger.info(f"Processed {len(stop_arrivals)} stops for date {date}")
 
         stop_summary = {
@@ -603,68 +545,585 @@ def process_date(
         raise
 
 
-def main():
-    args = parse_args()
-    output_dir = args.output_dir
-    feed_url = args.feed_url
+def get_service_signature(
+    feed_dir: str, date: str, rolling_config=None
+) -> Tuple[frozenset[str], frozenset[str]]:
+    """
+    Get the services active on a date and on the day before it, which fully
+    determine the reports generated for the date.
+    """
+    from datetime import datetime, timedelta
 
-    # Get provider configuration
-    try:
-        provider = get_provider(args.provider)
-        logger.info(f"Using provider: {args.provider}")
-    except ValueError as e:
-        logger.error(str(e))
-        sys.exit(1)
+    effective_date = date
+    if rolling_config and rolling_config.is_rolling_date(date):
+        effective_date = rolling_config.get_source_date(date)
+    prev_date = (
+        datetime.strptime(effective_date, "%Y-%m-%d") - timedelta(days=1)
+    ).strftime("%Y-%m-%d")
 
-    if not feed_url:
-        feed_dir = args.feed_dir
-    else:
-        logger.info(f"Downloading GTFS feed from {feed_url}...")
-        feed_dir = download_feed_from_url(feed_url, output_dir, args.force_download)
-        if feed_dir is None:
-            logger.info("Download was skipped (feed not modified). Exiting.")
-            return
-
-    all_dates = get_all_feed_dates(feed_dir)
-    if not all_dates:
-        logger.error("No valid dates found in feed.")
-        return
-    date_list = all_dates
+    return (
+        frozenset(get_active_services(feed_dir, effective_date)),
+        frozenset(get_active_services(feed_dir, prev_date)),
+    )
+
+
+def get_required_trip_ids(
+    feed_dir: str, date_list: List[str], rolling_config=None
+) -> set[str]:
+    """
+    Get the IDs of every trip that can appear in the reports for date_list,
+    that is the trips of the services active on each date or on the day before.
+    """
+    service_ids: set[str] = set()
+    for date in date_list:
+        active_services, prev_services = get_service_signature(
+            feed_dir, date, rolling_config
+        )
+        service_ids.update(active_services)
+        service_ids.update(prev_services)
+
+    return get_trip_ids(feed_dir, service_ids=service_ids)
+
+
+def preload_feed(feed_dir: str, provider, trip_ids: Optional[set[str]] = None) -> None:
+    """
+    Parse the feed files that every date needs into the module-level caches.
+
+    Called in the parent before forking workers, so that the parsed stops, trips
+    and stop_times are shared with every worker through copy-on-write instead of
+    being parsed again in each process. When trip_ids is given, only the stop
+    times of those trips are loaded. The date-invariant trip templates and trip
+    chains are built here too.
+    """
+    with span("preload") as preload_span:
+        with span("stops"):
+            stops = get_all_stops(feed_dir)
+            get_all_stops_by_code(feed_dir)
+        with span("calendar"):
+            get_service_calendar(feed_dir)
+        with span("trips"):
+            # Loading the trips for any list of services caches the whole trips.txt
+            get_trips_for_services(feed_dir, [])
+        with span("stop_times"):
+            stop_times = _load_stop_times_for_feed(feed_dir, trip_filter=trip_ids)
+        with span("templates"):
+            get_trip_templates(feed_dir, provider)
+        with span("chains"):
+            get_trip_chains(feed_dir)
+
+    logger.info(
+        f"Preloaded {len(stops)} stops and stop times for {len(stop_times)} trips in "
+        f"{preload_span.elapsed:.2f}s"
+    )
+
+
+class FeedRun:
+    """A feed of the run, from the moment it is loaded until it is finished."""
+
+    __slots__ = (
+        "config",
+        "provider",
+        "feed_dir",
+        "rolling_config",
+        "date_list",
+        "dates_by_signature",
+        "generated_summary",
+        "pending",
+        "manifest",
+        "metrics",
+    )
+
+    def __init__(self, config: FeedConfig, provider, feed_dir: str):
+        self.config = config
+        self.provider = provider
+        self.feed_dir = feed_dir
+        self.rolling_config = None
+        self.date_list: List[str] = []
+        self.dates_by_signature: Dict[
+            Tuple[frozenset[str], frozenset[str]], List[str]
+        ] = {}
+        # Stop summary of each date generated so far
+        self.generated_summary: Dict[str, Dict[str, int]] = {}
+        # Dates left to generate
+        self.pending = 0
+        # Hashes of the files written by the previous run, to skip unchanged ones
+        self.manifest = OutputManifest(config.output_dir)
+        # Spans, counters and stage peaks recorded for the feed, merged into its
+        # run metrics once it is finished
+        self.metrics: List[Metrics] = []
+
+    @property
+    def generated_dates(self) -> List[str]:
+        return [dates[0] for dates in self.dates_by_signature.values()]
+
+
+# Manifests of the feeds of the run by output directory, inherited by forked
+# workers instead of being pickled
+_worker_manifests: Dict[str, OutputManifest] = {}
+
+
+def _process_date_in_worker(
+    feed_dir: str,
+    date: str,
+    output_dir: str,
+    provider,
+    rolling_config=None,
+    formats: Sequence[str] = REPORT_FORMATS,
+    layout: str = "files",
+    label: Optional[str] = None,
+) -> tuple[
+    str,
+    Dict[str, int],
+    Optional[tuple[Dict[str, str], int, int]],
+    Metrics,
+]:
+    """
+    Process a date in a worker process, returning the manifest changes and the
+    metrics along with the summary so that the parent can merge them.
+    """
+    manifest = _worker_manifests.get(output_dir)
+    with stage("process_date", label or date):
+        date, stop_summary = process_date(
+            feed_dir,
+            date,
+            output_dir,
+            provider,
+            rolling_config,
+            manifest,
+            formats,
+            layout,
+        )
+    changes = manifest.drain() if manifest is not None else None
+    return date, stop_summary, changes, drain_metrics()
+
+
+def group_dates_by_signature(
+    feed_dir: str, date_list: List[str], rolling_config=None
+) -> Dict[Tuple[frozenset[str], frozenset[str]], List[str]]:
+    """
+    Group the dates that have the same active and previous-day services.
+
+    Dates of the same group produce identical reports, so only the first date
+    of each group needs to be generated and the others are linked to its files.
+    """
+    dates_by_signature: Dict[Tuple[frozenset[str], frozenset[str]], List[str]] = {}
+    with span("signatures"):
+        for date in date_list:
+            signature = get_service_signature(feed_dir, date, rolling_config)
+            dates_by_signature.setdefault(signature, []).append(date)
+
+    logger.info(
+        f"Found {len(dates_by_signature)} distinct service days among {len(date_list)} "
+        "dates"
+    )
+    return dates_by_signature
+
+
+def link_generated_dates(
+    output_dir: str,
+    date_list: List[str],
+    dates_by_signature: Dict[Tuple[frozenset[str], frozenset[str]], List[str]],
+    generated_summary: Dict[str, Dict[str, int]],
+    manifest: Optional[OutputManifest] = None,
+) -> Dict[str, Dict[str, int]]:
+    """
+    Link the reports of every date that was not generated to those of the date
+    generated for its group.
+
+    Returns a dictionary of date -> stop summary, in the same order as date_list.
+    """
+    linked_dates = 0
+    linked_files = 0
+    linked_bytes = 0
+    summary_by_date: Dict[str, Dict[str, int]] = {}
+    with span("link"):
+        for source_date, *alias_dates in dates_by_signature.values():
+            summary_by_date[source_date] = generated_summary[source_date]
+            for alias_date in alias_dates:
+                files, size = link_date_reports(
+                    output_dir, source_date, alias_date, manifest
+                )
+                summary_by_date[alias_date] = generated_summary[source_date]
+                linked_dates += 1
+                linked_files += files
+                linked_bytes += size
+    count("dates_generated", len(dates_by_signature))
+    count("dates_linked", linked_dates)
+
+    if linked_dates:
+        logger.info(
+            f"Skipped generating {linked_dates} dates with the same services as "
+            "another date, "
+            f"linked {linked_files} files and saved {linked_bytes / (1024 * 1024):.2f} "
+            "MiB"
+        )
+
+    return {date: summary_by_date[date] for date in date_list}
+
+
+def _download_feed(feed: FeedConfig) -> Tuple[Optional[str], float]:
+    logger.info(f"Downloading GTFS feed {feed.name} from {feed.feed_url}...")
+    start_time = time.perf_counter()
+    feed_path = download_feed_from_url(
+        feed.feed_url, feed.output_dir, feed.force_download
+    )
+    return feed_path, time.perf_counter() - start_time
+
+
+def download_feeds(
+    feeds: List[FeedConfig],
+) -> Dict[str, Tuple[Optional[str], float]]:
+    """
+    Download every feed with a URL at the same time.
+
+    Returns:
+        Dictionary of feed name -> (path to the downloaded zip file, or None if
+        the download was skipped, and seconds taken). Feeds whose download
+        failed are logged and left out.
+    """
+    url_feeds = [feed for feed in feeds if feed.feed_url]
+    if not url_feeds:
+        return {}
+
+    downloads: Dict[str, Tuple[Optional[str], float]] = {}
+    with ThreadPoolExecutor(max_workers=len(url_feeds)) as executor:
+        futures = {executor.submit(_download_feed, feed): feed for feed in url_feeds}
+        for future in as_completed(futures):
+            feed = futures[future]
+            try:
+                downloads[feed.name] = future.result()
+            except Exception as e:
+                logger.error(f"Failed to download feed {feed.name}: {e}")
+    return downloads
+
+
+def load_feed_run(
+    config: FeedConfig,
+    feed_dir: str,
+    snapshot_dir: Optional[str] = None,
+    pin: bool = False,
+) -> Optional[FeedRun]:
+    """
+    Load a feed and find the dates to generate for it.
+
+    Args:
+        config: Configuration of the feed
+        feed_dir: Path to the feed directory or zip file
+        snapshot_dir: Directory of the binary snapshots of the parsed feeds
+        pin: Keep the parsed feed in the caches until the feed is finished,
+            for the forked workers to inherit it even if other feeds are
+            loaded after it
+
+    Returns:
+        The feed ready to generate its dates, or None if it has no dates.
+    """
+    provider = get_provider(config.provider)
+    logger.info(f"Using provider {config.provider} for feed {config.name}")
+    run = FeedRun(config, provider, feed_dir)
+
+    if snapshot_dir:
+        with stage("snapshot", config.name):
+            load_feed_snapshot(feed_dir, snapshot_dir)
+    if pin:
+        # After the snapshot, which invalidates the feed before filling it
+        pin_feed(feed_dir)
+
+    date_list = get_all_feed_dates(feed_dir)
+    if not date_list:
+        logger.error(f"No valid dates found in feed {config.name}.")
+        return None
 
     # Handle rolling dates
-    rolling_config = create_rolling_date_config(args.rolling_dates)
-    if rolling_config.has_mappings():
-        for target_date in rolling_config.get_all_mappings().keys():
+    run.rolling_config = create_rolling_date_config(config.rolling_dates)
+    if run.rolling_config.has_mappings():
+        for target_date in run.rolling_config.get_all_mappings().keys():
             if target_date not in date_list:
                 date_list.append(target_date)
         # Sort dates to ensure they are processed in order
         date_list.sort()
+    run.date_list = date_list
 
-    # Ensure date_list is not empty before processing
-    if not date_list:
-        logger.error("No valid dates to process.")
-        return
+    logger.info(f"Processing {len(date_list)} dates of feed {config.name}")
 
-    logger.info(f"Processing {len(date_list)} dates")
+    # Parse the feed once, only keeping the stop times of trips that run on the
+    # processed dates. Workers inherit it instead of reparsing it.
+    with stage("load", config.name):
+        preload_feed(
+            feed_dir,
+            provider,
+            get_required_trip_ids(feed_dir, date_list, run.rolling_config),
+        )
 
-    # Dictionary to store summary data for index files
-    all_stops_summary = {}
+    run.dates_by_signature = group_dates_by_signature(
+        feed_dir, date_list, run.rolling_config
+    )
+    run.pending = len(run.dates_by_signature)
+    return run
 
-    for date in date_list:
-        _, stop_summary = process_date(feed_dir, date, output_dir, provider, rolling_config)
-        all_stops_summary[date] = stop_summary
 
-    logger.info("Finished processing all dates. Beginning with shape transformation.")
+def finish_feed_run(run: FeedRun, args, started: datetime.datetime) -> None:
+    """
+    Link the dates that were not generated, write the shapes and the manifest of
+    a feed whose dates are all generated, and write its run metrics.
+
+    The metrics recorded in this process must have been drained into the feed
+    beforehand, so that those of the other feeds are not mixed in.
+    """
+    config = run.config
+    feed_dir = run.feed_dir
+    output_dir = config.output_dir
+    manifest = run.manifest
+
+    link_generated_dates(
+        output_dir,
+        run.date_list,
+        run.dates_by_signature,
+        run.generated_summary,
+        manifest,
+    )
+
+    logger.info(
+        f"Finished processing all dates of feed {config.name}. Beginning with shape "
+        "transformation."
+    )
 
     # Process shapes, converting each coordinate to EPSG:25829 and saving as Protobuf
-    process_shapes(feed_dir, output_dir)
+    with stage("shapes", config.name):
+        with span("process_shapes"):
+            process_shapes(
+                feed_dir,
+                output_dir,
+                manifest,
+                args.compact_shapes,
+                args.shape_tolerances,
+            )
+        with span("stop_indexes"):
+            write_shape_stop_indexes(feed_dir, output_dir, manifest)
+
+    logger.info(f"Finished processing shapes of feed {config.name}.")
+
+    with span("manifest"):
+        manifest.remove_stale()
+        manifest.save()
+    logger.info(
+        f"Output files of feed {config.name}: {manifest.written} written, "
+        f"{manifest.skipped} unchanged, {manifest.deleted} stale deleted"
+    )
+
+    # The caches are shared by every feed of the run
+    cache_stats = get_cache_stats()
+    logger.info(
+        f"Caches: {sum(s['bytes'] for s in cache_stats.values()) / (1024 * 1024):.1f} "
+        "MiB in "
+        f"{sum(s['entries'] for s in cache_stats.values())} entries, "
+        f"{sum(s['hits'] for s in cache_stats.values())} hits, "
+        f"{sum(s['misses'] for s in cache_stats.values())} misses, "
+        f"{sum(s['evictions'] for s in cache_stats.values())} evictions"
+    )
+
+    # The parsed feed is no longer needed by this run
+    invalidate_feed(feed_dir)
+    if config.feed_url:
+        temp_dir = os.path.dirname(feed_dir)
+        if os.path.exists(temp_dir):
+            shutil.rmtree(temp_dir)
+            logger.info(f"Removed temporary feed directory: {temp_dir}")
+
+    for metrics in run.metrics:
+        merge_metrics(*metrics)
+    run.metrics = []
+    metrics_path = write_run_metrics(
+        output_dir,
+        started,
+        {
+            "name": config.name,
+            "provider": config.provider,
+            "feed": config.feed_url or feed_dir,
+            "dates": len(run.date_list),
+            "jobs": args.jobs,
+            "formats": list(args.formats),
+            "layout": args.layout,
+            "cache_budget": args.cache_budget * 1024 * 1024,
+            "caches": cache_stats,
+            "files": {
+                "written": manifest.written,
+                "unchanged": manifest.skipped,
+                "deleted": manifest.deleted,
+            },
+        },
+    )
+    reset_metrics()
+    logger.info(f"Run metrics of feed {config.name} written to {metrics_path}")
+
 
-    logger.info("Finished processing shapes.")
+def _interleave_dates(runs: List[FeedRun]) -> List[Tuple[FeedRun, str]]:
+    """
+    Take the dates to generate of each feed in turn, so that every feed moves
+    forward at the same pace and a small feed is not held up by a large one.
+    """
+    queues = [[(run, date) for date in run.generated_dates] for run in runs]
+    return [task for tasks in zip_longest(*queues) for task in tasks if task]
+
+
+def _date_generated(
+    run: FeedRun,
+    date: str,
+    stop_summary: Dict[str, int],
+    metrics: Metrics,
+    args,
+    started: datetime.datetime,
+) -> None:
+    run.generated_summary[date] = stop_summary
+    run.metrics.append(metrics)
+    run.pending -= 1
+    if run.pending == 0:
+        finish_feed_run(run, args, started)
+
+
+def generate_feed_dates(runs: List[FeedRun], args, started: datetime.datetime) -> None:
+    """
+    Generate the distinct dates of every feed, using a single pool of forked
+    workers for all of them when jobs > 1, and finish each feed as soon as its
+    last date is generated.
+    """
+    tasks = _interleave_dates(runs)
+    jobs = args.jobs
 
-    if feed_url:
-        if os.path.exists(feed_dir):
-            shutil.rmtree(feed_dir)
-            logger.info(f"Removed temporary feed directory: {feed_dir}")
+    if jobs > 1 and "fork" not in multiprocessing.get_all_start_methods():
+        logger.warning(
+            "Forking is not available on this platform, processing dates sequentially."
+        )
+        jobs = 1
+
+    if jobs == 1 or len(tasks) == 1:
+        for run, date in tasks:
+            with stage("process_date", f"{run.config.name}-{date}"):
+                _, stop_summary = process_date(
+                    run.feed_dir,
+                    date,
+                    run.config.output_dir,
+                    run.provider,
+                    run.rolling_config,
+                    run.manifest,
+                    args.formats,
+                    args.layout,
+                )
+            _date_generated(run, date, stop_summary, drain_metrics(), args, started)
+        return
+
+    workers = min(jobs, len(tasks))
+    cache_size = get_cache_size()
+    if cache_size > args.cache_budget * 1024 * 1024:
+        logger.warning(
+            f"The {len(runs)} feeds take {cache_size / (1024 * 1024):.1f} MiB in the "
+            f"caches, over the budget of {args.cache_budget} MiB. They are kept "
+            "for the workers to share until each feed is finished."
+        )
+    logger.info(
+        f"Processing {len(tasks)} dates of {len(runs)} feeds with {workers} worker "
+        "processes"
+    )
+
+    _worker_manifests.update((run.config.output_dir, run.manifest) for run in runs)
+    try:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("fork"),
+            initializer=reset_metrics,
+        ) as executor:
+            futures = {
+                executor.submit(
+                    _process_date_in_worker,
+                    run.feed_dir,
+                    date,
+                    run.config.output_dir,
+                    run.provider,
+                    run.rolling_config,
+                    args.formats,
+                    args.layout,
+                    f"{run.config.name}-{date}",
+                ): run
+                for run, date in tasks
+            }
+            for future in as_completed(futures):
+                run = futures[future]
+                date, stop_summary, changes, metrics = future.result()
+                if changes is not None:
+                    run.manifest.merge(*changes)
+                _date_generated(run, date, stop_summary, metrics, args, started)
+    finally:
+        _worker_manifests.clear()
+
+
+def run_feeds(feeds: List[FeedConfig], args) -> bool:
+    """
+    Generate the reports of every feed of the run.
+
+    The feeds with a URL are downloaded at the same time, then every feed is
+    loaded in turn, and their dates are generated together by the same workers.
+
+    Returns:
+        Whether every feed was generated, False if a download failed.
+    """
+    started = datetime.datetime.now(datetime.timezone.utc)
+    succeeded = True
+    # Workers only inherit what is still cached when they are forked
+    shared_pool = args.jobs > 1 and "fork" in multiprocessing.get_all_start_methods()
+    downloads = download_feeds(feeds)
+
+    runs: List[FeedRun] = []
+    for config in feeds:
+        metrics: List[Metrics] = []
+        if not config.feed_url:
+            feed_dir = config.feed_dir or config.feed_zip
+        elif config.name not in downloads:
+            succeeded = False
+            continue
+        else:
+            feed_dir, download_elapsed = downloads[config.name]
+            if feed_dir is None:
+                logger.info(
+                    f"Download of feed {config.name} was skipped (feed not modified)."
+                )
+                continue
+            metrics.append(({"download": [1, download_elapsed]}, {}, {}, 0))
+
+        run = load_feed_run(config, feed_dir, args.snapshot_dir, shared_pool)
+        if run is None:
+            reset_metrics()
+            invalidate_feed(feed_dir)
+            if config.feed_url:
+                shutil.rmtree(os.path.dirname(feed_dir), ignore_errors=True)
+            continue
+        # Keep the metrics of loading each feed apart
+        run.metrics.extend(metrics)
+        run.metrics.append(drain_metrics())
+        runs.append(run)
+
+    if runs:
+        generate_feed_dates(runs, args, started)
+    return succeeded
+
+
+def main():
+    args = parse_args()
+    set_memory_budget(args.cache_budget * 1024 * 1024)
+
+    if args.profile is not None:
+        enable_profiling(
+            args.profile or os.path.join(args.feeds[0].output_dir, "profile")
+        )
+
+    # Check the provider of every feed before starting
+    for feed in args.feeds:
+        try:
+            get_provider(feed.provider)
+        except ValueError as e:
+            logger.error(str(e))
+            sys.exit(1)
+
+    if not run_feeds(args.feeds, args):
+        sys.exit(1)
 
 
 if __name__ == "__main__":
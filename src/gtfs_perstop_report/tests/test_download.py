@@ -0,0 +1,203 @@
+import hashlib
+import json
+import os
+import socket
+import tempfile
+import threading
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src.download import download_feed_from_url
+
+
+class FeedServer:
+    """A local HTTP stand-in serving a feed zip, recording the request headers."""
+
+    def __init__(self, conditional: bool, content: bytes = b"PK feed v1"):
+        self.conditional = conditional
+        self.status = 200
+        self.requests = []
+        self.set_content(content)
+
+    def set_content(self, content: bytes, modified: float = 1_700_000_000) -> None:
+        self.content = content
+        self.etag = '"' + hashlib.sha256(content).hexdigest()[:16] + '"'
+        self.last_modified = formatdate(modified, usegmt=True)
+
+    def not_modified(self, headers) -> bool:
+        if not self.conditional:
+            return False
+        if "If-None-Match" in headers:
+            return headers["If-None-Match"] == self.etag
+        if "If-Modified-Since" in headers:
+            return parsedate_to_datetime(
+                headers["If-Modified-Since"]
+            ) >= parsedate_to_datetime(self.last_modified)
+        return False
+
+
+def _make_handler(server: FeedServer):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            server.requests.append(dict(self.headers))
+            if server.status != 200:
+                self.send_response(server.status)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            if server.not_modified(self.headers):
+                self.send_response(304)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "application/zip")
+            self.send_header("Content-Length", str(len(server.content)))
+            self.send_header("ETag", server.etag)
+            self.send_header("Last-Modified", server.last_modified)
+            self.end_headers()
+            self.wfile.write(server.content)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def _serve(feed: FeedServer):
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _make_handler(feed))
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    feed.url = f"http://127.0.0.1:{httpd.server_address[1]}/gtfs.zip"
+    yield feed
+    httpd.shutdown()
+    httpd.server_close()
+    thread.join()
+
+
+@pytest.fixture
+def conditional_server():
+    """A server honouring If-None-Match and If-Modified-Since."""
+    yield from _serve(FeedServer(conditional=True))
+
+
+@pytest.fixture
+def always_200_server():
+    """A server ignoring conditional headers, always answering 200."""
+    yield from _serve(FeedServer(conditional=False))
+
+
+@pytest.fixture(params=[True, False], ids=["conditional", "always_200"])
+def any_server(request):
+    yield from _serve(FeedServer(conditional=request.param))
+
+
+@pytest.fixture
+def temp_root(tmp_path, monkeypatch):
+    """Create the download temporary directories under a directory of the test."""
+    root = tmp_path / "tmp"
+    root.mkdir()
+    monkeypatch.setattr(tempfile, "tempdir", str(root))
+    return root
+
+
+@pytest.fixture
+def output_dir(tmp_path):
+    return str(tmp_path / "output")
+
+
+def _read(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def _metadata(output_dir: str) -> dict:
+    with open(os.path.join(output_dir, ".gtfsmetadata"), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_first_download(conditional_server, output_dir, temp_root):
+    path = download_feed_from_url(conditional_server.url, output_dir)
+
+    assert path is not None
+    assert _read(path) == conditional_server.content
+    assert "If-None-Match" not in conditional_server.requests[0]
+    assert _metadata(output_dir) == {
+        "etag": conditional_server.etag,
+        "last_modified": conditional_server.last_modified,
+        "sha256": hashlib.sha256(conditional_server.content).hexdigest(),
+    }
+
+
+def test_not_modified_skips(conditional_server, output_dir, temp_root):
+    first = download_feed_from_url(conditional_server.url, output_dir)
+    os.remove(first)
+    os.rmdir(os.path.dirname(first))
+
+    assert download_feed_from_url(conditional_server.url, output_dir) is None
+    assert conditional_server.requests[1]["If-None-Match"] == conditional_server.etag
+    assert (
+        conditional_server.requests[1]["If-Modified-Since"]
+        == conditional_server.last_modified
+    )
+    assert os.listdir(temp_root) == []
+
+
+def test_same_content_skips_on_hash(always_200_server, output_dir, temp_root):
+    first = download_feed_from_url(always_200_server.url, output_dir)
+    os.remove(first)
+    os.rmdir(os.path.dirname(first))
+
+    # Published again with a new date but the same bytes
+    always_200_server.set_content(always_200_server.content, modified=1_800_000_000)
+
+    assert download_feed_from_url(always_200_server.url, output_dir) is None
+    assert "If-None-Match" in always_200_server.requests[1]
+    assert os.listdir(temp_root) == []
+
+
+def test_force_download(conditional_server, output_dir, temp_root):
+    download_feed_from_url(conditional_server.url, output_dir)
+
+    path = download_feed_from_url(
+        conditional_server.url, output_dir, force_download=True
+    )
+
+    assert path is not None
+    assert _read(path) == conditional_server.content
+    assert "If-None-Match" not in conditional_server.requests[1]
+    assert "If-Modified-Since" not in conditional_server.requests[1]
+
+
+def test_changed_content_downloads(any_server, output_dir, temp_root):
+    download_feed_from_url(any_server.url, output_dir)
+    any_server.set_content(b"PK feed v2", modified=1_800_000_000)
+
+    path = download_feed_from_url(any_server.url, output_dir)
+
+    assert path is not None
+    assert _read(path) == b"PK feed v2"
+    assert _metadata(output_dir)["sha256"] == hashlib.sha256(b"PK feed v2").hexdigest()
+
+
+def test_failed_download_removes_temp_dir(conditional_server, output_dir, temp_root):
+    conditional_server.status = 500
+
+    with pytest.raises(Exception, match="500"):
+        download_feed_from_url(conditional_server.url, output_dir)
+
+    assert os.listdir(temp_root) == []
+    assert not os.path.exists(os.path.join(output_dir, ".gtfsmetadata"))
+
+
+def test_unreachable_server_removes_temp_dir(output_dir, temp_root):
+    # A port nothing listens on once the socket is closed
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    with pytest.raises(Exception):
+        download_feed_from_url(f"http://127.0.0.1:{port}/gtfs.zip", output_dir)
+
+    assert os.listdir(temp_root) == []